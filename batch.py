@@ -0,0 +1,143 @@
+"""Message Batches execution for bulk Gauntlet runs.
+
+Trades latency for throughput and cost: a whole phase's pending requests
+go out as one batch job instead of many individual calls.
+
+Resumability: the batch id and each request's caller metadata are written
+to a JSON state file right after submission.  If the process dies while
+polling, the next run finds the state file, resumes polling the same batch
+instead of resubmitting, and removes the file once results are collected.
+
+The Anthropic client honours ANTHROPIC_BASE_URL, so a local fake endpoint
+(tools/mock_anthropic.py) can stand in for the real API.
+
+This module has no import-time side effects so any script can use it.
+"""
+
+import json
+import time
+from pathlib import Path
+from typing import Any, Callable
+
+from engine import CallResult, usage_dict
+
+# Poll back-off: first wait, growth factor, ceiling (seconds).
+POLL_INITIAL: float = 10.0
+POLL_FACTOR:  float = 1.5
+POLL_MAX:     float = 300.0
+
+
+def load_state(state_path: Path) -> dict[str, Any] | None:
+    """The in-flight batch recorded at state_path, or None."""
+    if not state_path.exists():
+        return None
+    return json.loads(state_path.read_text(encoding="utf-8"))
+
+
+def submit(
+    client: Any,
+    requests: dict[str, dict[str, Any]],
+    meta: dict[str, Any],
+    state_path: Path,
+) -> dict[str, Any]:
+    """Create a batch from {custom_id: params} and persist its state.
+
+    meta maps each custom_id to whatever the caller needs to file the result
+    later (paths, labels); it is stored verbatim in the state file.
+    """
+    batch = client.messages.batches.create(
+        requests=[{"custom_id": cid, "params": params} for cid, params in requests.items()],
+    )
+    state = {"batch_id": batch.id, "meta": meta}
+    state_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = state_path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(state, indent=2), encoding="utf-8")
+    tmp.replace(state_path)
+    return state
+
+
+def wait_until_ended(
+    client: Any,
+    batch_id: str,
+    initial: float = POLL_INITIAL,
+    factor: float = POLL_FACTOR,
+    ceiling: float = POLL_MAX,
+    sleep: Callable[[float], None] = time.sleep,
+) -> Any:
+    """Poll a batch with exponential back-off until it has ended."""
+    delay = initial
+    while True:
+        batch = client.messages.batches.retrieve(batch_id)
+        counts = batch.request_counts
+        print(f"  [batch]   {batch_id}  {batch.processing_status}  "
+              f"(processing={counts.processing} succeeded={counts.succeeded} "
+              f"errored={counts.errored})")
+        if batch.processing_status == "ended":
+            return batch
+        sleep(delay)
+        delay = min(delay * factor, ceiling)
+
+
+def collect(client: Any, batch_id: str) -> dict[str, CallResult | str]:
+    """{custom_id: CallResult} for successes, {custom_id: error string} otherwise."""
+    out: dict[str, CallResult | str] = {}
+    for entry in client.messages.batches.results(batch_id):
+        result = entry.result
+        if result.type == "succeeded":
+            msg = result.message
+            out[entry.custom_id] = CallResult(text=msg.content[0].text,
+                                              usage=usage_dict(msg.usage), batch=True)
+        else:
+            detail = getattr(getattr(result, "error", None), "error", None)
+            out[entry.custom_id] = f"{result.type}: {getattr(detail, 'message', '') or result.type}"
+    return out
+
+
+def run(
+    client: Any,
+    requests: dict[str, dict[str, Any]],
+    meta: dict[str, Any],
+    state_path: Path,
+    on_result: Callable[[dict[str, Any], CallResult | str], None],
+    **poll: Any,
+) -> None:
+    """Submit requests as one batch, wait for it, and file every result.
+
+    on_result(meta_entry, result_or_error) is called once per request.  Call
+    resume() first so a batch left in flight is drained before the pending
+    set is rebuilt.
+    """
+    if requests:
+        state = submit(client, requests, meta, state_path)
+        print(f"  [batch]   submitted {len(requests)} request(s) as {state['batch_id']}")
+        drain(client, state, state_path, on_result, **poll)
+
+
+def resume(
+    client: Any,
+    state_path: Path,
+    on_result: Callable[[dict[str, Any], CallResult | str], None],
+    **poll: Any,
+) -> bool:
+    """Finish a batch left in flight by an earlier run.  True if one was found."""
+    state = load_state(state_path)
+    if state is None:
+        return False
+    print(f"  [batch]   resuming {state['batch_id']} from {state_path.name}")
+    drain(client, state, state_path, on_result, **poll)
+    return True
+
+
+def drain(
+    client: Any,
+    state: dict[str, Any],
+    state_path: Path,
+    on_result: Callable[[dict[str, Any], CallResult | str], None],
+    **poll: Any,
+) -> None:
+    """Wait for the batch in state, hand every result to on_result, clear state."""
+    wait_until_ended(client, state["batch_id"], **poll)
+    results = collect(client, state["batch_id"])
+    for cid, entry in state["meta"].items():
+        on_result(entry, results.get(cid, "missing: no result returned for request"))
+    state_path.unlink(missing_ok=True)
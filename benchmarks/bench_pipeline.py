@@ -0,0 +1,232 @@
+"""Offline throughput benchmarks for the Gauntlet pipeline.
+
+Starts the local Messages API stand-in (tools/mock_anthropic.py) in-process
+with a configurable latency / token-rate / fault model, then drives
+main.py's phase1 + phase2 on one DagScheduler, and persona_factory's
+jobs on another, against it.  No network access and no API spend: the
+client is pointed at the mock explicitly, whatever .env says.
+
+For every combination of persona count × temperature count × concurrency
+it reports:
+
+  wall        end-to-end seconds for both phases
+  calls/s     API calls completed per second of wall time
+  util        busy worker time / (wall × concurrency)
+  sched eff   lower bound / wall, where the lower bound is the larger of
+              the critical path (slowest review feeding a synthesis plus
+              that synthesis) and total call time / concurrency — 1.0 means
+              the scheduler could not have finished sooner
+
+Usage:
+    python benchmarks/bench_pipeline.py
+    python benchmarks/bench_pipeline.py --personas 3,6 --temps 1,3 -j 1,4,8 \\
+        --latency 0.3 --latency-dist lognormal --tokens-per-sec 80 --output-tokens 400
+    python benchmarks/bench_pipeline.py --p429 0.05 --p529 0.02 --stream --json bench.json
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any
+
+REPO = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO))
+sys.path.insert(0, str(REPO / "tools"))
+
+from anthropic import Anthropic  # noqa: E402
+
+import combos  # noqa: E402
+import main as gauntlet  # noqa: E402
+import mock_anthropic as mock  # noqa: E402
+import persona_factory  # noqa: E402
+import run_ledger  # noqa: E402
+from rate_limiter import RateLimiter  # noqa: E402
+from scheduler import DagScheduler  # noqa: E402
+
+# Reviewer personas available to scenarios, in the order they are added.
+REVIEWERS: list[str] = sorted(
+    p.stem for p in (REPO / "personas").glob("*.md")
+    if not p.stem.startswith(("synthesizer", "template_"))
+)
+TEMPERATURE_LADDER: list[float] = [0.3, 0.7, 1.0, 0.5, 0.9]
+FACTORY_TEMPLATE: Path = REPO / "personas" / "template_paper_analyst.md"
+
+
+def int_list(text: str) -> list[int]:
+    return [int(x) for x in text.split(",") if x]
+
+
+def start_mock(behaviour: mock.Behaviour) -> tuple[Any, mock.MockState, str]:
+    """Serve the mock on an ephemeral port in a daemon thread."""
+    state = mock.MockState(batch_delay=0.0, behaviour=behaviour)
+    server = mock.serve("127.0.0.1", 0, state)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, state, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def configure(personas: list[str], temps: int, concurrency: int,
+              args: argparse.Namespace) -> None:
+    """Set main.py's runtime globals the way main() would for this scenario."""
+    gauntlet.PERSONA_ORDER = personas
+    gauntlet.PERSONA_SHORT = {p: p.split("_")[-1] for p in personas}
+    gauntlet.SYNTHESIZER = "synthesizer"
+    gauntlet.TEMPERATURES = TEMPERATURE_LADDER[:temps]
+    gauntlet.COMBOS = combos.select(args.combo_strategy, temps, len(personas),
+                                    args.combo_k, args.combo_min, 0)
+    gauntlet.COMBO_DESIGN = combos.describe(args.combo_strategy, args.combo_k, args.combo_min,
+                                            levels=temps)
+    gauntlet.SYNTH_TREE = combos.reduction_tree(len(personas), args.synthesis_fanout)
+    gauntlet.RESPONSE_CACHE = None
+    gauntlet.STREAM = args.stream
+    gauntlet.LIMITER = RateLimiter(concurrency)
+
+
+def lower_bound(entries: list[dict[str, Any]], concurrency: int) -> float:
+    """max(critical path, total call time / concurrency) from a ledger."""
+    review = {(e["persona"], e["run"]): e["latency"] for e in entries if e["phase"] == "review"}
+    digest = {e["node"]: e["latency"] for e in entries if e["phase"] == "digest"}
+    critical = max(review.values(), default=0.0)
+    for e in entries:
+        if e["phase"] != "synthesis":
+            continue
+        parts = dict(part.rsplit("_", 1) for part in e["combo"].split("__"))
+        feeds = [review.get((p, int(parts[gauntlet.PERSONA_SHORT[p]])), 0.0)
+                 for p in gauntlet.PERSONA_ORDER]
+        critical = max(critical, max(feeds) + max(digest.values(), default=0.0) + e["latency"])
+    busy = sum(e["latency"] for e in entries)
+    return max(critical, busy / concurrency)
+
+
+def bench_pipeline(client: Anthropic, personas: list[str], temps: int, concurrency: int,
+                   args: argparse.Namespace) -> dict[str, Any]:
+    call_text = "Call for proposals. " * (args.doc_chars // 40)
+    proposal_text = "Proposed method and evaluation. " * (args.doc_chars // 64)
+    with tempfile.TemporaryDirectory() as tmp:
+        out_root = Path(tmp)
+        configure(personas, temps, concurrency, args)
+        sched = DagScheduler(concurrency)
+        start = time.monotonic()
+        with contextlib.redirect_stdout(io.StringIO()):
+            gauntlet.phase1(sched, client, gauntlet.build_context(call_text, proposal_text),
+                            out_root)
+            gauntlet.phase2(sched, client, call_text, proposal_text, out_root)
+            result = sched.run()
+        wall = time.monotonic() - start
+        entries = run_ledger.load(out_root / "ledger.jsonl")
+    busy = sum(e["latency"] for e in entries)
+    return {
+        "bench": "pipeline",
+        "personas": len(personas),
+        "temps": temps,
+        "concurrency": concurrency,
+        "calls": len(entries),
+        "failed": len(result.failures) + len(result.blocked),
+        "retries": sum(e["retries"] for e in entries),
+        "wall": round(wall, 3),
+        "calls_per_sec": round(len(entries) / wall, 2) if wall else None,
+        "util": round(busy / (wall * concurrency), 3) if wall else None,
+        "sched_eff": round(lower_bound(entries, concurrency) / wall, 3) if wall else None,
+    }
+
+
+def bench_factory(client: Anthropic, topics: int, concurrency: int) -> dict[str, Any]:
+    template = FACTORY_TEMPLATE.read_text(encoding="utf-8")
+    limiter = RateLimiter(concurrency)
+    with tempfile.TemporaryDirectory() as tmp:
+        ledger = run_ledger.RunLedger(Path(tmp) / "ledger.jsonl")
+        sched = DagScheduler(concurrency)
+        persona_factory.add_persona_jobs(sched, client,
+                                         [f"benchmark topic {i}" for i in range(topics)],
+                                         template, Path(tmp), limiter, ledger)
+        start = time.monotonic()
+        with contextlib.redirect_stdout(io.StringIO()):
+            sched.run()
+        wall = time.monotonic() - start
+        entries = run_ledger.load(ledger.path)
+    return {
+        "bench": "persona_factory",
+        "topics": topics,
+        "concurrency": concurrency,
+        "calls": len(entries),
+        "retries": sum(e["retries"] for e in entries),
+        "wall": round(wall, 3),
+        "calls_per_sec": round(len(entries) / wall, 2) if wall else None,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Offline Gauntlet throughput benchmarks")
+    parser.add_argument("--personas", type=int_list, default=[3, 6],
+                        help=f"comma-separated persona counts (max {len(REVIEWERS)}; default: 3,6)")
+    parser.add_argument("--temps", type=int_list, default=[1, 3],
+                        help=f"comma-separated temperature counts (max {len(TEMPERATURE_LADDER)}; "
+                             "default: 1,3)")
+    parser.add_argument("-j", "--concurrency", type=int_list, default=[1, 4, 8],
+                        help="comma-separated max-concurrency settings (default: 1,4,8)")
+    parser.add_argument("--combo-strategy", choices=combos.STRATEGIES, default="orthogonal",
+                        help="synthesis design, as in main.py (default: orthogonal)")
+    parser.add_argument("--combo-k", type=int, default=None)
+    parser.add_argument("--combo-min", type=int, default=1)
+    parser.add_argument("--synthesis-fanout", type=int, default=0)
+    parser.add_argument("--stream", action="store_true", help="use streaming requests")
+    parser.add_argument("--doc-chars", type=int, default=20_000,
+                        help="size of the synthetic call + proposal text (default: 20000)")
+    parser.add_argument("--factory-topics", type=int, default=5,
+                        help="persona_factory topics to generate; 0 skips it (default: 5)")
+    parser.add_argument("--latency", type=float, default=0.05,
+                        help="mock mean time to first token, seconds (default: 0.05)")
+    parser.add_argument("--latency-dist", choices=mock.LATENCY_DISTS, default="lognormal")
+    parser.add_argument("--tokens-per-sec", type=float, default=2000.0,
+                        help="mock output rate (default: 2000)")
+    parser.add_argument("--output-tokens", type=int, default=200,
+                        help="mock reply size in tokens (default: 200)")
+    parser.add_argument("--p429", type=float, default=0.0, help="mock 429 fraction")
+    parser.add_argument("--p529", type=float, default=0.0, help="mock 529 fraction")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", type=Path, default=None, help="also write results here")
+    args = parser.parse_args()
+
+    behaviour = mock.Behaviour(args.latency, args.latency_dist, args.tokens_per_sec,
+                               args.output_tokens, args.p429, args.p529, args.seed)
+    server, state, base_url = start_mock(behaviour)
+    client = Anthropic(api_key="mock", base_url=base_url, max_retries=gauntlet.MAX_RETRIES)
+    print(f"[bench]   mock at {base_url}  ttft={args.latency}s ({args.latency_dist})  "
+          f"{args.tokens_per_sec:.0f} tok/s  out={args.output_tokens}  "
+          f"p429={args.p429} p529={args.p529}\n")
+
+    rows: list[dict[str, Any]] = []
+    print(f"  {'P':>3} {'T':>2} {'j':>3} {'calls':>6} {'retry':>6} {'wall':>8} "
+          f"{'calls/s':>8} {'util':>6} {'eff':>6}")
+    for p in args.personas:
+        for t in args.temps:
+            for j in args.concurrency:
+                row = bench_pipeline(client, REVIEWERS[:p], t, j, args)
+                rows.append(row)
+                print(f"  {p:>3} {t:>2} {j:>3} {row['calls']:>6} {row['retries']:>6} "
+                      f"{row['wall']:>7.2f}s {row['calls_per_sec']:>8.2f} "
+                      f"{row['util']:>6.2f} {row['sched_eff']:>6.2f}"
+                      + (f"  ({row['failed']} failed)" if row["failed"] else ""))
+
+    if args.factory_topics:
+        row = bench_factory(client, args.factory_topics, max(args.concurrency))
+        rows.append(row)
+        print(f"\n  persona_factory: {row['calls']} calls at j={row['concurrency']} "
+              f"in {row['wall']:.2f}s "
+              f"({row['calls_per_sec']:.2f} calls/s, {row['retries']} retries)")
+
+    print(f"\n[done]    mock served {state.counts['messages']} message requests "
+          f"({state.counts['429']} × 429, {state.counts['529']} × 529 injected)")
+    if args.json:
+        args.json.write_text(json.dumps(rows, indent=2), encoding="utf-8")
+        print(f"          results written to {args.json}")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
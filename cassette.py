@@ -0,0 +1,118 @@
+"""Record/replay cassettes: deterministic, network-free re-runs.
+
+A cassette is one gzip-compressed JSONL file of {"key", "text", "usage"}
+entries, keyed by response_cache.request_key() of the normalised request.
+
+  * record — every response that passes through (fresh API calls and
+    response-cache hits alike) is appended to the cassette, so one recorded
+    run captures everything a later replay needs.
+  * replay — every request is answered from the cassette and a request that
+    is not in it raises CassetteMiss; nothing reaches the network.  Inside
+    tolerant() a miss is answered with None instead, so a dry run (--plan)
+    can count the requests a replay would stop at.
+
+Cassette implements the ResponseCache interface (get / put / store), so
+main.py passes it to call_model() in place of the response cache.  Other
+clients (Gemini in idea_generator.py) use lookup() / record() with
+request_key() over their own request dict.
+
+This module has no import-time side effects so any script can use it.
+"""
+
+import gzip
+import json
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Iterator, Optional
+
+from engine import CallResult
+from response_cache import request_key
+
+MODES: tuple[str, ...] = ("record", "replay")
+
+
+class CassetteMiss(KeyError):
+    """A replayed request has no recorded response."""
+
+    def __str__(self) -> str:
+        return str(self.args[0])
+
+
+class Cassette:
+    """Request-hash → response recording, optionally in front of a ResponseCache."""
+
+    def __init__(self, path: Path, mode: str, inner: Any = None) -> None:
+        if mode not in MODES:
+            raise ValueError(f"cassette mode must be one of {MODES}, not {mode!r}")
+        if mode == "replay" and not path.exists():
+            raise FileNotFoundError(f"Cassette not found: {path}")
+        self.path = path
+        self.mode = mode
+        self.inner = inner          # record mode: the response cache, if any
+        self._entries: dict[str, dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._tolerant = False
+        if path.exists():
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        self._entries[entry["key"]] = entry
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    # --- raw interface ---
+
+    def lookup(self, key: str) -> Optional[dict[str, Any]]:
+        """Recorded {"text", "usage"} for key; in replay mode a miss raises."""
+        entry = self._entries.get(key)
+        if entry is None and self.mode == "replay" and not self._tolerant:
+            raise CassetteMiss(f"request {key[:12]}… is not in cassette {self.path}")
+        return entry
+
+    @contextmanager
+    def tolerant(self) -> Iterator[None]:
+        """Within the block, a replay miss is a plain miss (None), not CassetteMiss."""
+        self._tolerant = True
+        try:
+            yield
+        finally:
+            self._tolerant = False
+
+    def record(self, key: str, text: str, usage: dict[str, int]) -> None:
+        """Append a response (record mode only; identical re-records are skipped)."""
+        if self.mode != "record":
+            return
+        entry = {"key": key, "text": text, "usage": usage}
+        with self._lock:
+            if self._entries.get(key) == entry:
+                return
+            self._entries[key] = entry
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            # Each append is a complete gzip member; gzip readers concatenate them.
+            with gzip.open(self.path, "at", encoding="utf-8") as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+    # --- ResponseCache interface (engine.call_model, main.py) ---
+
+    def get(self, params: dict[str, Any]) -> Optional[CallResult]:
+        key = request_key(params)
+        if self.mode == "replay":
+            entry = self.lookup(key)
+            if entry is None:
+                return None
+            return CallResult(text=entry["text"], usage=entry["usage"], cached=True)
+        hit = self.inner.get(params) if self.inner is not None else None
+        if hit is not None:
+            self.record(key, hit.text, hit.usage)
+        return hit
+
+    def put(self, params: dict[str, Any], result: CallResult) -> None:
+        self.store(request_key(params), result)
+
+    def store(self, key: str, result: CallResult) -> None:
+        self.record(key, result.text, result.usage)
+        if self.inner is not None:
+            self.inner.store(key, result)
@@ -0,0 +1,64 @@
+"""Split a review context that overflows the model's window into parts.
+
+chunk() cuts the labelled documents (main.build_context) at section
+boundaries (revisions.split_sections) and packs consecutive sections into
+parts of at most `budget` tokens.  A section larger than a whole part is cut
+at paragraph breaks, then at line breaks, then mid-line as a last resort.
+Each part after the first repeats the "=== DOCUMENT ===" label it starts
+under, so a reviewer always knows which document it is reading.
+
+Stdlib only, no import-time side effects.
+"""
+
+import re
+
+from engine import CHARS_PER_TOKEN, estimate_tokens
+from revisions import FRONT_MATTER, split_sections
+
+_LABEL = re.compile(r"^=== .+ ===$", re.MULTILINE)
+
+
+def _pieces(text: str, budget: int) -> list[str]:
+    """text cut into pieces of at most budget tokens, at the coarsest break that works."""
+    if estimate_tokens(text) <= budget:
+        return [text]
+    for sep in ("\n\n", "\n"):
+        parts = text.split(sep)
+        if len(parts) > 1:
+            out, current = [], ""
+            for part in parts:
+                candidate = f"{current}{sep}{part}" if current else part
+                if current and estimate_tokens(candidate) > budget:
+                    out.append(current)
+                    candidate = part
+                current = candidate
+            out.append(current)
+            return [p for piece in out for p in _pieces(piece, budget)]
+    size = budget * CHARS_PER_TOKEN
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+def chunk(context: str, budget: int) -> list[str]:
+    """context as consecutive parts of at most ~budget tokens ([context] if it fits)."""
+    if estimate_tokens(context) <= budget:
+        return [context]
+    units = []
+    for s in split_sections(context):
+        text = s.body if s.title == FRONT_MATTER else f"{s.title}\n{s.body}"
+        # Leave room for the repeated document label at the top of a part.
+        units += _pieces(text, max(1, budget - 32))
+
+    parts: list[str] = []
+    current, label = "", ""
+    for unit in units:
+        candidate = f"{current}\n\n{unit}" if current else unit
+        if current and estimate_tokens(candidate) > budget:
+            parts.append(current)
+            # A part that starts inside a document names it again.
+            candidate = unit if unit.startswith("===") or not label else f"{label} (continued)\n{unit}"
+        current = candidate
+        labels = _LABEL.findall(unit)
+        if labels:
+            label = labels[-1]
+    parts.append(current)
+    return parts
@@ -0,0 +1,240 @@
+"""Synthesis-combination designs for Phase 2.
+
+A synthesis combo picks one review run per persona.  The full factorial
+grid has T**P combos (81 for 4 personas × 3 temperatures, 729 for 6), most
+of which differ only in which run of one persona was fed in.  The designs
+here cover the grid at a fraction of the calls:
+
+  * full        — every combo (T**P).
+  * orthogonal  — a strength-2 orthogonal array: every pair of runs from
+                  every pair of personas meets equally often (a Latin
+                  square for three personas).  9 combos for 4 × 3.  With a
+                  run count that is not a prime power (6, 10, …) every pair
+                  still meets, but not equally often.
+  * random-k    — k combos drawn uniformly without replacement (seeded).
+  * covering    — every individual review appears in at least N combos,
+                  using about N*T combos built from balanced Latin blocks.
+
+Combos are tuples of 1-based run indices, in persona order, so they map
+directly onto review file and synthesis folder names.  Every design is
+deterministic for a given seed, so a resumed run selects the same combos.
+
+reduction_tree() lays out hierarchical synthesis for large panels: personas
+are condensed in groups, groups of digests are condensed again, and the
+final synthesis merges at most `fanout` inputs.
+
+This module has no import-time side effects so any script can use it.
+"""
+
+import itertools
+import random
+from typing import Optional
+
+Combo = tuple[int, ...]
+Span = tuple[int, int]          # persona indices [start, stop)
+
+STRATEGIES: tuple[str, ...] = ("full", "orthogonal", "random-k", "covering")
+
+
+def full_factorial(levels: int, factors: int) -> list[Combo]:
+    return list(itertools.product(range(1, levels + 1), repeat=factors))
+
+
+def _prime_power(n: int) -> Optional[tuple[int, int]]:
+    """(p, m) with n == p**m for a prime p, or None."""
+    for p in range(2, n + 1):
+        if n % p == 0:
+            m = 0
+            while n % p == 0:
+                n, m = n // p, m + 1
+            return (p, m) if n == 1 else None
+    return None
+
+
+def _poly_mod(a: list[int], mod: list[int], p: int) -> list[int]:
+    """Remainder of polynomial a by monic mod over GF(p) (coefficients low → high)."""
+    a = list(a)
+    while len(a) >= len(mod):
+        c = a.pop()
+        shift = len(a) - len(mod) + 1
+        for i, m in enumerate(mod[:-1]):
+            a[shift + i] = (a[shift + i] - c * m) % p
+    return a
+
+
+def _irreducible(p: int, m: int) -> list[int]:
+    """The first monic irreducible polynomial of degree m over GF(p)."""
+    for tail in itertools.product(range(p), repeat=m):
+        poly = [*tail, 1]
+        if all(any(_poly_mod(poly, [*d, 1], p))
+               for deg in range(1, m // 2 + 1) for d in itertools.product(range(p), repeat=deg)):
+            return poly
+    raise ValueError(f"no irreducible polynomial of degree {m} over GF({p})")
+
+
+def _field(q: int) -> tuple[list[list[int]], list[list[int]]]:
+    """(addition, multiplication) tables of GF(q), elements 0..q-1 (0 and 1 as usual).
+
+    GF(p**m) elements are polynomials over GF(p) of degree < m, encoded by
+    their base-p digits.
+    """
+    p, m = _prime_power(q)
+    digits = [[(a // p ** i) % p for i in range(m)] for a in range(q)]
+
+    def encode(poly: list[int]) -> int:
+        return sum(c * p ** i for i, c in enumerate(poly))
+
+    mod = _irreducible(p, m) if m > 1 else [0, 1]
+    add = [[encode([(x + y) % p for x, y in zip(digits[a], digits[b])]) for b in range(q)]
+           for a in range(q)]
+    mul = []
+    for a in range(q):
+        row = []
+        for b in range(q):
+            prod = [0] * (2 * m - 1)
+            for i, x in enumerate(digits[a]):
+                for j, y in enumerate(digits[b]):
+                    prod[i + j] = (prod[i + j] + x * y) % p
+            row.append(encode(_poly_mod(prod, mod, p)))
+        mul.append(row)
+    return add, mul
+
+
+def balanced(levels: int) -> bool:
+    """True when orthogonal_array(levels, …) meets every pair equally often."""
+    return levels <= 1 or _prime_power(levels) is not None
+
+
+def orthogonal_array(levels: int, factors: int) -> list[Combo]:
+    """Strength-2 array over `levels` symbols for `factors` columns.
+
+    Rao–Hamming construction over GF(q): rows are all vectors x in GF(q)^t,
+    columns are the (q^t - 1)/(q - 1) projective points v, entries x·v.
+    For a prime-power `levels` (2, 3, 4, 5, 7, 8, 9, …) q = levels and every
+    pair of symbols meets equally often in every pair of columns.  Otherwise
+    the array is built over the next prime power and its symbols collapsed
+    onto `levels` with mod: every pair still meets, with uneven counts
+    (see balanced()).
+    """
+    if levels <= 1 or factors <= 1:
+        return full_factorial(levels, factors)
+    q = levels
+    while _prime_power(q) is None:
+        q += 1
+    add, mul = _field(q)
+    t = 2
+    while (q ** t - 1) // (q - 1) < factors:
+        t += 1
+    # Projective points: nonzero vectors whose first nonzero coordinate is 1.
+    points = [v for v in itertools.product(range(q), repeat=t)
+              if any(v) and v[next(i for i, c in enumerate(v) if c)] == 1]
+    columns = points[:factors]
+    rows: dict[Combo, None] = {}
+    for x in itertools.product(range(q), repeat=t):
+        row = []
+        for v in columns:
+            entry = 0
+            for a, b in zip(x, v):
+                entry = add[entry][mul[a][b]]
+            row.append(entry % levels + 1)
+        rows.setdefault(tuple(row), None)
+    return list(rows)
+
+
+def random_k(levels: int, factors: int, k: int, seed: int = 0) -> list[Combo]:
+    """k distinct combos sampled uniformly (without building the full grid)."""
+    total = levels ** factors
+    picks = random.Random(seed).sample(range(total), min(k, total))
+    combos = []
+    for index in sorted(picks):
+        digits = []
+        for _ in range(factors):
+            index, d = divmod(index, levels)
+            digits.append(d + 1)
+        combos.append(tuple(reversed(digits)))
+    return combos
+
+
+def covering(levels: int, factors: int, min_count: int, seed: int = 0) -> list[Combo]:
+    """Combos in which every (persona, run) appears at least min_count times.
+
+    Built from Latin blocks: block b assigns persona j the run (i + b*j) mod T
+    in its i-th row, so each block gives every review exactly one
+    appearance.  Blocks that would repeat combos are replaced by shuffled
+    ones.
+    """
+    if levels <= 1:
+        return full_factorial(levels, factors)
+    rng = random.Random(seed)
+    total = levels ** factors
+    chosen: dict[Combo, None] = {}
+    counts = [[0] * levels for _ in range(factors)]
+    b = 0
+    while min(min(c) for c in counts) < min_count and len(chosen) < total:
+        if b < levels:
+            shifts = [b * j for j in range(factors)]
+        else:
+            shifts = [rng.randrange(levels) for _ in range(factors)]
+        for i in range(levels):
+            combo = tuple((i + s) % levels + 1 for s in shifts)
+            if combo not in chosen:
+                chosen[combo] = None
+                for j, r in enumerate(combo):
+                    counts[j][r - 1] += 1
+        b += 1
+    return list(chosen)
+
+
+def reduction_tree(factors: int, fanout: int) -> list[list[Span]]:
+    """Intermediate levels of a synthesis tree over `factors` personas.
+
+    Level 0 groups consecutive personas `fanout` at a time; each later level
+    groups the spans of the one below, until at most `fanout` remain for the
+    final synthesis.  Empty when a flat synthesis already fits (or fanout < 2).
+    """
+    levels: list[list[Span]] = []
+    nodes: list[Span] = [(i, i + 1) for i in range(factors)]
+    while fanout >= 2 and len(nodes) > fanout:
+        nodes = [(group[0][0], group[-1][1])
+                 for group in (nodes[i:i + fanout] for i in range(0, len(nodes), fanout))]
+        levels.append(nodes)
+    return levels
+
+
+def children(levels: list[list[Span]], level: int, span: Span) -> list[Span]:
+    """Inputs of a node at `level` (len(levels) is the final synthesis)."""
+    if level == 0:
+        return [(i, i + 1) for i in range(*span)]
+    return [s for s in levels[level - 1] if span[0] <= s[0] and s[1] <= span[1]]
+
+
+def select(strategy: str, levels: int, factors: int, k: Optional[int] = None,
+           min_count: int = 1, seed: int = 0) -> list[Combo]:
+    """Combos for a named design; see STRATEGIES."""
+    if strategy == "full":
+        return full_factorial(levels, factors)
+    if strategy == "orthogonal":
+        return orthogonal_array(levels, factors)
+    if strategy == "random-k":
+        if not k:
+            raise ValueError("random-k needs k (--combo-k)")
+        return random_k(levels, factors, k, seed)
+    if strategy == "covering":
+        return covering(levels, factors, min_count, seed)
+    raise ValueError(f"unknown combo strategy {strategy!r}; expected one of {STRATEGIES}")
+
+
+def describe(strategy: str, k: Optional[int] = None, min_count: int = 1, seed: int = 0,
+             levels: Optional[int] = None) -> str:
+    """One-line description of a design over `levels` runs, for RUN_CONFIG.md."""
+    if strategy == "orthogonal":
+        if levels is not None and not balanced(levels):
+            return ("orthogonal array (strength 2, collapsed: every pair of runs across "
+                    f"personas co-occurs, not equally often — {levels} runs is not a prime power)")
+        return ("orthogonal array (strength 2: every pair of runs across personas co-occurs "
+                "equally often)")
+    if strategy == "random-k":
+        return f"random-k (k={k}, seed={seed})"
+    if strategy == "covering":
+        return f"covering (every review appears in ≥{min_count} syntheses, seed={seed})"
+    return "full factorial (every combination)"
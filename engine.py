@@ -0,0 +1,264 @@
+"""Request engine shared by the Gauntlet scripts.
+
+Every Messages API call goes through call_model(), which takes the request
+parameters as a plain dict (so the same dict can be logged, hashed, or
+submitted in a batch) and returns the text plus normalised token usage.
+
+Response caching: pass a response_cache.ResponseCache to call_model() and
+identical requests are served from disk instead of the API.
+
+Streaming: pass stream_to=<path> to call_model() to write tokens to disk as
+they arrive and record time-to-first-token and tokens/sec.
+
+Rate limiting: pass a rate_limiter.RateLimiter shared by all threads so
+dispatch adapts to the org's limits as reported in response headers.
+
+Prompt caching: build content with text_block(..., cache=True) to put a
+cache breakpoint after a large invariant prefix (paper text, synthesiser
+persona, leading reviews).  Later calls that share that prefix read it from
+the cache instead of paying for it as fresh input.
+
+This module has no import-time side effects so any script can use it.
+"""
+
+import random
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+import anthropic
+
+# Marks the end of a cacheable prefix (5-minute TTL, refreshed on each hit).
+CACHE_CONTROL: dict[str, str] = {"type": "ephemeral"}
+
+# Retries after throttling / transient failures when call_model() manages
+# retries itself (i.e. when given a rate limiter).
+DEFAULT_RETRIES: int = 5
+THROTTLE_STATUS: frozenset[int] = frozenset({429, 529})
+TRANSIENT_STATUS: frozenset[int] = frozenset({500, 502, 503, 504})
+
+# Rough size heuristic used before a request is sent (no tokenizer needed).
+CHARS_PER_TOKEN: int = 4
+
+USAGE_FIELDS: tuple[str, ...] = (
+    "input_tokens",
+    "output_tokens",
+    "cache_read_input_tokens",
+    "cache_creation_input_tokens",
+)
+
+
+def text_block(text: str, cache: bool = False) -> dict[str, Any]:
+    """A text content block, optionally closing a cacheable prefix."""
+    block: dict[str, Any] = {"type": "text", "text": text}
+    if cache:
+        block["cache_control"] = CACHE_CONTROL
+    return block
+
+
+@dataclass
+class CallResult:
+    text: str
+    usage: dict[str, int] = field(default_factory=dict)
+    latency: float = 0.0
+    cached: bool = False            # served from a ResponseCache, no API call made
+    ttft: Optional[float] = None    # time to first token (streamed calls only)
+    retries: int = 0                # attempts beyond the first
+    batch: bool = False             # answered by the Message Batches API
+
+    @property
+    def tokens_per_sec(self) -> Optional[float]:
+        """Output rate after the first token (streamed calls only)."""
+        if self.ttft is None or self.latency <= self.ttft:
+            return None
+        return self.usage.get("output_tokens", 0) / (self.latency - self.ttft)
+
+
+def usage_dict(usage: Any) -> dict[str, int]:
+    """Flatten an SDK usage object into {field: tokens}, missing fields → 0."""
+    return {k: int(getattr(usage, k, 0) or 0) for k in USAGE_FIELDS}
+
+
+def content_text(content: Any) -> str:
+    """Concatenated text of a string or a list of content blocks."""
+    if isinstance(content, str):
+        return content
+    return "".join(b.get("text", "") for b in content or [] if isinstance(b, dict))
+
+
+def estimate_tokens(text: str) -> int:
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def estimate_request_tokens(params: dict[str, Any]) -> tuple[int, int]:
+    """(input, output) token footprint of a request before it is sent.
+
+    Input is a character-count estimate; output is max_tokens, which is
+    what the output-tokens limit is charged against up front.
+    """
+    text = content_text(params.get("system", ""))
+    text += "".join(content_text(m.get("content")) for m in params.get("messages", []))
+    return estimate_tokens(text), int(params.get("max_tokens", 0))
+
+
+def call_model(client: Any, params: dict[str, Any], cache: Any = None,
+               stream_to: Optional[Path] = None, limiter: Any = None,
+               retries: int = DEFAULT_RETRIES,
+               gate: Optional[Callable[[], bool]] = None) -> Optional[CallResult]:
+    """Issue one Messages API request and return its text and usage.
+
+    With a cache (see response_cache.ResponseCache), an identical earlier
+    request is answered from disk and fresh responses are stored.
+
+    With stream_to, the response is streamed: text is appended to
+    <stream_to>.partial as it arrives and the file is atomically renamed to
+    stream_to on completion.  An interrupted generation leaves the .partial
+    file behind instead of losing everything.
+
+    With a limiter (see rate_limiter.RateLimiter), dispatch waits for the
+    shared token buckets, retries are handled here instead of by the SDK so
+    every 429/529 feeds back into the limiter, and the response's
+    rate-limit headers resynchronise it.
+
+    With a gate, the request goes out only if gate() returns True once it
+    may be dispatched (after any wait for the limiter); otherwise the slot
+    is given back and None is returned.  Callers use it to take a lock only
+    when the request is actually about to be sent.
+    """
+    if cache is not None:
+        hit = cache.get(params)
+        if hit is not None:
+            return hit
+    if limiter is None:
+        if gate is not None and not gate():
+            return None
+        result, _ = _send(client, params, stream_to)
+    else:
+        result = _send_limited(client, params, stream_to, limiter, retries, gate)
+        if result is None:
+            return None
+    if cache is not None:
+        cache.put(params, result)
+    return result
+
+
+def _send(client: Any, params: dict[str, Any],
+          stream_to: Optional[Path]) -> tuple[CallResult, Any]:
+    """One attempt.  Returns the result and the HTTP response headers."""
+    if stream_to is not None:
+        return _stream_to_file(client, params, stream_to)
+    start = time.monotonic()
+    raw = client.messages.with_raw_response.create(**params)
+    resp = raw.parse()
+    result = CallResult(
+        text=resp.content[0].text,
+        usage=usage_dict(resp.usage),
+        latency=time.monotonic() - start,
+    )
+    return result, raw.headers
+
+
+def _backoff(attempt: int) -> float:
+    return min(60.0, 2.0 ** attempt) + random.uniform(0, 1)
+
+
+def _retry_after(headers: Any) -> Optional[float]:
+    try:
+        return float(headers.get("retry-after")) if headers is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _send_limited(client: Any, params: dict[str, Any], stream_to: Optional[Path],
+                  limiter: Any, retries: int,
+                  gate: Optional[Callable[[], bool]] = None) -> Optional[CallResult]:
+    api = client.with_options(max_retries=0)
+    est = estimate_request_tokens(params)
+    for attempt in range(retries + 1):
+        limiter.acquire(*est)
+        try:
+            if attempt == 0 and gate is not None and not gate():
+                limiter.cancelled(est)
+                return None
+            result, headers = _send(api, params, stream_to)
+        except anthropic.APIStatusError as e:
+            headers = e.response.headers
+            if e.status_code in THROTTLE_STATUS and attempt < retries:
+                limiter.throttled(_retry_after(headers) or _backoff(attempt), headers, est)
+                continue
+            limiter.failed(est)
+            if e.status_code in TRANSIENT_STATUS and attempt < retries:
+                time.sleep(_backoff(attempt))
+                continue
+            raise
+        except anthropic.APIConnectionError:
+            limiter.failed(est)
+            if attempt < retries:
+                time.sleep(_backoff(attempt))
+                continue
+            raise
+        except BaseException:
+            limiter.failed(est)
+            raise
+        usage = result.usage
+        limiter.release(headers, est, (usage["input_tokens"] + usage["cache_creation_input_tokens"],
+                                       usage["output_tokens"]))
+        result.retries = attempt
+        return result
+    raise AssertionError("unreachable")
+
+
+def _stream_to_file(client: Any, params: dict[str, Any], path: Path) -> tuple[CallResult, Any]:
+    partial = path.with_name(path.name + ".partial")
+    partial.parent.mkdir(parents=True, exist_ok=True)
+    chunks: list[str] = []
+    ttft: Optional[float] = None
+    start = time.monotonic()
+    with client.messages.stream(**params) as stream, partial.open("w", encoding="utf-8") as f:
+        headers = stream.response.headers
+        for text in stream.text_stream:
+            if ttft is None:
+                ttft = time.monotonic() - start
+            chunks.append(text)
+            f.write(text)
+            f.flush()
+        final = stream.get_final_message()
+        if final.stop_reason is None:
+            # The connection closed before message_stop: keep the .partial, retry or fail.
+            raise anthropic.APIConnectionError(message="stream ended before message_stop",
+                                               request=stream.response.request)
+    latency = time.monotonic() - start
+    partial.replace(path)
+    return CallResult(text="".join(chunks), usage=usage_dict(final.usage),
+                      latency=latency, ttft=ttft), headers
+
+
+def format_usage(usage: dict[str, int]) -> str:
+    """Compact one-line usage summary for progress output."""
+    return (f"in={usage.get('input_tokens', 0):,} out={usage.get('output_tokens', 0):,} "
+            f"cache r/w={usage.get('cache_read_input_tokens', 0):,}"
+            f"/{usage.get('cache_creation_input_tokens', 0):,}")
+
+
+def format_result(result: CallResult) -> str:
+    """format_usage() plus latency, and TTFT / tokens-per-second when streamed."""
+    line = f"{format_usage(result.usage)} {result.latency:.1f}s"
+    if result.ttft is not None:
+        line += f" ttft={result.ttft:.2f}s"
+    if result.tokens_per_sec is not None:
+        line += f" {result.tokens_per_sec:.0f} tok/s"
+    return line
+
+
+def result_fields(result: CallResult) -> dict[str, Any]:
+    """Keyword arguments for run_ledger.RunLedger.record() describing result."""
+    return {
+        "usage": result.usage,
+        "latency": result.latency,
+        "ttft": result.ttft,
+        "tokens_per_sec": result.tokens_per_sec,
+        "retries": result.retries,
+        "cached": result.cached,
+        "batch": result.batch,
+    }
@@ -0,0 +1,122 @@
+"""Gauntlet multi-run entry point: paper sweeps and queue workers.
+
+`sweep` reviews every paper in a manifest — a directory of proposals, or a
+JSONL file of {"proposal", "call", "name"} objects — into its own output
+tree, non-interactively, on one shared scheduler and rate budget, so Phase 1
+of the next paper overlaps Phase 2 of the current one:
+
+    python gauntlet.py sweep submissions/ --call inputs/placeholder.pdf -o nightly/
+    python gauntlet.py sweep sweep.jsonl -c config_mlsys.toml -j 8 --rpm 50
+    python gauntlet.py sweep papers/ --call inputs/placeholder.pdf \
+        -c config_base.toml -c config_archresearch.toml
+
+It takes main.py's run options (config, combo design, limits, cache, …);
+-c may be repeated to sweep several persona panels, each into its own
+subdirectory, paying only once for a persona the panels share.
+
+`main.py --queue` and `persona_factory.py --queue` put their jobs in
+<output dir>/queue.sqlite and start working them.  Any number of extra
+workers — more processes on this machine, or other machines that see the
+same output directory — join with:
+
+    python gauntlet.py worker outputs/
+    python gauntlet.py worker outputs/ -j 8
+    python gauntlet.py status outputs/
+
+A worker replays the argv the run was queued with (config, papers, combo
+design, …), so it plans exactly the same jobs, then claims them one lease
+at a time until nothing is left.  See job_queue.py.
+"""
+
+import argparse
+import importlib
+import sys
+from pathlib import Path
+
+import main as gauntlet
+from job_queue import QUEUE_FILE, JobQueue
+
+# Scripts that can queue a run; each exposes queue_worker(queue, out_dir, concurrency).
+SCRIPTS: tuple[str, ...] = ("main", "persona_factory")
+
+
+def open_queue(out_dir: Path) -> JobQueue:
+    path = out_dir / QUEUE_FILE
+    if not path.exists():
+        sys.exit(f"ERROR: no {QUEUE_FILE} in {out_dir}. Start the run with --queue first.")
+    return JobQueue(path)
+
+
+def cmd_worker(args: argparse.Namespace) -> None:
+    queue = open_queue(args.out_dir)
+    script = queue.get_meta("script")
+    if script not in SCRIPTS:
+        sys.exit(f"ERROR: {queue.path} was queued by unknown script {script!r}.")
+    print(f"[worker]  joining {script}.py run in {args.out_dir}\n")
+    module = importlib.import_module(script)
+    if not module.queue_worker(queue, args.out_dir.resolve(), args.concurrency):
+        sys.exit("ERROR: the run has failed or blocked jobs (see `gauntlet.py status`).")
+    print("\n[done]    queue drained")
+
+
+def cmd_status(args: argparse.Namespace) -> None:
+    queue = open_queue(args.out_dir)
+    counts = queue.summary()
+    print(f"[status]  {queue.path}  ({queue.get_meta('script')}.py)")
+    print("          " + "  ".join(f"{state}={n}" for state, n in counts.items()))
+    for key, error in queue.failures().items():
+        print(f"  [error]   {key}: {error}")
+
+
+def cmd_sweep(args: argparse.Namespace) -> None:
+    if args.batch or args.queue:
+        sys.exit("ERROR: --batch and --queue are not supported in a sweep.")
+    try:
+        papers = gauntlet.load_manifest(args.manifest, args.call)
+    except (OSError, KeyError, ValueError) as e:
+        sys.exit(f"ERROR: bad manifest {args.manifest}: {e}")
+    if not papers:
+        sys.exit(f"ERROR: no papers in {args.manifest}.")
+    # Panels run one after another, so a persona shared with an earlier
+    # panel finds its reviews in the review store and only synthesis reruns.
+    configs = args.config or [gauntlet.BASE_DIR / "config.toml"]
+    failed = []
+    for config in configs:
+        run = argparse.Namespace(**vars(args))
+        run.config = config
+        if len(configs) > 1:
+            run.output = args.output / config.stem
+            print(f"\n[config]  {config.name}\n")
+        if not gauntlet.sweep(run, papers):
+            failed.append(config.name)
+        print(f"\n[done]    {len(papers)} paper(s) — summary in {run.output / 'SWEEP.md'}")
+    if failed:
+        sys.exit(f"ERROR: some papers did not complete under {', '.join(failed)} "
+                 "(see SWEEP.md). Re-run the same command to resume.")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Gauntlet paper sweeps and queue workers")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sweep = sub.add_parser("sweep", help="review every paper in a manifest on one shared budget")
+    sweep.add_argument("manifest", type=Path,
+                       help='directory of proposals, or JSONL of {"proposal", "call", "name"}')
+    sweep.add_argument("--call", type=Path, default=None,
+                       help="call / solicitation for papers that do not name one "
+                            "(e.g. inputs/placeholder.pdf)")
+    gauntlet.add_run_options(sweep, multi_config=True)
+    sweep.set_defaults(func=cmd_sweep)
+    worker = sub.add_parser("worker", help="claim and run jobs until the queue is drained")
+    worker.add_argument("out_dir", type=Path, help="output directory of a --queue run")
+    worker.add_argument("-j", "--concurrency", type=int, default=None,
+                        help="jobs in flight in this worker (default: the run's setting)")
+    worker.set_defaults(func=cmd_worker)
+    status = sub.add_parser("status", help="show job counts and failures")
+    status.add_argument("out_dir", type=Path, help="output directory of a --queue run")
+    status.set_defaults(func=cmd_status)
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
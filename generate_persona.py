@@ -2,12 +2,14 @@ import os
 import sys
 import argparse
 import json
-import requests
-from bs4 import BeautifulSoup
 from anthropic import Anthropic
 from dotenv import load_dotenv
 from pathlib import Path
 
+from engine import call_model, result_fields
+from run_ledger import RunLedger, write_stats
+from web_fetch import Fetcher
+
 # Load environment variables
 load_dotenv()
 
@@ -21,36 +23,22 @@ if not ANTHROPIC_API_KEY:
 
 client = Anthropic(api_key=ANTHROPIC_API_KEY)
 
+MODEL = "claude-sonnet-4-5-20250929"  # Latest Sonnet, excellent for persona generation
+
+# Per-call latency / tokens / cost, summarised in generate_persona_RUN_STATS.md
+LEDGER_PATH = Path(__file__).resolve().parent / "logs" / "generate_persona.jsonl"
+LEDGER = RunLedger(LEDGER_PATH)
+
+# Bio pages: one pooled session, fetched concurrently in batch mode, and kept
+# in an HTTP cache (ETag / Last-Modified) next to the Gauntlet response cache.
+CACHE_DIR = Path(os.getenv("GAUNTLET_CACHE_DIR", Path(__file__).resolve().parent / ".gauntlet_cache"))
+FETCHER = None  # web_fetch.Fetcher, built in main()
+
 def scrape_bio_data(url):
     """
     Fetches and cleans text content from a URL to use as context for the persona.
     """
-    print(f"🕵️  Scraping context from: {url}...")
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-    }
-    
-    try:
-        response = requests.get(url, headers=headers, timeout=10)
-        response.raise_for_status()
-        soup = BeautifulSoup(response.content, 'html.parser')
-        
-        # Strip out script and style elements
-        for script in soup(["script", "style", "nav", "footer"]):
-            script.decompose()
-            
-        text = soup.get_text(separator=' ')
-        # Clean up whitespace
-        lines = (line.strip() for line in text.splitlines())
-        chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
-        text = '\n'.join(chunk for chunk in chunks if chunk)
-        
-        # Truncate if massively long (Gemini has a huge context, but let's be safe)
-        return text[:20000] 
-        
-    except Exception as e:
-        print(f"⚠️  Could not scrape URL: {e}")
-        return None
+    return FETCHER.fetch(url)
 
 def generate_system_prompt(name, expertise, bio_text):
     """
@@ -77,22 +65,24 @@ Start the output with: "**System Prompt:** You are {name}..."
 
 The persona should be detailed, capturing their unique perspective and expertise."""
 
-    response = client.messages.create(
-        model="claude-sonnet-4-5-20250929",  # Latest Sonnet, excellent for persona generation
-        max_tokens=4096,
-        messages=[
+    result = call_model(client, {
+        "model": MODEL,
+        "max_tokens": 4096,
+        "messages": [
             {"role": "user", "content": meta_prompt}
         ]
-    )
+    })
+    LEDGER.record("persona", MODEL, name=name, **result_fields(result))
 
-    return response.content[0].text
+    return result.text
 
-def generate_single_persona(name, expertise, url):
-    """Generate a single persona."""
+def generate_single_persona(name, expertise, url, bio_text=None):
+    """Generate a single persona (bio_text: the page at url, if already fetched)."""
     print(f"\n📝 Generating persona for: {name}")
 
     # Scrape
-    bio_text = scrape_bio_data(url) if url else None
+    if bio_text is None and url:
+        bio_text = scrape_bio_data(url)
     if not bio_text:
         bio_text = "No bio provided. Please infer based on general knowledge of this person."
 
@@ -160,8 +150,12 @@ Config file format (persona_config.json):
                         help='Area of expertise (for single persona generation)')
     parser.add_argument('-u', '--url', type=str,
                         help='URL for bio/wiki/lab page (for single persona generation)')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='re-download bio pages instead of using the HTTP cache')
 
     args = parser.parse_args()
+    global FETCHER
+    FETCHER = Fetcher(None if args.no_cache else CACHE_DIR / "http")
 
     print("--- 🧬 Gauntlet Persona Generator 🧬 ---\n")
 
@@ -171,6 +165,9 @@ Config file format (persona_config.json):
         personas = load_personas_from_config(args.config)
         print(f"Found {len(personas)} persona(s) to generate\n")
 
+        # Fetch every bio page up front, concurrently
+        bios = FETCHER.fetch_all([spec.get('url', '') for spec in personas])
+
         for i, persona_spec in enumerate(personas, 1):
             print(f"[{i}/{len(personas)}]", end=" ")
             name = persona_spec.get('name')
@@ -181,7 +178,7 @@ Config file format (persona_config.json):
                 print(f"⚠️  Skipping invalid entry: {persona_spec}")
                 continue
 
-            generate_single_persona(name, expertise, url)
+            generate_single_persona(name, expertise, url, bios.get(url) or "")
 
         print(f"\n🎉 Generated {len(personas)} personas successfully!")
 
@@ -200,6 +197,7 @@ Config file format (persona_config.json):
 
         generate_single_persona(name, expertise, url)
 
+    write_stats(LEDGER_PATH, LEDGER_PATH.with_name("generate_persona_RUN_STATS.md"))
     print("\n------------------------------------------")
     print("Done! Personas are in the personas/ directory")
 
@@ -3,23 +3,50 @@
 Reads a baseline PDF and a seed idea (from the project config), assembles a
 system prompt from the full persona collection, and asks Gemini to produce a
 Markdown research kernel.  Automatically generates both idea_kernel.md and
-idea_kernel.pdf (requires markdown-pdf package).
+idea_kernel.pdf (requires markdown-pdf package).  The call's latency, tokens
+and cost go to ledger.jsonl / RUN_STATS.md in the output directory.
+--record / --replay capture the response in a cassette (cassette.py) and
+regenerate the same kernel from it offline, without uploading the PDF.
+
+The uploaded PDF is remembered by content hash (UPLOADS_FILE), so later
+runs reuse the remote file until shortly before Gemini expires it instead
+of uploading and waiting for processing again.  Several configs (-c
+a.toml -c b.toml) and/or a `seeds = [...]` list produce one kernel each,
+generated concurrently (-j) against that single upload, into <output>/<config>[_seed<k>]/.
+
+--digest-personas replaces each persona's full text in the system prompt
+with a short digest of its evaluation criteria and pet peeves, written once
+per persona version by DIGEST_MODEL and cached under <cache>/persona_digests/.
 
 Usage:
     python idea_generator.py baseline.pdf
     python idea_generator.py -c config_archresearch.toml baseline.pdf
     python idea_generator.py -c config_archresearch.toml -o output_dir/ baseline.pdf
+    python idea_generator.py -c config_a.toml -c config_b.toml -j 4 baseline.pdf
+    python idea_generator.py --replay idea.jsonl.gz baseline.pdf
 """
 
 import argparse
+import functools
+import hashlib
+import json
 import os
 import sys
+import threading
 import time
 import tomllib
+from dataclasses import dataclass
 from pathlib import Path
+from typing import Any, Optional
 
 import google.generativeai as genai
 from dotenv import load_dotenv
+from google.api_core import exceptions as google_exceptions
+
+from cassette import Cassette, CassetteMiss, request_key
+from ingest import file_sha256
+from run_ledger import RunLedger, write_stats
+from scheduler import DagScheduler
 
 # ---------------------------------------------------------------------------
 # Configuration
@@ -28,6 +55,36 @@ BASE_DIR = Path(__file__).resolve().parent
 load_dotenv(BASE_DIR / ".env")
 
 MODEL_NAME = "gemini-2.5-pro"
+GENERATION_TEMP: float = 0.7
+
+# Kernels generated at once when there are several seeds / configs (-j).
+MAX_CONCURRENCY: int = 4
+
+# Remote files of earlier uploads, by PDF hash (shared with the response cache).
+CACHE_DIR: Path = Path(os.getenv("GAUNTLET_CACHE_DIR", BASE_DIR / ".gauntlet_cache"))
+UPLOADS_FILE: Path = CACHE_DIR / "gemini_uploads.json"
+
+# A remembered upload is reused only if it outlives the run by this much.
+UPLOAD_REUSE_MARGIN: float = 3600.0
+
+# Processing status polls: exponential back-off, then give up.
+POLL_INITIAL: float = 0.5
+POLL_MAX: float = 10.0
+POLL_TIMEOUT: float = 600.0
+
+_UPLOADS_LOCK = threading.Lock()
+
+# --digest-personas: compact adversary summaries, one cached file per persona text.
+DIGEST_MODEL: str = "gemini-2.5-flash"
+DIGEST_DIR: Path = CACHE_DIR / "persona_digests"
+DIGEST_PROMPT: str = """You condense reviewer personas for a proposal writer who must anticipate their objections.
+Summarise the persona below in at most 200 words of Markdown bullets, in this order:
+- **Who:** one line — role and field.
+- **Evaluation criteria:** what they scrutinise, most important first.
+- **Pet peeves / red flags:** what makes them reject or score down.
+- **Questions they will ask:** two or three, in their voice.
+Keep their specific jargon and thresholds; drop biography, tone instructions and formatting rules.
+Output only the bullets."""
 
 
 # ---------------------------------------------------------------------------
@@ -49,30 +106,101 @@ def load_persona(name: str) -> str:
     return text
 
 
-def upload_to_gemini(path: Path, mime_type: str = "application/pdf"):
-    """Upload a file to Gemini and wait for it to finish processing."""
-    print(f"  uploading '{path}'…", end="", flush=True)
-    file = genai.upload_file(str(path), mime_type=mime_type)
+def wait_until_active(file):
+    """Poll a file until Gemini has processed it, backing off exponentially."""
+    delay, deadline = POLL_INITIAL, time.monotonic() + POLL_TIMEOUT
     while file.state.name == "PROCESSING":
+        if time.monotonic() > deadline:
+            raise TimeoutError(f"{file.name} still processing after {POLL_TIMEOUT:.0f}s")
         print(".", end="", flush=True)
-        time.sleep(1)
+        time.sleep(delay)
+        delay = min(delay * 2, POLL_MAX)
         file = genai.get_file(file.name)
     if file.state.name == "FAILED":
         raise ValueError(f"Upload failed: {file.state.name}")
+    return file
+
+
+def _uploads() -> dict[str, dict[str, Any]]:
+    try:
+        return json.loads(UPLOADS_FILE.read_text(encoding="utf-8"))
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def _remember_upload(key: str, file) -> None:
+    with _UPLOADS_LOCK:
+        uploads = {k: v for k, v in _uploads().items() if v["expires"] > time.time()}
+        uploads[key] = {"name": file.name, "expires": file.expiration_time.timestamp()}
+        UPLOADS_FILE.parent.mkdir(parents=True, exist_ok=True)
+        tmp = UPLOADS_FILE.with_name(f"{UPLOADS_FILE.name}.{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(uploads, indent=1), encoding="utf-8")
+        tmp.replace(UPLOADS_FILE)
+
+
+def _reusable_upload(key: str):
+    """The remembered remote file for key, if Gemini still has it long enough."""
+    entry = _uploads().get(key)
+    if entry is None or entry["expires"] < time.time() + UPLOAD_REUSE_MARGIN:
+        return None
+    try:
+        file = genai.get_file(entry["name"])
+    except google_exceptions.GoogleAPIError:
+        return None                 # deleted, or uploaded with another key
+    if file.state.name not in ("ACTIVE", "PROCESSING"):
+        return None
+    return file
+
+
+def upload_to_gemini(path: Path, api_key: str, mime_type: str = "application/pdf"):
+    """Upload a file to Gemini (or reuse an earlier upload of the same content)
+    and wait for it to finish processing."""
+    account = hashlib.sha256(api_key.encode("utf-8")).hexdigest()[:12]
+    key = f"{account}:{file_sha256(path)}"
+    file = _reusable_upload(key)
+    if file is not None:
+        print(f"  reusing upload {file.name}…", end="", flush=True)
+    else:
+        print(f"  uploading '{path}'…", end="", flush=True)
+        file = genai.upload_file(str(path), mime_type=mime_type)
+    file = wait_until_active(file)
+    _remember_upload(key, file)
     print("  ready.")
     return file
 
 
-def build_system_prompt(personas: list[str], synthesizer: str) -> str:
+def gemini_usage(response) -> dict[str, int]:
+    """Map Gemini usage metadata onto the ledger's token fields.
+
+    Thinking tokens are billed as output; context-cache hits are reported
+    inside the prompt count, so they are split out as cache reads.
+    """
+    meta = response.usage_metadata
+    cached = getattr(meta, "cached_content_token_count", 0) or 0
+    return {
+        "input_tokens": (meta.prompt_token_count or 0) - cached,
+        "output_tokens": (meta.candidates_token_count or 0)
+                         + (getattr(meta, "thoughts_token_count", 0) or 0),
+        "cache_read_input_tokens": cached,
+        "cache_creation_input_tokens": 0,
+    }
+
+
+def build_system_prompt(personas: list[str], synthesizer: str,
+                        digests: Optional[dict[str, str]] = None) -> str:
     """Assemble the Originator system prompt from the persona collection.
 
-    Each persona's full .md content is injected as an adversary block so the
-    Originator knows exactly what critiques are coming in the Gauntlet.
+    Each persona's full .md content (or, with digests, its digest) is
+    injected as an adversary block so the Originator knows exactly what
+    critiques are coming in the Gauntlet.
     """
+    def adversary(name: str) -> str:
+        return digests[name] if digests is not None else load_persona(name)
+
     sections = []
     for name in personas:
-        sections.append(f"--- {name} ---\n{load_persona(name)}\n")
-    sections.append(f"--- Synthesizer ({synthesizer}) ---\n{load_persona(synthesizer)}\n")
+        sections.append(f"--- {name} ---\n{adversary(name)}\n")
+    sections.append(f"--- Synthesizer ({synthesizer}) ---\n{adversary(synthesizer)}\n")
     adversaries_block = "\n".join(sections)
 
     return f"""**ROLE:**
@@ -108,71 +236,193 @@ Rigorous, specific, and ambitious.  Avoid vague marketing fluff."""
 
 
 # ---------------------------------------------------------------------------
-# Entry point
+# Persona digests (--digest-personas)
 # ---------------------------------------------------------------------------
 
-def main() -> None:
-    parser = argparse.ArgumentParser(
-        description="Gauntlet Idea Generator — produce a research kernel"
-    )
-    parser.add_argument("baseline_pdf", type=Path,
-                        help="baseline / prior-art PDF")
-    parser.add_argument("-c", "--config", type=Path, default=BASE_DIR / "config.toml",
-                        help="project config file (default: <script dir>/config.toml)")
-    parser.add_argument("-o", "--output", type=Path, default=Path("."),
-                        help="output directory (default: current directory)")
-    args = parser.parse_args()
-
-    # --- Config ---
-    with open(args.config, "rb") as f:
-        cfg = tomllib.load(f)
-    personas    = [p["name"] for p in cfg["personas"]]
-    synthesizer = cfg["synthesizer"]
-    seed        = cfg.get("seed")
-    if not seed:
-        sys.exit(f'ERROR: "seed" key missing from {args.config}.\n'
-                 'Add a multiline  seed = """…"""  entry to your config.')
-
-    # --- API key ---
+def digest_key(persona_text: str) -> str:
+    """Cache / cassette key of a digest: changes with the persona, prompt, or model."""
+    return request_key({"model": DIGEST_MODEL, "system": DIGEST_PROMPT,
+                        "persona": persona_text, "temperature": 0.0})
+
+
+def run_digest(name: str, persona_text: str, key: str, cassette: Optional[Cassette],
+               ledger: RunLedger) -> str:
+    """Digest one persona with DIGEST_MODEL and cache the result."""
+    print(f"[digest]  {name}…")
+    model = genai.GenerativeModel(model_name=DIGEST_MODEL, system_instruction=DIGEST_PROMPT)
+    start = time.monotonic()
+    response = model.generate_content(persona_text, generation_config={"temperature": 0.0})
+    latency = time.monotonic() - start
+    text, usage = response.text.strip(), gemini_usage(response)
+    ledger.record("persona-digest", DIGEST_MODEL, usage, latency=latency, persona=name)
+    if cassette is not None:
+        cassette.record(key, text, usage)
+    write_digest(key, text)
+    return text
+
+
+def write_digest(key: str, text: str) -> None:
+    path = DIGEST_DIR / f"{key}.md"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    tmp.write_text(text, encoding="utf-8")
+    tmp.replace(path)
+
+
+def persona_digests(names: list[str], cassette: Optional[Cassette], ledger: RunLedger,
+                    concurrency: int) -> dict[str, str]:
+    """Digest of every persona: from the cache or cassette, else generated concurrently.
+
+    A replay cassette that lacks a needed digest raises CassetteMiss.  A
+    recording cassette gets cache hits too, so it replays on a cold cache.
+    """
+    digests, pending = {}, {}
+    for name in dict.fromkeys(names):
+        text = load_persona(name)
+        key = digest_key(text)
+        path = DIGEST_DIR / f"{key}.md"
+        if path.exists():
+            digests[name] = path.read_text(encoding="utf-8")
+            if cassette is not None:
+                cassette.record(key, digests[name], {})
+            continue
+        entry = cassette.lookup(key) if cassette is not None else None
+        if entry is not None:
+            write_digest(key, entry["text"])
+            digests[name] = entry["text"]
+            continue
+        pending[name] = (text, key)
+    if pending:
+        configure_gemini()
+        sched = DagScheduler(concurrency)
+        for name, (text, key) in pending.items():
+            sched.add(name, functools.partial(run_digest, name, text, key, cassette, ledger))
+        result = sched.run()
+        for name, err in result.failures.items():
+            print(f"[error]   digest {name}: {err}")
+        if not result.ok:
+            sys.exit(f"ERROR: {len(result.failures)} persona digest(s) failed.")
+        digests.update(result.results)
+    full = sum(len(load_persona(n)) for n in digests)
+    print(f"[digest]  {len(digests)} persona(s): {full:,} → "
+          f"{sum(len(t) for t in digests.values()):,} chars ({len(pending)} generated)")
+    return digests
+
+
+def configure_gemini() -> str:
+    """Configure genai with GOOGLE_API_KEY (exits if unset); returns the key."""
     api_key = os.getenv("GOOGLE_API_KEY")
     if not api_key:
         sys.exit("ERROR: GOOGLE_API_KEY not set. Check your .env file.")
     genai.configure(api_key=api_key)
+    return api_key
 
-    # --- Build prompt & upload baseline ---
-    print("[setup]   Building system prompt…")
-    system_prompt = build_system_prompt(personas, synthesizer)
 
-    print("[upload]  Uploading baseline PDF…")
-    pdf_file = upload_to_gemini(args.baseline_pdf)
+# ---------------------------------------------------------------------------
+# Kernels — one per (config, seed), all sharing one upload
+# ---------------------------------------------------------------------------
 
-    # --- Generate ---
-    print("[generate] Producing research kernel…")
+@dataclass
+class Kernel:
+    label: str                      # "" for a single kernel
+    config: Path
+    seed: str
+    system_prompt: str
+    prompt: str
+    key: str                        # cassette key
+    out_dir: Path
+
+    @property
+    def job(self) -> str:
+        return f"kernel:{self.label or self.config.stem}"
+
+
+def load_config(path: Path) -> dict[str, Any]:
+    with open(path, "rb") as f:
+        return tomllib.load(f)
+
+
+def config_personas(configs: list[Path]) -> list[str]:
+    """Every persona and synthesizer the configs name, in order."""
+    names = []
+    for path in configs:
+        cfg = load_config(path)
+        names += [p["name"] for p in cfg["personas"]] + [cfg["synthesizer"]]
+    return names
+
+
+def load_kernels(configs: list[Path], baseline: Path, output: Path,
+                 digests: Optional[dict[str, str]] = None) -> list[Kernel]:
+    """Every kernel the configs ask for: each config's `seed`, or each of its `seeds`."""
+    baseline_sha = file_sha256(baseline)
+    specs = []
+    for path in configs:
+        cfg = load_config(path)
+        seeds = cfg.get("seeds") or ([cfg["seed"]] if cfg.get("seed") else [])
+        if not seeds:
+            sys.exit(f'ERROR: "seed" key missing from {path}.\n'
+                     'Add a multiline  seed = """…"""  entry to your config.')
+        personas = [p["name"] for p in cfg["personas"]]
+        system_prompt = build_system_prompt(personas, cfg["synthesizer"], digests)
+        for k, seed in enumerate(seeds, start=1):
+            specs.append((path, k if len(seeds) > 1 else 0, seed, system_prompt))
+
+    kernels = []
+    for path, k, seed, system_prompt in specs:
+        label = "" if len(specs) == 1 else path.stem + (f"_seed{k}" if k else "")
+        prompt = (f"Here is the Baseline Paper (PDF).\n\n"
+                  f"Here is the Seed Idea:\n{seed}\n\n"
+                  f"Generate the Research Proposal Kernel.")
+        # The uploaded file's name changes per upload, so the key uses the PDF's hash.
+        key = request_key({"model": MODEL_NAME, "system": system_prompt,
+                           "baseline_sha256": baseline_sha,
+                           "prompt": prompt, "temperature": GENERATION_TEMP})
+        kernels.append(Kernel(label, path, seed, system_prompt, prompt, key,
+                              output / label if label else output))
+    return kernels
+
+
+def save_kernel(kernel: Kernel, ledger: RunLedger, baseline: Path, text: str,
+                usage: dict[str, int], latency: float, cached: bool) -> None:
+    """Write idea_kernel.md and record the call in the ledger."""
+    ledger.record("idea", MODEL_NAME, usage, latency=latency, cached=cached,
+                  baseline=baseline.name, temperature=GENERATION_TEMP,
+                  **({"kernel": kernel.label} if kernel.label else {}))
+    kernel.out_dir.mkdir(parents=True, exist_ok=True)
+    out_file = kernel.out_dir / "idea_kernel.md"
+    out_file.write_text(text, encoding="utf-8")
+    print(f"[done]    Kernel saved to: {out_file}")
+
+
+def run_kernel(kernel: Kernel, cassette: Optional[Cassette], ledger: RunLedger,
+               baseline: Path, pdf_file) -> str:
+    """Generate one kernel against the uploaded baseline."""
+    print(f"[generate] Producing research kernel{f' {kernel.label}' if kernel.label else ''}…")
     model = genai.GenerativeModel(
         model_name=MODEL_NAME,
-        system_instruction=system_prompt,
+        system_instruction=kernel.system_prompt,
     )
+    start = time.monotonic()
     response = model.generate_content(
-        [pdf_file,
-         f"Here is the Baseline Paper (PDF).\n\n"
-         f"Here is the Seed Idea:\n{seed}\n\n"
-         f"Generate the Research Proposal Kernel."],
-        generation_config={"temperature": 0.7},
+        [pdf_file, kernel.prompt],
+        generation_config={"temperature": GENERATION_TEMP},
     )
+    latency = time.monotonic() - start
+    text, usage = response.text, gemini_usage(response)
+    if cassette is not None:
+        cassette.record(kernel.key, text, usage)
+    save_kernel(kernel, ledger, baseline, text, usage, latency, cached=False)
+    return text
 
-    # --- Save ---
-    args.output.mkdir(parents=True, exist_ok=True)
-    out_file = args.output / "idea_kernel.md"
-    out_file.write_text(response.text, encoding="utf-8")
-    print(f"[done]    Kernel saved to: {out_file}")
-    quit()
-    # --- Convert to PDF ---
-    pdf_file = args.output / "idea_kernel.pdf"
+
+def write_pdf(text: str, out_dir: Path) -> None:
+    """Render a kernel to idea_kernel.pdf (requires markdown-pdf)."""
+    pdf_file = out_dir / "idea_kernel.pdf"
     try:
         from markdown_pdf import MarkdownPdf, Section
         print(f"[convert] Generating PDF from markdown…")
         pdf = MarkdownPdf()
-        pdf.add_section(Section(response.text))
+        pdf.add_section(Section(text))
         pdf.save(str(pdf_file))
         print(f"[done]    PDF saved to: {pdf_file}")
     except ImportError:
@@ -180,7 +430,90 @@ def main() -> None:
         print(f"          Install with: pip install markdown-pdf")
     except Exception as e:
         print(f"[warning] PDF conversion failed: {e}")
-        print(f"          Markdown file is still available at: {out_file}")
+        print(f"          Markdown file is still available at: {out_dir / 'idea_kernel.md'}")
+
+
+# ---------------------------------------------------------------------------
+# Entry point
+# ---------------------------------------------------------------------------
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Gauntlet Idea Generator — produce a research kernel"
+    )
+    parser.add_argument("baseline_pdf", type=Path,
+                        help="baseline / prior-art PDF")
+    parser.add_argument("-c", "--config", type=Path, action="append", default=None,
+                        help="project config file; repeat for several, one kernel per config "
+                             "and seed (default: <script dir>/config.toml)")
+    parser.add_argument("-o", "--output", type=Path, default=Path("."),
+                        help="output directory (default: current directory)")
+    parser.add_argument("-j", "--max-concurrency", type=int, default=MAX_CONCURRENCY,
+                        help=f"kernels generated at once (default: {MAX_CONCURRENCY})")
+    parser.add_argument("--digest-personas", action="store_true",
+                        help="describe the adversaries with short cached digests instead of "
+                             "their full persona files (smaller prompt for large panels)")
+    cassette_group = parser.add_mutually_exclusive_group()
+    cassette_group.add_argument("--record", type=Path, default=None, metavar="CASSETTE",
+                                help="append the response to a replayable cassette (.jsonl.gz)")
+    cassette_group.add_argument("--replay", type=Path, default=None, metavar="CASSETTE",
+                                help="regenerate the kernel from a recorded cassette, offline")
+    return parser
+
+
+def main() -> None:
+    args = build_parser().parse_args()
+    configs = args.config or [BASE_DIR / "config.toml"]
+
+    args.output.mkdir(parents=True, exist_ok=True)
+    ledger = RunLedger(args.output / "ledger.jsonl")
+
+    # --- Cassette + config + prompts ---
+    cassette: Optional[Cassette] = None
+    try:
+        if args.replay:
+            cassette = Cassette(args.replay, "replay")
+        elif args.record:
+            cassette = Cassette(args.record, "record")
+        digests = None
+        if args.digest_personas:
+            digests = persona_digests(config_personas(configs), cassette, ledger,
+                                      args.max_concurrency)
+        print("[setup]   Building system prompt…")
+        kernels = load_kernels(configs, args.baseline_pdf, args.output, digests)
+        recorded = {k.key: cassette.lookup(k.key) for k in kernels} if cassette is not None else {}
+    except (FileNotFoundError, CassetteMiss) as e:
+        sys.exit(f"ERROR: {e}")
+    if len(kernels) > 1:
+        print(f"[setup]   {len(kernels)} kernels: {', '.join(k.label for k in kernels)}")
+
+    sched = DagScheduler(args.max_concurrency)
+    for kernel in kernels:
+        entry = recorded.get(kernel.key)
+        if entry is not None:
+            print(f"[cassette] Kernel{f' {kernel.label}' if kernel.label else ''} "
+                  f"served from {cassette.path}")
+            save_kernel(kernel, ledger, args.baseline_pdf, entry["text"], entry["usage"],
+                        0.0, cached=True)
+            sched.complete(kernel.job, entry["text"])
+            continue
+        if "upload" not in sched:
+            api_key = configure_gemini()
+            print("[upload]  Uploading baseline PDF…")
+            sched.add("upload", functools.partial(upload_to_gemini, args.baseline_pdf, api_key))
+        # --- Generate ---
+        sched.add(kernel.job, functools.partial(run_kernel, kernel, cassette, ledger,
+                                                args.baseline_pdf), deps=("upload",))
+    result = sched.run()
+
+    write_stats(ledger.path, args.output / "RUN_STATS.md")
+    for key, err in result.failures.items():
+        print(f"[error]   {key}: {err}")
+    if not result.ok:
+        sys.exit(f"ERROR: {len(result.failures) + len(result.blocked)} kernel job(s) failed.")
+    # --- Convert to PDF ---
+    for kernel in kernels:
+        write_pdf(result.results[kernel.job], kernel.out_dir)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,118 @@
+"""Document ingestion for the Gauntlet scripts.
+
+load_document() turns an input file into plain text:
+
+  * .md / .markdown / .txt are read directly — pypdf is never touched, so
+    pre-extracted inputs like inputs/readpaper.md load instantly.
+  * PDFs are extracted page by page across a process pool, and the result
+    is memoised on disk:
+      - <cache>/pdf_text/<file sha256>.txt   whole document, by content hash
+      - <cache>/pdf_pages/<aa>/<page hash>.txt   one entry per page
+    An unchanged file is a single read.  A revised PDF re-extracts only the
+    pages whose content stream or font resources changed.
+
+This module has no import-time side effects so any script can use it.
+"""
+
+import hashlib
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Optional
+
+from pypdf import PdfReader
+
+TEXT_SUFFIXES: frozenset[str] = frozenset({".md", ".markdown", ".txt"})
+
+# Below this many pages to extract, a process pool costs more than it saves.
+MIN_PAGES_FOR_POOL: int = 4
+
+
+def file_sha256(path: Path) -> str:
+    h = hashlib.sha256()
+    with path.open("rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def page_fingerprint(page) -> str:
+    """Hash of what determines a page's extracted text: content + fonts."""
+    h = hashlib.sha256()
+    contents = page.get_contents()
+    if contents is not None:
+        h.update(contents.get_data())
+    # Fonts by content, not object number: object ids shift between
+    # revisions, while BaseFont + ToUnicode fix how glyphs map to text.
+    fonts = (page.get("/Resources") or {}).get("/Font") or {}
+    for name in sorted(fonts):
+        font = fonts[name].get_object()
+        h.update(f"{name}={font.get('/BaseFont')}".encode())
+        to_unicode = font.get("/ToUnicode")
+        if to_unicode is not None:
+            h.update(to_unicode.get_object().get_data())
+    return h.hexdigest()
+
+
+def _extract_pages(path: str, indices: list[int]) -> list[tuple[int, str]]:
+    """Pool worker: extract the given pages (each worker opens its own reader)."""
+    reader = PdfReader(path)
+    return [(i, reader.pages[i].extract_text() or "") for i in indices]
+
+
+def extract_pdf_text(path: Path, cache_dir: Optional[Path] = None,
+                     workers: Optional[int] = None) -> str:
+    """Full text of a PDF, using and refreshing the on-disk caches."""
+    doc_file = page_dir = None
+    if cache_dir is not None:
+        doc_file = cache_dir / "pdf_text" / f"{file_sha256(path)}.txt"
+        if doc_file.exists():
+            return doc_file.read_text(encoding="utf-8")
+        page_dir = cache_dir / "pdf_pages"
+
+    reader = PdfReader(str(path))
+    fingerprints = [page_fingerprint(p) for p in reader.pages]
+    texts: list[Optional[str]] = [None] * len(fingerprints)
+    if page_dir is not None:
+        for i, fp in enumerate(fingerprints):
+            page_file = page_dir / fp[:2] / f"{fp}.txt"
+            if page_file.exists():
+                texts[i] = page_file.read_text(encoding="utf-8")
+
+    missing = [i for i, t in enumerate(texts) if t is None]
+    workers = workers or os.cpu_count() or 1
+    if len(missing) < MIN_PAGES_FOR_POOL or workers <= 1:
+        extracted = [(i, reader.pages[i].extract_text() or "") for i in missing]
+    else:
+        n = min(workers, len(missing))
+        shards = [missing[k::n] for k in range(n)]
+        with ProcessPoolExecutor(max_workers=n) as pool:
+            extracted = [pair for part in pool.map(_extract_pages, [str(path)] * n, shards)
+                         for pair in part]
+
+    for i, text in extracted:
+        texts[i] = text
+        if page_dir is not None:
+            _write_atomic(page_dir / fingerprints[i][:2] / f"{fingerprints[i]}.txt", text)
+
+    full = "\n".join(t or "" for t in texts)
+    if doc_file is not None:
+        _write_atomic(doc_file, full)
+    return full
+
+
+def load_document(path: Path, cache_dir: Optional[Path] = None,
+                  workers: Optional[int] = None) -> str:
+    """Plain text of a PDF, Markdown, or text input."""
+    if not path.exists():
+        raise FileNotFoundError(f"Input not found: {path}")
+    if path.suffix.lower() in TEXT_SUFFIXES:
+        return path.read_text(encoding="utf-8")
+    return extract_pdf_text(path, cache_dir, workers)
+
+
+def _write_atomic(path: Path, text: str) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    tmp.write_text(text, encoding="utf-8")
+    tmp.replace(path)
@@ -0,0 +1,331 @@
+"""SQLite-backed job queue: several processes (or hosts) drain one run.
+
+A run's DAG of jobs (reviews, digests, syntheses, persona generations) is
+stored in <output dir>/queue.sqlite.  Workers claim ready jobs atomically
+under a time-limited lease, keep the lease alive with a heartbeat while the
+call is in flight, and store each job's result in the table so a dependent
+job can run on any worker.  A worker that dies simply stops heartbeating;
+once its lease expires the job is claimable again.  No two live workers
+ever hold the same job, so there are no duplicate API calls and — since
+every output is written via a temp file and rename — no torn files.
+
+Workers rebuild the same DAG locally (the phase builders are deterministic)
+through JobGraph, which implements DagScheduler's add() / complete()
+interface, and look up each claimed key's function there.
+
+SQLite locking needs a filesystem with working POSIX locks; for several
+hosts put the output directory on one that provides them (NFSv4 with
+locking enabled, or a local disk shared over SMB/CIFS with byte-range
+locks), not a sync folder.  The database uses the rollback journal rather
+than WAL for the same reason.
+
+This module has no import-time side effects so any script can use it.
+"""
+
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Iterator, Optional
+
+from scheduler import Job
+
+QUEUE_FILE: str = "queue.sqlite"
+
+# Seconds a claim stays valid without a heartbeat; heartbeats renew it
+# every LEASE_SECONDS / 3.  A job whose worker died is re-claimable after this.
+LEASE_SECONDS: float = 60.0
+
+# Idle workers re-check for newly ready jobs this often.
+POLL_INTERVAL: float = 1.0
+
+# A job whose lease expired this many times (its worker keeps dying) fails.
+MAX_ATTEMPTS: int = 3
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    key         TEXT PRIMARY KEY,
+    deps        TEXT NOT NULL DEFAULT '[]',
+    priority    INTEGER NOT NULL DEFAULT 0,
+    state       TEXT NOT NULL DEFAULT 'pending',   -- pending | running | done | failed
+    owner       TEXT,
+    lease_until REAL,
+    attempts    INTEGER NOT NULL DEFAULT 0,
+    result      TEXT,
+    error       TEXT,
+    updated     REAL
+);
+CREATE TABLE IF NOT EXISTS meta (
+    name  TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+
+def worker_id() -> str:
+    """host:pid — identifies this process's leases."""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class JobGraph:
+    """Collects a DAG through DagScheduler's add() / complete() interface."""
+
+    def __init__(self) -> None:
+        self.jobs: dict[str, Job] = {}
+        self.done: dict[str, Any] = {}
+
+    def add(self, key: str, fn: Callable[..., Any], deps: tuple[str, ...] = (),
+            priority: int = 0) -> None:
+        if key in self:
+            raise ValueError(f"duplicate job key: {key}")
+        self.jobs[key] = Job(key, fn, tuple(deps), priority)
+
+    def complete(self, key: str, value: Any) -> None:
+        if key in self:
+            raise ValueError(f"duplicate job key: {key}")
+        self.done[key] = value
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.jobs or key in self.done
+
+
+@dataclass
+class Claim:
+    key: str
+    deps: tuple[str, ...]
+    attempts: int
+
+
+@dataclass
+class WorkResult:
+    """What one worker did; the queue itself holds the run's overall state."""
+    completed: list[str] = field(default_factory=list)
+    failures: dict[str, BaseException] = field(default_factory=dict)
+    lost: list[str] = field(default_factory=list)     # lease taken over mid-job
+
+
+class JobQueue:
+    """Job table with atomic claim / lease / heartbeat / finish."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        db = sqlite3.connect(path, timeout=60)
+        try:
+            db.executescript(_SCHEMA)       # commits on its own
+        finally:
+            db.close()
+
+    @contextmanager
+    def _tx(self) -> Iterator[sqlite3.Connection]:
+        """One short write transaction on a fresh connection (thread-safe)."""
+        db = sqlite3.connect(self.path, timeout=60, isolation_level=None)
+        try:
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                yield db
+            except BaseException:
+                db.execute("ROLLBACK")
+                raise
+            db.execute("COMMIT")
+        finally:
+            db.close()
+
+    # --- run metadata ---
+
+    def set_meta(self, name: str, value: Any) -> None:
+        with self._tx() as db:
+            db.execute("INSERT OR REPLACE INTO meta VALUES (?, ?)", (name, json.dumps(value)))
+
+    def get_meta(self, name: str) -> Any:
+        with self._tx() as db:
+            row = db.execute("SELECT value FROM meta WHERE name = ?", (name,)).fetchone()
+        return None if row is None else json.loads(row[0])
+
+    # --- producer ---
+
+    def enqueue(self, graph: JobGraph) -> None:
+        """Mirror a freshly built graph into the table.
+
+        Jobs the graph already resolved (cached outputs) are marked done with
+        their result; every other job is (re)set to pending — including done
+        and failed ones, since the graph only schedules work whose output is
+        missing or stale — unless a live worker holds it right now.
+        """
+        now = time.time()
+        with self._tx() as db:
+            for key, value in graph.done.items():
+                db.execute(
+                    "INSERT INTO jobs (key, state, result, updated) VALUES (?, 'done', ?, ?) "
+                    "ON CONFLICT(key) DO UPDATE SET state = 'done', result = excluded.result, "
+                    "error = NULL, updated = excluded.updated",
+                    (key, json.dumps(value), now),
+                )
+            for job in graph.jobs.values():
+                db.execute(
+                    "INSERT INTO jobs (key, deps, priority, updated) VALUES (?, ?, ?, ?) "
+                    "ON CONFLICT(key) DO UPDATE SET deps = excluded.deps, "
+                    "priority = excluded.priority, state = 'pending', owner = NULL, "
+                    "lease_until = NULL, attempts = 0, result = NULL, error = NULL, "
+                    "updated = excluded.updated "
+                    "WHERE NOT (jobs.state = 'running' AND jobs.lease_until >= ?)",
+                    (job.key, json.dumps(job.deps), job.priority, now, now),
+                )
+
+    # --- workers ---
+
+    def claim(self, owner: str, lease: float = LEASE_SECONDS) -> Optional[Claim]:
+        """Atomically take the highest-priority job whose dependencies are done.
+
+        A running job whose lease has expired is claimable again; after
+        MAX_ATTEMPTS expiries it is marked failed instead.
+        """
+        now = time.time()
+        with self._tx() as db:
+            done = {k for (k,) in db.execute("SELECT key FROM jobs WHERE state = 'done'")}
+            rows = db.execute(
+                "SELECT key, deps, attempts FROM jobs WHERE state = 'pending' "
+                "OR (state = 'running' AND lease_until < ?) ORDER BY priority, rowid",
+                (now,),
+            ).fetchall()
+            for key, deps_json, attempts in rows:
+                deps = tuple(json.loads(deps_json))
+                if not all(d in done for d in deps):
+                    continue
+                if attempts >= MAX_ATTEMPTS:
+                    db.execute("UPDATE jobs SET state = 'failed', error = ?, updated = ? "
+                               "WHERE key = ?",
+                               (f"lease expired {attempts} times", now, key))
+                    continue
+                db.execute(
+                    "UPDATE jobs SET state = 'running', owner = ?, lease_until = ?, "
+                    "attempts = attempts + 1, updated = ? WHERE key = ?",
+                    (owner, now + lease, now, key),
+                )
+                return Claim(key, deps, attempts + 1)
+        return None
+
+    def heartbeat(self, key: str, owner: str, lease: float = LEASE_SECONDS) -> bool:
+        """Extend a lease; False if this owner no longer holds the job."""
+        now = time.time()
+        with self._tx() as db:
+            cur = db.execute(
+                "UPDATE jobs SET lease_until = ?, updated = ? "
+                "WHERE key = ? AND owner = ? AND state = 'running'",
+                (now + lease, now, key, owner),
+            )
+            return cur.rowcount == 1
+
+    def finish(self, key: str, owner: str, result: Any) -> bool:
+        """Mark a job done with its result; False if the lease was lost."""
+        with self._tx() as db:
+            cur = db.execute(
+                "UPDATE jobs SET state = 'done', result = ?, owner = NULL, lease_until = NULL, "
+                "error = NULL, updated = ? WHERE key = ? AND owner = ? AND state = 'running'",
+                (json.dumps(result), time.time(), key, owner),
+            )
+            return cur.rowcount == 1
+
+    def fail(self, key: str, owner: str, error: BaseException) -> None:
+        """Mark a job failed; it is retried when the run is enqueued again."""
+        with self._tx() as db:
+            db.execute(
+                "UPDATE jobs SET state = 'failed', error = ?, owner = NULL, lease_until = NULL, "
+                "updated = ? WHERE key = ? AND owner = ? AND state = 'running'",
+                (f"{type(error).__name__}: {error}", time.time(), key, owner),
+            )
+
+    def results(self, keys: tuple[str, ...]) -> list[Any]:
+        """Stored results of finished jobs, in the order given."""
+        with self._tx() as db:
+            found = dict(db.execute(
+                f"SELECT key, result FROM jobs WHERE key IN ({','.join('?' * len(keys))})",
+                keys,
+            ).fetchall()) if keys else {}
+        return [json.loads(found[k]) for k in keys]
+
+    def active(self) -> int:
+        """Jobs held by a live lease (someone may still unblock more work)."""
+        with self._tx() as db:
+            return db.execute("SELECT COUNT(*) FROM jobs WHERE state = 'running' "
+                              "AND lease_until >= ?", (time.time(),)).fetchone()[0]
+
+    def summary(self) -> dict[str, int]:
+        """Job count per state."""
+        with self._tx() as db:
+            counts = dict(db.execute("SELECT state, COUNT(*) FROM jobs GROUP BY state"))
+        return {s: counts.get(s, 0) for s in ("pending", "running", "done", "failed")}
+
+    def failures(self) -> dict[str, str]:
+        with self._tx() as db:
+            return dict(db.execute("SELECT key, error FROM jobs WHERE state = 'failed' "
+                                   "ORDER BY rowid"))
+
+
+def _heartbeat(queue: JobQueue, key: str, owner: str, lease: float,
+               stop: threading.Event, lost: threading.Event) -> None:
+    while not stop.wait(lease / 3):
+        if not queue.heartbeat(key, owner, lease):
+            lost.set()
+            return
+
+
+def work(queue: JobQueue, graph: JobGraph, concurrency: int, owner: Optional[str] = None,
+         lease: float = LEASE_SECONDS) -> WorkResult:
+    """Claim and run jobs with `concurrency` threads until the queue is drained.
+
+    Returns when nothing is claimable and no live worker holds a job that
+    could unblock more.  Jobs blocked on a failed dependency stay pending.
+    """
+    owner = owner or worker_id()
+    out = WorkResult()
+    lock = threading.Lock()
+
+    def loop() -> None:
+        while True:
+            claim = queue.claim(owner, lease)
+            if claim is None:
+                if queue.active() == 0:
+                    return
+                time.sleep(POLL_INTERVAL)
+                continue
+            if claim.key in graph.done:
+                # Resolved locally (e.g. a cache hit) — no call needed.
+                queue.finish(claim.key, owner, graph.done[claim.key])
+                continue
+            job = graph.jobs.get(claim.key)
+            stop, lost = threading.Event(), threading.Event()
+            beat = threading.Thread(target=_heartbeat,
+                                    args=(queue, claim.key, owner, lease, stop, lost),
+                                    daemon=True)
+            beat.start()
+            try:
+                if job is None:
+                    raise KeyError(f"job {claim.key!r} is not in this worker's plan "
+                                   "(different config or inputs?)")
+                value = job.fn(*queue.results(claim.deps))
+            except Exception as e:
+                queue.fail(claim.key, owner, e)
+                with lock:
+                    out.failures[claim.key] = e
+                continue
+            finally:
+                stop.set()
+                beat.join()
+            with lock:
+                if not lost.is_set() and queue.finish(claim.key, owner, value):
+                    out.completed.append(claim.key)
+                else:
+                    out.lost.append(claim.key)
+
+    threads = [threading.Thread(target=loop, name=f"worker-{i}") for i in range(max(1, concurrency))]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return out
@@ -1,45 +1,114 @@
 """Gauntlet — flywheel multi-agent review engine.
 
 Phase 1  –  9 expert reviews   (3 personas × 3 temperatures).
-Phase 2  – 27 synthesis reports (one per input combination).
+Phase 2  – 27 synthesis reports (one per input combination), or a
+           fractional design over them with --combo-strategy (combos.py).
+Both phases share one dependency-driven scheduler (scheduler.py) with at most
+--max-concurrency requests in flight: each synthesis starts as soon as its own
+source reviews exist, so the phases overlap.
 Each synthesis folder is self-contained: SYNTHESIS.md + the 3 source reviews.
+For large panels, --synthesis-fanout N condenses reviews in groups of N into
+digests (shared by every combo with the same runs in that group) and the
+final synthesis merges the digests instead of every raw review.
 
-The script is idempotent: re-running it skips outputs that already exist
-and are not error placeholders, so you can resume cleanly after a rate-limit
-interruption without redoing successful work.
+The script is idempotent: every response is stored in a content-addressed
+cache (response_cache.py) keyed by the full request, so re-running serves
+identical requests from disk and re-executes only those whose persona,
+model, temperature, or paper changed.  The cache is shared across output
+directories and configs.  Expert reviews are also kept in a review store
+(review_store.py) keyed by paper, persona, temperature, and model, so a
+persona that sits on several panels reviews each paper once.  With
+--no-cache it falls back to skipping outputs that already exist and are not
+error placeholders.
+
+Documents longer than --chunk-tokens are reviewed in parts (chunking.py)
+whose partial reviews are merged into each run_<i>.md.
+
+--pack-sections TOKENS gives each reviewer only the proposal sections most
+relevant to its persona, ranked by a local BM25 index (section_index.py),
+so long papers cost fewer input tokens per review.
+
+--plan estimates every pending request's tokens, cost, and wall time into
+PLAN.md without generating anything (planner.py); --budget USD shrinks the
+combo design to fit, or aborts, before the first call.
+
+--record FILE captures every response of a run into a cassette (cassette.py);
+--replay FILE re-runs the whole pipeline from it with no network access and
+no API key, producing identical outputs.
+
+--revise DIR re-reviews a revised draft incrementally: the paper is diffed
+section by section against the text of the run in DIR (revisions.py), the
+changes are listed in REVISION.md, and each reviewer gets only its previous
+review plus the changed sections to write an updated review.
+
+--queue puts the run's jobs in <output>/queue.sqlite (job_queue.py) so other
+processes or hosts sharing the output directory can help drain it with
+`python gauntlet.py worker <output>`, each job running exactly once.
 
 Output layout
 -------------
 outputs/
 ├── RUN_CONFIG.md
+├── ledger.jsonl                           # per-call latency, tokens, cost, cache hits
+├── RUN_STATS.md                           # p50/p95 latency and cost per phase
+├── PLAN.md                                # only with --plan / --budget: projected cost
+├── REVISION.md                            # only with --revise: changed sections
+├── PACKING.md                             # only with --pack-sections: sections per persona
+├── .source/                               # extracted documents, for the next --revise
+├── .revise_base/                          # only while a --revise into this dir is unfinished
+├── .outputs.jsonl                         # manifest of model outputs: path, hash, size, status
+├── .blobs/                                # each distinct output stored once (output_store.py)
+├── digests/                               # only with --synthesis-fanout
 ├── expert_reviews/
 │   ├── dr_silas_vane/
 │   │   ├── run_1.md                       # temp 0.3
 │   │   ├── run_2.md                       # temp 0.7
-│   │   └── run_3.md                       # temp 1.0
+│   │   ├── run_3.md                       # temp 1.0
+│   │   └── run_1.parts/                   # only for documents over --chunk-tokens
 │   ├── prof_amara_kito/  …
 │   └── dr_julian_rex/                  …
 └── syntheses/
     ├── silas_1__amara_1__julian_1/
     │   ├── SYNTHESIS.md
-    │   ├── dr_silas_vane_review.md
+    │   ├── dr_silas_vane_review.md        # hard links to the reviews, not copies
     │   ├── prof_amara_kito_review.md
     │   └── dr_julian_rex_review.md
     └── …                                  # 27 folders total
 """
 
 import argparse
-import itertools
+import contextlib
+import functools
+import io
+import json
 import os
+import re
 import shutil
 import sys
+import threading
 import tomllib
 from pathlib import Path
 from typing import Optional
 
 from anthropic import Anthropic
 from dotenv import load_dotenv
-from pypdf import PdfReader
+
+import batch
+import chunking
+import combos
+import planner
+import revisions
+import section_index
+from cassette import Cassette, CassetteMiss
+from engine import CHARS_PER_TOKEN, CallResult, call_model, estimate_tokens, format_result, result_fields, text_block
+from ingest import load_document
+from output_store import ERROR_PREFIX, OutputStore
+from rate_limiter import RateLimiter
+from run_ledger import RunLedger, load as load_ledger, write_stats
+from response_cache import DEFAULT_MAX_BYTES, ResponseCache, request_key
+from review_store import ReviewStore
+from job_queue import QUEUE_FILE, JobGraph, JobQueue, work
+from scheduler import DagScheduler, Job, ScopedScheduler
 
 # ---------------------------------------------------------------------------
 # Configuration
@@ -59,27 +128,119 @@ TEMPERATURES: list[float] = [0.3]
 # different review combinations fed into it, not from sampling.
 SYNTH_TEMP: float = 0.5
 
-# SDK-level retries — handles transient 429s with exponential back-off.
+# Retries per request.  Interactive runs retry through the rate limiter so
+# 429s shrink concurrency; the SDK's own retries cover batch calls.
 MAX_RETRIES: int = 5
 
+# Response cache shared by every output dir and config (--cache-dir).
+CACHE_DIR: Path = Path(os.getenv("GAUNTLET_CACHE_DIR", BASE_DIR / ".gauntlet_cache"))
+
+# Default number of API requests kept in flight at once (--max-concurrency).
+# The Anthropic client is thread-safe, so reviews share one client.  This is
+# a ceiling: the rate limiter lowers it on 429s and climbs back on success.
+MAX_CONCURRENCY: int = 4
+
+# Reviews put the shared documents *before* the persona so every persona and
+# temperature reuses one cached copy of the paper; this short user turn then
+# asks for the review itself.
+REVIEW_INSTRUCTION: str = (
+    "The documents are above and your role is described after them. "
+    "Write your review now."
+)
+
+# Hierarchical synthesis (--synthesis-fanout): intermediate digests condense
+# a group of reviews, or of lower-level digests, for the final merge.
+DIGEST_MAX_TOKENS: int = 4096
+DIGEST_INSTRUCTION: str = (
+    "Condense the expert material above into a digest for a later synthesis "
+    "round.  Keep each reviewer's verdict, strongest objections, requested "
+    "changes, and any disagreements between reviewers, attributed by name.  "
+    "Drop repetition.  Do not add your own recommendations yet."
+)
+
+# Long documents: documents of more than this many tokens are reviewed in
+# parts (chunking.py) whose partial reviews are then merged into one.  Leaves
+# room in the 200k-token window for the persona, the output, and the error of
+# the character-count estimate.  --chunk-tokens overrides.
+CHUNK_TOKENS: int = 150_000
+PART_INSTRUCTION: str = (
+    "The documents above are part {part} of {parts} of a longer submission; the "
+    "other parts are reviewed separately and the notes merged afterwards.  Review "
+    "this part only, in your role: note its strengths, weaknesses, open questions, "
+    "and anything you would need to check in the parts you cannot see, citing "
+    "sections.  Do not give an overall verdict yet."
+)
+MERGE_INSTRUCTION: str = (
+    "Above are your notes on each part of one long submission, in order.  Merge "
+    "them into your complete review of the whole submission, in your usual format: "
+    "resolve points one part raised and another answered, drop repetition, and "
+    "give your overall verdict."
+)
+
+# --revise: reviewers update their previous review from a section diff of the
+# paper instead of re-reading it.  Past this share of the proposal's size the
+# diff is no cheaper than the paper, and full reviews run instead.
+REVISION_MAX_CHANGE: float = 0.5
+REVISION_INSTRUCTION: str = (
+    "Above are your review of the previous draft and the changes the author has "
+    "made since, section by section (unified diff: '-' removed, '+' added; "
+    "unchanged sections are omitted).  Write your updated review of the revised "
+    "paper: keep what still holds, revise the points the changes address or "
+    "break, and assess any new material.  Give a complete review in your usual "
+    "format, not a list of changes."
+)
+
+# --pack-sections: each reviewer's copy of the proposal holds only the
+# sections most relevant to its persona (section_index.py), up to this many
+# tokens — or the persona file's own "**Context Budget:** N" line.  0 = full text.
+PACK_BUDGET: int = 0
+_CONTEXT_BUDGET = re.compile(r"^\*\*Context Budget:\*\*\s*([\d,]+)\s*(?:tokens)?\s*$",
+                             re.MULTILINE | re.IGNORECASE)
+
+# Extracted text of each run's documents, diffed by the next --revise run.
+SOURCE_DIR: str = ".source"
+# --revise into its own output dir: the previous run's documents and reviews,
+# kept until the run completes so a rerun revises from the same base.
+REVISE_BASE: str = ".revise_base"
+
 # Populated at runtime by main() from the --config file.
 PERSONA_ORDER: list[str]
 PERSONA_SHORT: dict[str, str]
 SYNTHESIZER:   str
 
+# Populated at runtime by main() from --combo-strategy: the synthesis combos
+# to run and a description of the design for RUN_CONFIG.md.
+COMBOS:       list[tuple[int, ...]]
+COMBO_DESIGN: str
+
+# Populated at runtime by main() from --synthesis-fanout: the intermediate
+# levels of the synthesis tree (empty = one flat synthesis per combo).
+SYNTH_TREE: list[list[combos.Span]] = []
+
+# One JSONL line per API call, in ledger.jsonl of the output tree the call
+# wrote into (one tree per paper in a sweep); see ledger_for().
+LEDGERS: dict[Path, RunLedger] = {}
+_LEDGERS_LOCK = threading.Lock()
+
+# Blob store + manifest of each output tree (output_store.py); model outputs
+# are written through it, and synthesis folders link to the reviews' blobs.
+OUTPUTS: dict[Path, OutputStore] = {}
+
+# Populated at runtime by main(): the response cache (None with --no-cache;
+# a Cassette with --record/--replay), and the review store shared by every
+# config and output dir (<cache dir>/reviews; off with --no-cache or a cassette).
+RESPONSE_CACHE: Optional[ResponseCache | Cassette] = None
+REVIEW_STORE: Optional[ReviewStore] = None
+REVISE_FROM: Optional[Path] = None      # --revise: the previous run's output dir
+REVISION_DIFF: str = ""                 # compact section diff against its paper
+STREAM: bool = False            # --stream: write tokens to <file>.partial as they arrive
+LIMITER: Optional[RateLimiter] = None   # shared by every worker thread
+
 
 # ---------------------------------------------------------------------------
 # I/O helpers
 # ---------------------------------------------------------------------------
 
-def load_pdf_text(path: Path) -> str:
-    """Extract full text from a PDF."""
-    if not path.exists():
-        raise FileNotFoundError(f"PDF not found: {path}")
-    reader = PdfReader(str(path))
-    return "\n".join(page.extract_text() or "" for page in reader.pages)
-
-
 def load_persona(name: str) -> str:
     """Read persona prompt, strip the markdown header if present."""
     path = BASE_DIR / "personas" / f"{name}.md"
@@ -88,7 +249,14 @@ def load_persona(name: str) -> str:
     text = path.read_text(encoding="utf-8").strip()
     if text.startswith("**System Prompt:**"):
         text = text[len("**System Prompt:**"):].strip()
-    return text
+    return _CONTEXT_BUDGET.sub("", text).strip()
+
+
+def persona_budget(name: str) -> int:
+    """Proposal tokens this reviewer gets with --pack-sections."""
+    text = (BASE_DIR / "personas" / f"{name}.md").read_text(encoding="utf-8")
+    m = _CONTEXT_BUDGET.search(text)
+    return int(m.group(1).replace(",", "")) if m else PACK_BUDGET
 
 
 def build_context(call_text: str, proposal_text: str) -> str:
@@ -106,119 +274,845 @@ def combo_label(combo: tuple[int, ...]) -> str:
     return "__".join(f"{PERSONA_SHORT[p]}_{r}" for p, r in zip(PERSONA_ORDER, combo))
 
 
+def output_store(out_root: Path) -> OutputStore:
+    """The output store of one output tree (created on first use)."""
+    with _LEDGERS_LOCK:
+        if out_root not in OUTPUTS:
+            OUTPUTS[out_root] = OutputStore(out_root)
+        return OUTPUTS[out_root]
+
+
+def store_for(path: Path) -> Optional[OutputStore]:
+    """The output store whose tree holds path, if any."""
+    return next((s for s in list(OUTPUTS.values()) if path in s), None)
+
+
 def is_valid_output(path: Path) -> bool:
-    """True when path exists and does NOT start with an error placeholder."""
+    """True when path exists and does NOT start with an error placeholder.
+
+    Answered from the output manifest (one stat) when it knows the file;
+    otherwise only the first bytes are read.
+    """
+    store = store_for(path)
+    valid = store.valid(path) if store is not None else None
+    if valid is not None:
+        return valid
     if not path.exists():
         return False
-    return not path.read_text(encoding="utf-8").startswith("[ERROR")
+    with path.open(encoding="utf-8") as f:
+        return not f.read(len(ERROR_PREFIX)).startswith(ERROR_PREFIX)
+
+
+def write_output(path: Path, text: str) -> None:
+    """Write a model output, through its tree's output store when there is one."""
+    store = store_for(path)
+    if store is None:
+        write_if_changed(path, text)
+    else:
+        store.write(path, text)
+
+
+def link_output(src: Path, dest: Path) -> None:
+    """Make dest show src's content: a link to the same blob, else a copy."""
+    store = store_for(dest)
+    if store is None:
+        write_if_changed(dest, src.read_text(encoding="utf-8"))
+    else:
+        store.link(src, dest)
+
+
+def ledger_for(out_root: Path) -> RunLedger:
+    """The run ledger of one output tree (created on first use)."""
+    with _LEDGERS_LOCK:
+        if out_root not in LEDGERS:
+            LEDGERS[out_root] = RunLedger(out_root / "ledger.jsonl")
+        return LEDGERS[out_root]
+
+
+def write_if_changed(path: Path, text: str) -> None:
+    """Atomically write text to path unless it already holds exactly that."""
+    if not path.exists() or path.read_text(encoding="utf-8") != text:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Unique temp name: other threads or queue workers may write the same file.
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp.write_text(text, encoding="utf-8")
+        tmp.replace(path)
+
+
+def reusable_output(out_file: Path, params: dict) -> Optional[str]:
+    """Text to reuse for out_file instead of calling the API, or None.
+
+    With the response cache on, reuse is decided by request content: a hit
+    is (re)written to out_file, a changed persona/model/temperature/paper is
+    a miss.  With --no-cache it falls back to is_valid_output(out_file).
+    """
+    if RESPONSE_CACHE is None:
+        return out_file.read_text(encoding="utf-8") if is_valid_output(out_file) else None
+    hit = RESPONSE_CACHE.get(params)
+    if hit is None:
+        return None
+    write_output(out_file, hit.text)
+    return hit.text
 
 
 # ---------------------------------------------------------------------------
-# Phase 1 — expert reviews  (sequential, idempotent)
+# Phase 1 — expert reviews  (concurrent, idempotent)
 # ---------------------------------------------------------------------------
 
-def phase1(client: Anthropic, context: str, out_root: Path) -> dict[str, dict[int, str]]:
-    """Run (or resume) 9 expert reviews.  Returns {persona: {run_idx: text}}."""
-    reviews: dict[str, dict[int, str]] = {p: {} for p in PERSONA_ORDER}
+def review_key(persona: str, run_idx: int) -> str:
+    """Scheduler key for one expert review."""
+    return f"review:{persona}:{run_idx}"
+
+
+def review_params(persona: str, temp: float, context: str) -> dict:
+    """Messages API parameters for one expert review.
+
+    The system prompt is [documents ⟂ persona]: the cache breakpoint after
+    the documents makes the paper a prefix shared by every review call.
+    """
+    return dict(
+        model=MODEL,
+        max_tokens=4096,
+        temperature=temp,
+        system=[text_block(context, cache=True), text_block(load_persona(persona))],
+        messages=[{"role": "user", "content": REVIEW_INSTRUCTION}],
+    )
+
+
+def store_key(persona: str, temp: float, context: str) -> str:
+    """Review-store key: (paper, persona prompt + instruction, temperature, model)."""
+    return ReviewStore.key(context, load_persona(persona) + "\n\n" + REVIEW_INSTRUCTION,
+                           temp, MODEL)
+
+
+def reuse_review(persona: str, temp: float, context: str, out_file: Path,
+                 chunked: bool = False) -> Optional[str]:
+    """A finished review to reuse for out_file, or None.
+
+    The review store answers first — the same persona may have reviewed
+    this paper under another config or output dir — then reusable_output().
+    A response-cache hit is copied into the store for the next config.
+    A chunked review never sent the full-context request, so the response
+    cache is not asked for it (a replay cassette would raise); its parts
+    and merge are looked up by schedule_parts instead.
+    """
+    if REVIEW_STORE is not None:
+        key = store_key(persona, temp, context)
+        hit = REVIEW_STORE.get(key)
+        if hit is not None:
+            write_output(out_file, hit.text)
+            return hit.text
+    if chunked and RESPONSE_CACHE is not None:
+        return None
+    text = reusable_output(out_file, review_params(persona, temp, context))
+    if text is not None and REVIEW_STORE is not None:
+        REVIEW_STORE.put(key, CallResult(text=text, usage={}), persona=persona)
+    return text
+
+
+def prior_review(persona: str, run_idx: int) -> Optional[str]:
+    """--revise: this slot's review from the previous run, or None."""
+    if REVISE_FROM is None:
+        return None
+    path = REVISE_FROM / "expert_reviews" / persona / f"run_{run_idx}.md"
+    return path.read_text(encoding="utf-8") if is_valid_output(path) else None
+
+
+def revision_params(persona: str, temp: float, prior: str) -> dict:
+    """Messages API parameters for updating a review of the previous draft.
+
+    The reviewer sees its own earlier review and the section diff, not the
+    paper, so the request is a fraction of a full review's input.
+    """
+    return dict(
+        model=MODEL,
+        max_tokens=4096,
+        temperature=temp,
+        system=[text_block(load_persona(persona))],
+        messages=[{"role": "user", "content": (
+            "=== YOUR REVIEW OF THE PREVIOUS DRAFT ===\n"
+            f"{prior}\n\n"
+            "=== CHANGES IN THIS REVISION ===\n"
+            f"{REVISION_DIFF}\n\n"
+            f"{REVISION_INSTRUCTION}"
+        )}],
+    )
+
+
+def reuse_revision(prior: str, persona: str, temp: float, out_file: Path) -> Optional[str]:
+    """--revise counterpart of reuse_review().
+
+    An unchanged paper keeps the prior review as is.  Otherwise only the
+    response cache can answer: out_file may still hold the previous draft's
+    review, so it is never reused on its own.
+    """
+    if not REVISION_DIFF:
+        write_output(out_file, prior)
+        return prior
+    if RESPONSE_CACHE is None:
+        return None
+    return reusable_output(out_file, revision_params(persona, temp, prior))
+
+
+def part_key(persona: str, run_idx: int, part: int) -> str:
+    """Scheduler key for one part of a chunked review."""
+    return f"{review_key(persona, run_idx)}:part{part}"
+
+
+def part_file(out_file: Path, part: int) -> Path:
+    """expert_reviews/<persona>/run_<i>.parts/part_<k>.md"""
+    return out_file.with_suffix(".parts") / f"part_{part}.md"
+
+
+def part_params(persona: str, temp: float, part_context: str, part: int, parts: int) -> dict:
+    """Messages API parameters for the partial review of one part."""
+    return dict(
+        model=MODEL,
+        max_tokens=4096,
+        temperature=temp,
+        system=[text_block(part_context, cache=True), text_block(load_persona(persona))],
+        messages=[{"role": "user", "content": PART_INSTRUCTION.format(part=part, parts=parts)}],
+    )
+
+
+def merge_params(persona: str, temp: float, partials: tuple[str, ...]) -> dict:
+    """Messages API parameters for merging partial reviews into one review."""
+    notes = "\n\n".join(f"=== NOTES ON PART {k} OF {len(partials)} ===\n{text}"
+                         for k, text in enumerate(partials, start=1))
+    return dict(
+        model=MODEL,
+        max_tokens=4096,
+        temperature=temp,
+        system=[text_block(load_persona(persona))],
+        messages=[{"role": "user", "content": f"{notes}\n\n{MERGE_INSTRUCTION}"}],
+    )
 
+
+def save_part(out_root: Path, persona: str, run_idx: int, temp: float, part: int,
+              out_file: Path, result: CallResult) -> None:
+    """Write one partial review and record it in the ledger."""
+    write_output(out_file, result.text)
+    ledger_for(out_root).record("review-part", MODEL, persona=persona, run=run_idx, part=part,
+                                temperature=temp, **result_fields(result))
+    status = "(cached)" if result.cached else format_result(result)
+    print(f"  [{'skip' if result.cached else 'done'}]    {persona:42s} run={run_idx}  "
+          f"part {part}  {status}")
+
+
+def run_part(client: Anthropic, persona: str, run_idx: int, temp: float, part_context: str,
+             part: int, parts: int, out_root: Path, out_file: Path) -> str:
+    """Generate the partial review of one part into out_file."""
+    print(f"  [part]    {persona:42s} run={run_idx}  part {part}/{parts}")
+    result = call_model(client, part_params(persona, temp, part_context, part, parts),
+                        RESPONSE_CACHE, stream_to=out_file if STREAM else None,
+                        limiter=LIMITER, retries=MAX_RETRIES)
+    save_part(out_root, persona, run_idx, temp, part, out_file, result)
+    return result.text
+
+
+def run_merge(client: Anthropic, persona: str, run_idx: int, temp: float, context: str,
+              out_root: Path, out_file: Path, *partials: str) -> str:
+    """Merge a chunked review's partial reviews into out_file."""
+    print(f"  [merge]   {persona:42s} run={run_idx}  {len(partials)} parts")
+    result = call_model(client, merge_params(persona, temp, partials), RESPONSE_CACHE,
+                        stream_to=out_file if STREAM else None,
+                        limiter=LIMITER, retries=MAX_RETRIES)
+    if REVIEW_STORE is not None:
+        REVIEW_STORE.put(store_key(persona, temp, context), result, persona=persona)
+    save_review(out_root, persona, run_idx, temp, out_file, result)
+    return result.text
+
+
+def schedule_parts(sched: DagScheduler | JobGraph, client: Anthropic, persona: str,
+                   run_idx: int, temp: float, context: str, parts: list[str],
+                   out_root: Path, out_file: Path) -> None:
+    """Schedule a review whose documents overflow the window, one job per part.
+
+    The merge runs under the review's own key, so syntheses wait on it like
+    on any review.  Finished parts are reused (response cache, or files with
+    --no-cache), so a rerun redoes only the parts that failed.
+    """
+    keys, partials = [], []
+    for k, part_context in enumerate(parts, start=1):
+        key, path = part_key(persona, run_idx, k), part_file(out_file, k)
+        text = reusable_output(path, part_params(persona, temp, part_context, k, len(parts)))
+        keys.append(key)
+        partials.append(text)
+        if text is not None:
+            sched.complete(key, text)
+            continue
+        sched.add(key, functools.partial(run_part, client, persona, run_idx, temp, part_context,
+                                         k, len(parts), out_root, path), priority=0)
+    done = sum(t is not None for t in partials)
+    print(f"  [chunked] {persona:42s} run={run_idx}  {len(parts)} parts ({done} cached)")
+    if done == len(parts):
+        text = reusable_output(out_file, merge_params(persona, temp, tuple(partials)))
+        if text is not None:
+            print(f"  [skip]    {persona:42s} run={run_idx}  (cached)")
+            sched.complete(review_key(persona, run_idx), text)
+            return
+    sched.add(review_key(persona, run_idx),
+              functools.partial(run_merge, client, persona, run_idx, temp, context,
+                                out_root, out_file),
+              deps=tuple(keys), priority=0)
+
+
+def save_review(out_root: Path, persona: str, run_idx: int, temp: float, out_file: Path,
+                result: CallResult, phase: str = "review") -> None:
+    """Write a finished review to out_file and record it in the ledger."""
+    write_output(out_file, result.text)
+    ledger_for(out_root).record(phase, MODEL, persona=persona, run=run_idx, temperature=temp,
+                  **result_fields(result))
+    if result.cached:
+        print(f"  [skip]    {persona:42s} run={run_idx}  (cached)")
+        return
+    print(f"  [done]    {persona:42s} run={run_idx}  {format_result(result)}")
+
+
+def run_review(client: Anthropic, persona: str, run_idx: int, temp: float,
+               context: str, out_root: Path, out_file: Path,
+               prior: Optional[str] = None) -> str:
+    """Generate one expert review (or, given prior, update it) into out_file."""
+    if prior is not None:
+        print(f"  [revise]  {persona:42s} run={run_idx}  temp={temp}")
+        result = call_model(client, revision_params(persona, temp, prior), RESPONSE_CACHE,
+                            stream_to=out_file if STREAM else None,
+                            limiter=LIMITER, retries=MAX_RETRIES)
+        save_review(out_root, persona, run_idx, temp, out_file, result, phase="revision")
+        return result.text
+    print(f"  [review]  {persona:42s} run={run_idx}  temp={temp}")
+    if REVIEW_STORE is None:
+        result = call_model(client, review_params(persona, temp, context), RESPONSE_CACHE,
+                            stream_to=out_file if STREAM else None,
+                            limiter=LIMITER, retries=MAX_RETRIES)
+        save_review(out_root, persona, run_idx, temp, out_file, result)
+        return result.text
+    # Locking the store entry as the request goes out makes a concurrent run
+    # of another config wait for this review instead of paying for it again.
+    key = store_key(persona, temp, context)
+    try:
+        while True:
+            result = hit = REVIEW_STORE.wait(key)
+            if hit is None:
+                result = call_model(client, review_params(persona, temp, context),
+                                    RESPONSE_CACHE, stream_to=out_file if STREAM else None,
+                                    limiter=LIMITER, retries=MAX_RETRIES,
+                                    gate=functools.partial(REVIEW_STORE.lock, key))
+            if result is not None:
+                break
+        if hit is None:
+            REVIEW_STORE.put(key, result, persona=persona)
+    finally:
+        REVIEW_STORE.unlock(key)
+    save_review(out_root, persona, run_idx, temp, out_file, result)
+    return result.text
+
+
+def review_slots(out_root: Path) -> list[tuple[str, int, float, Path]]:
+    """Every (persona, run_idx, temperature, out_file) in the plan."""
+    slots = []
     for persona in PERSONA_ORDER:
-        prompt = load_persona(persona)
+        out_dir = out_root / "expert_reviews" / persona
+        out_dir.mkdir(parents=True, exist_ok=True)
         for i, temp in enumerate(TEMPERATURES, start=1):
-            out_dir  = out_root / "expert_reviews" / persona
-            out_dir.mkdir(parents=True, exist_ok=True)
-            out_file = out_dir / f"run_{i}.md"
-
-            # --- resume: skip if already good ---
-            if is_valid_output(out_file):
-                print(f"  [skip]    {persona:42s} run={i}  (cached)")
-                reviews[persona][i] = out_file.read_text(encoding="utf-8")
-                continue
+            slots.append((persona, i, temp, out_dir / f"run_{i}.md"))
+    return slots
 
-            print(f"  [review]  {persona:42s} run={i}  temp={temp}")
-            resp = client.messages.create(
-                model=MODEL,
-                max_tokens=4096,
-                temperature=temp,
-                system=prompt,
-                messages=[{"role": "user", "content": context}],
-            )
-            text: str = resp.content[0].text
-            reviews[persona][i] = text
-            out_file.write_text(text, encoding="utf-8")
 
-    print(f"\n  -> phase 1 complete\n")
-    return reviews
+def phase1(sched: DagScheduler | JobGraph, client: Anthropic, context: str,
+           out_root: Path, packed: Optional[dict[str, str]] = None) -> None:
+    """Schedule (or resume) every expert review.
+
+    Reusable outputs (see reusable_output) are registered as already-complete
+    jobs; the rest are queued ahead of any synthesis so they unblock combos
+    as early as possible.  With --revise, a slot that has a previous review
+    is updated from the diff instead (a slot without one is reviewed afresh).
+    Documents longer than CHUNK_TOKENS are reviewed in parts (schedule_parts).
+    packed maps a persona to its own context (pack_contexts); others get context.
+    """
+    for persona, i, temp, out_file in review_slots(out_root):
+        ctx = (packed or {}).get(persona, context)
+        # Read now: with --revise into the same dir, out_file is overwritten.
+        prior = prior_review(persona, i)
+        parts = chunking.chunk(ctx, CHUNK_TOKENS) if prior is None else [ctx]
+        # --- resume: skip if this review exists (any config) or was answered ---
+        if prior is not None:
+            text = reuse_revision(prior, persona, temp, out_file)
+        else:
+            text = reuse_review(persona, temp, ctx, out_file, chunked=len(parts) > 1)
+        if text is not None:
+            print(f"  [skip]    {persona:42s} run={i}  (cached)")
+            sched.complete(review_key(persona, i), text)
+            continue
+        if len(parts) > 1:
+            schedule_parts(sched, client, persona, i, temp, ctx, parts, out_root, out_file)
+            continue
+
+        sched.add(
+            review_key(persona, i),
+            functools.partial(run_review, client, persona, i, temp, ctx, out_root, out_file,
+                              prior),
+            priority=0,
+        )
 
 
 # ---------------------------------------------------------------------------
-# Phase 2 — syntheses  (sequential, idempotent)
+# Phase 2 — syntheses  (dependency-driven, idempotent)
 # ---------------------------------------------------------------------------
 
+def span_label(span: combos.Span, combo: tuple[int, ...]) -> str:
+    """((0, 2), (1, 2, 3)) -> 'silas_1__amara_2'"""
+    return "__".join(f"{PERSONA_SHORT[PERSONA_ORDER[i]]}_{combo[i]}" for i in range(*span))
+
+
+def node_key(span: combos.Span, combo: tuple[int, ...]) -> str:
+    """Scheduler key of a synthesis-tree node: a review, a digest, or the synthesis."""
+    if span[1] - span[0] == 1:
+        return review_key(PERSONA_ORDER[span[0]], combo[span[0]])
+    if span == (0, len(PERSONA_ORDER)):
+        return f"synth:{combo_label(combo)}"
+    return f"digest:{span_label(span, combo)}"
+
+
+def node_file(out_root: Path, span: combos.Span, combo: tuple[int, ...]) -> Path:
+    """Output file of a review or digest node."""
+    if span[1] - span[0] == 1:
+        return out_root / "expert_reviews" / PERSONA_ORDER[span[0]] / f"run_{combo[span[0]]}.md"
+    return out_root / "digests" / f"{span_label(span, combo)}.md"
+
+
+def top_inputs() -> list[combos.Span]:
+    """Inputs of the final synthesis: every review, or the top-level digests."""
+    return combos.children(SYNTH_TREE, len(SYNTH_TREE), (0, len(PERSONA_ORDER)))
+
+
+def is_passthrough(level: int, span: combos.Span) -> bool:
+    """True for a group of one: the node below carried up a level, no digest."""
+    return combos.children(SYNTH_TREE, level, span) == [span]
+
+
+def tagged_inputs(spans: list[combos.Span], combo: tuple[int, ...],
+                  texts: tuple[str, ...]) -> list[str]:
+    """Tag each review with run index & temperature, each digest with its reviewers."""
+    tagged = []
+    for span, text in zip(spans, texts):
+        names = [PERSONA_ORDER[i].replace("_", " ").upper() for i in range(*span)]
+        if len(names) == 1:
+            r = combo[span[0]]
+            tagged.append(f"=== REVIEW BY {names[0]} (run {r}, temp {TEMPERATURES[r-1]}) ===\n"
+                          f"{text}")
+        else:
+            tagged.append(f"=== DIGEST OF REVIEWS BY {', '.join(names)} ===\n{text}")
+    return tagged
+
+
+def synthesis_params(
+    combo: tuple[int, ...],
+    call_text: str,
+    proposal_text: str,
+    inputs: tuple[str, ...],
+) -> dict:
+    """Messages API parameters for one synthesis.
+
+    inputs are the P reviews (in PERSONA_ORDER), or with a synthesis tree
+    the top-level digests.  Cache breakpoints sit after the documents and
+    after all but the last input.  Combos are enumerated with the last
+    persona varying fastest, so consecutive combos share everything up to
+    the final input and only that tail is fresh input.
+    """
+    tagged = tagged_inputs(top_inputs(), combo, inputs)
+    leading = "\n=== EXPERT REVIEWS ===\n" + "".join(t + "\n\n" for t in tagged[:-1])
+    content = [
+        text_block(build_context(call_text, proposal_text), cache=True),
+        text_block(leading, cache=len(tagged) > 1),
+        text_block(f"{tagged[-1]}\n"),
+    ]
+    return dict(
+        model=MODEL,
+        max_tokens=8192,
+        temperature=SYNTH_TEMP,
+        system=[text_block(load_persona(SYNTHESIZER))],
+        messages=[{"role": "user", "content": content}],
+    )
+
+
+def save_synthesis(out_root: Path, combo: tuple[int, ...], result: CallResult) -> None:
+    """Write SYNTHESIS.md plus links to its source reviews, and record it in the ledger."""
+    label   = combo_label(combo)
+    out_dir = out_root / "syntheses" / label
+    out_dir.mkdir(parents=True, exist_ok=True)
+    write_output(out_dir / "SYNTHESIS.md", result.text)
+
+    # Link the 3 source reviews that fed this combo into the folder.
+    for persona, run_idx in zip(PERSONA_ORDER, combo):
+        src = out_root / "expert_reviews" / persona / f"run_{run_idx}.md"
+        # Use basename to handle personas in subdirectories (e.g., "reading_assistant/dr_foo" → "dr_foo")
+        persona_basename = Path(persona).name
+        link_output(src, out_dir / f"{persona_basename}_review.md")
+    # ... and, with a synthesis tree, the digests it merged.
+    for span in top_inputs():
+        if span[1] - span[0] > 1:
+            link_output(node_file(out_root, span, combo),
+                        out_dir / f"digest_{span_label(span, combo)}.md")
+
+    ledger_for(out_root).record("synthesis", MODEL, combo=label, temperature=SYNTH_TEMP,
+                                **result_fields(result))
+    if result.cached:
+        print(f"  [skip]    {label}  (cached)")
+        return
+    print(f"  [done]    {label}  {format_result(result)}")
+
+
+def run_synthesis(
+    client: Anthropic,
+    combo: tuple[int, ...],
+    call_text: str,
+    proposal_text: str,
+    out_root: Path,
+    *inputs: str,
+) -> None:
+    """Synthesise one combo from its source reviews or top-level digests."""
+    params = synthesis_params(combo, call_text, proposal_text, inputs)
+    result = RESPONSE_CACHE.get(params) if RESPONSE_CACHE is not None else None
+    if result is None:
+        label = combo_label(combo)
+        print(f"  [synth]   {label}")
+        stream_to = out_root / "syntheses" / label / "SYNTHESIS.md" if STREAM else None
+        result = call_model(client, params, RESPONSE_CACHE, stream_to=stream_to,
+                            limiter=LIMITER, retries=MAX_RETRIES)
+    save_synthesis(out_root, combo, result)
+
+
+def digest_params(
+    level: int,
+    span: combos.Span,
+    combo: tuple[int, ...],
+    call_text: str,
+    proposal_text: str,
+    inputs: tuple[str, ...],
+) -> dict:
+    """Messages API parameters for one intermediate digest of the synthesis tree."""
+    tagged = tagged_inputs(combos.children(SYNTH_TREE, level, span), combo, inputs)
+    content = [
+        text_block(build_context(call_text, proposal_text), cache=True),
+        text_block("\n=== EXPERT REVIEWS ===\n" + "".join(t + "\n\n" for t in tagged)),
+        text_block(DIGEST_INSTRUCTION),
+    ]
+    return dict(
+        model=MODEL,
+        max_tokens=DIGEST_MAX_TOKENS,
+        temperature=SYNTH_TEMP,
+        system=[text_block(load_persona(SYNTHESIZER))],
+        messages=[{"role": "user", "content": content}],
+    )
+
+
+def save_digest(out_root: Path, out_file: Path, label: str, result: CallResult) -> None:
+    """Write one digest and record it in the ledger."""
+    write_output(out_file, result.text)
+    ledger_for(out_root).record("digest", MODEL, node=label, temperature=SYNTH_TEMP,
+                                **result_fields(result))
+    if result.cached:
+        print(f"  [skip]    digest {label}  (cached)")
+        return
+    print(f"  [done]    digest {label}  {format_result(result)}")
+
+
+def run_digest(
+    client: Anthropic,
+    level: int,
+    span: combos.Span,
+    combo: tuple[int, ...],
+    call_text: str,
+    proposal_text: str,
+    out_root: Path,
+    *inputs: str,
+) -> str:
+    """Condense one group of reviews (or digests) and return the digest."""
+    params = digest_params(level, span, combo, call_text, proposal_text, inputs)
+    out_file = node_file(out_root, span, combo)
+    result = RESPONSE_CACHE.get(params) if RESPONSE_CACHE is not None else None
+    if result is None:
+        print(f"  [digest]  {span_label(span, combo)}")
+        result = call_model(client, params, RESPONSE_CACHE,
+                            stream_to=out_file if STREAM else None,
+                            limiter=LIMITER, retries=MAX_RETRIES)
+    save_digest(out_root, out_file, span_label(span, combo), result)
+    return result.text
+
+
+def schedule_digests(
+    sched: DagScheduler | JobGraph,
+    client: Anthropic,
+    combo: tuple[int, ...],
+    call_text: str,
+    proposal_text: str,
+    out_root: Path,
+) -> None:
+    """Add the digest jobs a combo's synthesis depends on.
+
+    Digests are keyed by the runs they cover, so combos that share a
+    subgroup's runs share one digest job (and one cached response).
+    """
+    for level, spans in enumerate(SYNTH_TREE):
+        for span in spans:
+            key = node_key(span, combo)
+            if key in sched or is_passthrough(level, span):
+                continue
+            out_file = node_file(out_root, span, combo)
+            if RESPONSE_CACHE is None and is_valid_output(out_file):
+                sched.complete(key, out_file.read_text(encoding="utf-8"))
+                continue
+            sched.add(
+                key,
+                functools.partial(run_digest, client, level, span, combo,
+                                  call_text, proposal_text, out_root),
+                deps=tuple(node_key(c, combo) for c in combos.children(SYNTH_TREE, level, span)),
+                priority=1,
+            )
+
+
+def all_combos() -> list[tuple[int, ...]]:
+    """Selected synthesis combos: one run index per persona, in PERSONA_ORDER."""
+    return COMBOS
+
+
+def synthesis_done(out_root: Path, combo: tuple[int, ...]) -> bool:
+    """True when the synthesis AND all linked source reviews are valid."""
+    out_dir = out_root / "syntheses" / combo_label(combo)
+    source_copies_ok = all(
+        is_valid_output(out_dir / f"{Path(p).name}_review.md")
+        for p in PERSONA_ORDER
+    )
+    return is_valid_output(out_dir / "SYNTHESIS.md") and source_copies_ok
+
+
 def phase2(
+    sched: DagScheduler | JobGraph,
     client: Anthropic,
     call_text: str,
     proposal_text: str,
-    reviews: dict[str, dict[int, str]],
     out_root: Path,
 ) -> None:
-    """Run (or resume) all 27 syntheses.  Each folder is self-contained."""
-    combos = list(itertools.product(
-        range(1, len(TEMPERATURES) + 1), repeat=len(PERSONA_ORDER)
-    ))
-
-    for combo in combos:
-        label   = combo_label(combo)
-        out_dir = out_root / "syntheses" / label
-        out_dir.mkdir(parents=True, exist_ok=True)
-        synth_file = out_dir / "SYNTHESIS.md"
+    """Schedule (or resume) all syntheses.  Each folder is self-contained.
 
-        # --- resume: skip if synthesis AND all copied source reviews are valid ---
-        source_copies_ok = all(
-            is_valid_output(out_dir / f"{Path(p).name}_review.md")
-            for p in PERSONA_ORDER
-        )
-        if is_valid_output(synth_file) and source_copies_ok:
+    Every combo depends only on its own P reviews, so it starts the moment
+    those land rather than waiting for the whole of Phase 1.  With a
+    synthesis tree it depends on its top-level digests, which in turn
+    depend on their groups' reviews.  With the
+    response cache on, a combo whose exact request was answered before is
+    resolved from the cache when its job runs (its reviews are only known
+    then); with --no-cache, finished folders are skipped up front.
+    """
+    for combo in all_combos():
+        label = combo_label(combo)
+
+        # --- resume (no cache): skip if synthesis AND source reviews are valid ---
+        if RESPONSE_CACHE is None and synthesis_done(out_root, combo):
             print(f"  [skip]    {label}")
             continue
 
-        print(f"  [synth]   {label}")
+        schedule_digests(sched, client, combo, call_text, proposal_text, out_root)
+        sched.add(
+            f"synth:{label}",
+            functools.partial(run_synthesis, client, combo, call_text, proposal_text, out_root),
+            deps=tuple(node_key(span, combo) for span in top_inputs()),
+            priority=1,
+        )
 
-        system_prompt = load_persona(SYNTHESIZER)
 
-        # Tag each review with run index & temperature for the synthesiser.
-        review_block = "\n\n".join(
-            f"=== REVIEW BY {p.replace('_', ' ').upper()} "
-            f"(run {r}, temp {TEMPERATURES[r-1]}) ===\n"
-            f"{reviews[p][r]}"
-            for p, r in zip(PERSONA_ORDER, combo)
-        )
+# ---------------------------------------------------------------------------
+# Batch mode — both phases via the Message Batches API
+# ---------------------------------------------------------------------------
 
-        user_msg = (
-            "=== SOLICITATION / CALL FOR PROPOSALS ===\n"
-            f"{call_text}\n\n"
-            "=== MY PROPOSAL ===\n"
-            f"{proposal_text}\n\n"
-            "=== EXPERT REVIEWS ===\n"
-            f"{review_block}\n"
-        )
+def batch_phase1(client: Anthropic, context: str, out_root: Path, poll: dict,
+                 packed: Optional[dict[str, str]] = None) -> list[str]:
+    """Submit every pending review as one batch.  Returns failure descriptions.
 
-        resp = client.messages.create(
-            model=MODEL,
-            max_tokens=8192,
-            temperature=SYNTH_TEMP,
-            system=system_prompt,
-            messages=[{"role": "user", "content": user_msg}],
-        )
-        synth_file.write_text(resp.content[0].text, encoding="utf-8")
+    Parts of chunked reviews go in the same batch; their merges follow as a
+    second one.
+    """
+    state_path = out_root / ".batch_phase1.json"
+    merge_state_path = out_root / ".batch_phase1_merge.json"
+    failures: list[str] = []
+
+    def on_result(entry: dict, result: CallResult | str) -> None:
+        persona, i = entry["persona"], entry["run"]
+        if isinstance(result, str):
+            part = f" part {entry['part']}" if "part" in entry else ""
+            print(f"  [error]   {persona:42s} run={i}{part}  {result}")
+            failures.append(f"{persona} run={i}{part}")
+            return
+        if RESPONSE_CACHE is not None:
+            RESPONSE_CACHE.store(entry["key"], result)
+        if "part" in entry:
+            save_part(out_root, persona, i, entry["temperature"], entry["part"],
+                      out_root / entry["path"], result)
+            return
+        if REVIEW_STORE is not None and entry.get("store"):
+            REVIEW_STORE.put(entry["store"], result, persona=persona)
+        save_review(out_root, persona, i, entry["temperature"], out_root / entry["path"], result,
+                    phase="revision" if entry.get("revision") else "review")
+
+    batch.resume(client, state_path, on_result, **poll)
+    batch.resume(client, merge_state_path, on_result, **poll)
+
+    def request(requests: dict, meta: dict, params: dict, path: Path, **entry) -> None:
+        cid = f"review-{len(requests)}"
+        requests[cid] = params
+        meta[cid] = {**entry, "path": path.relative_to(out_root).as_posix(),
+                     "key": request_key(params)}
 
-        # Copy the 3 source reviews that fed this combo into the folder.
-        for persona, run_idx in zip(PERSONA_ORDER, combo):
-            src = out_root / "expert_reviews" / persona / f"run_{run_idx}.md"
-            # Use basename to handle personas in subdirectories (e.g., "reading_assistant/dr_foo" → "dr_foo")
-            persona_basename = Path(persona).name
-            shutil.copy2(src, out_dir / f"{persona_basename}_review.md")
+    requests: dict[str, dict] = {}
+    meta: dict[str, dict] = {}
+    chunked: list[tuple[str, int, float, str, Path, int]] = []
+    for persona, i, temp, out_file in review_slots(out_root):
+        ctx = (packed or {}).get(persona, context)
+        prior = prior_review(persona, i)
+        parts = chunking.chunk(ctx, CHUNK_TOKENS) if prior is None else [ctx]
+        if prior is not None:
+            params = revision_params(persona, temp, prior)
+            text = reuse_revision(prior, persona, temp, out_file)
+        else:
+            params = review_params(persona, temp, ctx)
+            text = reuse_review(persona, temp, ctx, out_file, chunked=len(parts) > 1)
+        if text is not None:
+            print(f"  [skip]    {persona:42s} run={i}  (cached)")
+            continue
+        slot = {"persona": persona, "run": i, "temperature": temp}
+        if len(parts) > 1:
+            print(f"  [chunked] {persona:42s} run={i}  {len(parts)} parts")
+            chunked.append((persona, i, temp, ctx, out_file, len(parts)))
+            for k, part_context in enumerate(parts, start=1):
+                path = part_file(out_file, k)
+                params = part_params(persona, temp, part_context, k, len(parts))
+                if reusable_output(path, params) is None:
+                    request(requests, meta, params, path, part=k, **slot)
+        elif prior is not None:
+            request(requests, meta, params, out_file, revision=True, **slot)
+        else:
+            request(requests, meta, params, out_file, store=store_key(persona, temp, ctx), **slot)
+
+    batch.run(client, requests, meta, state_path, on_result, **poll)
+
+    requests, meta = {}, {}
+    for persona, i, temp, ctx, out_file, n in chunked:
+        paths = [part_file(out_file, k) for k in range(1, n + 1)]
+        if not all(is_valid_output(p) for p in paths):
+            print(f"  [blocked] {persona:42s} run={i}  (part missing)")
+            continue
+        params = merge_params(persona, temp, tuple(p.read_text(encoding="utf-8") for p in paths))
+        hit = RESPONSE_CACHE.get(params) if RESPONSE_CACHE is not None else None
+        if hit is not None:
+            save_review(out_root, persona, i, temp, out_file, hit)
+            continue
+        request(requests, meta, params, out_file, store=store_key(persona, temp, ctx),
+                persona=persona, run=i, temperature=temp)
+    batch.run(client, requests, meta, merge_state_path, on_result, **poll)
+    return failures
 
-    print(f"\n  -> phase 2 complete\n")
+
+def batch_digests(client: Anthropic, call_text: str, proposal_text: str, out_root: Path,
+                  poll: dict, level: int) -> list[str]:
+    """Submit one level of pending digests as one batch.  Returns failure descriptions."""
+    state_path = out_root / f".batch_digests_{level}.json"
+    failures: list[str] = []
+
+    def on_result(entry: dict, result: CallResult | str) -> None:
+        span, combo = tuple(entry["span"]), tuple(entry["combo"])
+        label = span_label(span, combo)
+        if isinstance(result, str):
+            print(f"  [error]   digest {label}  {result}")
+            failures.append(f"digest {label}")
+            return
+        if RESPONSE_CACHE is not None:
+            RESPONSE_CACHE.store(entry["key"], result)
+        save_digest(out_root, node_file(out_root, span, combo), label, result)
+
+    batch.resume(client, state_path, on_result, **poll)
+
+    requests: dict[str, dict] = {}
+    meta: dict[str, dict] = {}
+    seen: set[str] = set()
+    for combo in all_combos():
+        if RESPONSE_CACHE is None and synthesis_done(out_root, combo):
+            continue
+        for span in SYNTH_TREE[level]:
+            label = span_label(span, combo)
+            if label in seen or is_passthrough(level, span):
+                continue
+            seen.add(label)
+            out_file = node_file(out_root, span, combo)
+            if RESPONSE_CACHE is None and is_valid_output(out_file):
+                print(f"  [skip]    digest {label}")
+                continue
+            sources = [node_file(out_root, c, combo)
+                       for c in combos.children(SYNTH_TREE, level, span)]
+            if not all(is_valid_output(src) for src in sources):
+                print(f"  [blocked] digest {label}  (source input missing)")
+                failures.append(f"digest {label}")
+                continue
+            inputs = tuple(src.read_text(encoding="utf-8") for src in sources)
+            params = digest_params(level, span, combo, call_text, proposal_text, inputs)
+            hit = RESPONSE_CACHE.get(params) if RESPONSE_CACHE is not None else None
+            if hit is not None:
+                save_digest(out_root, out_file, label, hit)
+                continue
+            cid = f"digest-{len(requests)}"
+            requests[cid] = params
+            meta[cid] = {"span": list(span), "combo": list(combo), "key": request_key(params)}
+
+    batch.run(client, requests, meta, state_path, on_result, **poll)
+    return failures
+
+
+def batch_phase2(client: Anthropic, call_text: str, proposal_text: str, out_root: Path,
+                 poll: dict) -> list[str]:
+    """Submit every pending synthesis as one batch.  Returns failure descriptions.
+
+    With a synthesis tree, each digest level goes out as its own batch first.
+    """
+    failures: list[str] = []
+    for level in range(len(SYNTH_TREE)):
+        failures += batch_digests(client, call_text, proposal_text, out_root, poll, level)
+    state_path = out_root / ".batch_phase2.json"
+
+    def on_result(entry: dict, result: CallResult | str) -> None:
+        combo = tuple(entry["combo"])
+        if isinstance(result, str):
+            print(f"  [error]   {combo_label(combo)}  {result}")
+            failures.append(combo_label(combo))
+            return
+        if RESPONSE_CACHE is not None:
+            RESPONSE_CACHE.store(entry["key"], result)
+        save_synthesis(out_root, combo, result)
+
+    batch.resume(client, state_path, on_result, **poll)
+
+    requests: dict[str, dict] = {}
+    meta: dict[str, dict] = {}
+    for combo in all_combos():
+        label = combo_label(combo)
+        if RESPONSE_CACHE is None and synthesis_done(out_root, combo):
+            print(f"  [skip]    {label}")
+            continue
+        sources = [node_file(out_root, span, combo) for span in top_inputs()]
+        if not all(is_valid_output(src) for src in sources):
+            print(f"  [blocked] {label}  (source input missing)")
+            failures.append(label)
+            continue
+        inputs = tuple(src.read_text(encoding="utf-8") for src in sources)
+        params = synthesis_params(combo, call_text, proposal_text, inputs)
+        hit = RESPONSE_CACHE.get(params) if RESPONSE_CACHE is not None else None
+        if hit is not None:
+            save_synthesis(out_root, combo, hit)
+            continue
+        cid = f"synth-{len(requests)}"
+        requests[cid] = params
+        meta[cid] = {"combo": list(combo), "key": request_key(params)}
+
+    batch.run(client, requests, meta, state_path, on_result, **poll)
+    return failures
 
 
 # ---------------------------------------------------------------------------
@@ -227,6 +1121,11 @@ def phase2(
 
 def write_run_config(out_root: Path) -> None:
     """Drop a human-readable summary of run parameters into outputs/."""
+    tree = "flat (one call per synthesis)"
+    if SYNTH_TREE:
+        groups = [", ".join("+".join(PERSONA_SHORT[PERSONA_ORDER[i]] for i in range(*span))
+                            for span in spans) for spans in SYNTH_TREE]
+        tree = f"{len(SYNTH_TREE)} digest level(s): " + " → ".join(groups)
     lines = [
         "# Gauntlet — Run Configuration",
         "",
@@ -236,7 +1135,13 @@ def write_run_config(out_root: Path) -> None:
         f"- **Temperatures:** {TEMPERATURES}",
         f"- **Synthesis temperature:** {SYNTH_TEMP}",
         f"- **Total expert reviews:** {len(PERSONA_ORDER) * len(TEMPERATURES)}",
-        f"- **Total syntheses:** {len(TEMPERATURES) ** len(PERSONA_ORDER)}",
+        f"- **Synthesis design:** {COMBO_DESIGN}",
+        f"- **Synthesis tree:** {tree}",
+        f"- **Reviewer context:** "
+        + (f"relevant sections up to {PACK_BUDGET:,} tokens per persona (see PACKING.md)"
+           if PACK_BUDGET else "full paper"),
+        f"- **Total syntheses:** {len(COMBOS)} of {len(TEMPERATURES) ** len(PERSONA_ORDER)} "
+        f"possible combinations",
         "",
         "## Temperature → run mapping",
         "",
@@ -251,73 +1156,725 @@ def write_run_config(out_root: Path) -> None:
         "`silas_<a>__amara_<b>__julian_<c>` means the synthesiser received",
         "silas `run_<a>`, amara `run_<b>`, julian `run_<c>`.",
         "",
-        "Each folder contains `SYNTHESIS.md` **plus** copies of the three",
-        "source reviews that produced it — no need to cross-reference.",
+        "Each folder contains `SYNTHESIS.md` **plus** the source reviews that",
+        "produced it — no need to cross-reference.  They are hard links to the",
+        "one read-only stored copy of each review in `.blobs/` (symlinks where",
+        "hard links are unsupported), so do not edit them in place: every folder",
+        "sharing that review would change with it.  To change one, save the new",
+        "text as a separate file and move it over the link.",
         "",
     ]
     (out_root / "RUN_CONFIG.md").write_text("\n".join(lines), encoding="utf-8")
 
 
+# ---------------------------------------------------------------------------
+# Context packing — per-reviewer sections of long papers  (--pack-sections)
+# ---------------------------------------------------------------------------
+
+def pack_contexts(call_text: str, proposal_text: str, out_root: Path) -> dict[str, str]:
+    """Each persona's review context with --pack-sections ({} when off).
+
+    The proposal's sections are ranked against the persona prompt by BM25 and
+    packed up to persona_budget(); the call is always kept whole.  A persona
+    whose packing keeps everything gets no entry and shares the full context
+    (and its cached prefix) with the rest.  Writes PACKING.md.
+    """
+    if not PACK_BUDGET:
+        return {}
+    packed: dict[str, str] = {}
+    lines = [
+        "# Gauntlet — Context Packing",
+        "",
+        "| persona | budget | proposal tokens | omitted sections |",
+        "|---|---:|---:|---|",
+    ]
+    for persona in PERSONA_ORDER:
+        budget = persona_budget(persona)
+        p = section_index.pack(proposal_text, load_persona(persona), budget)
+        if not p.full:
+            packed[persona] = build_context(call_text, p.text)
+        lines.append(f"| {persona} | {budget:,} | {p.tokens:,} of {p.total_tokens:,} "
+                     f"| {'; '.join(p.omitted) or '—'} |")
+        print(f"  [pack]    {persona:42s} {p.tokens:,} of {p.total_tokens:,} tokens"
+              + (f"  ({len(p.omitted)} section(s) omitted)" if p.omitted else "  (full text)"))
+    print()
+    lines.append("")
+    write_if_changed(out_root / "PACKING.md", "\n".join(lines))
+    return packed
+
+
+# ---------------------------------------------------------------------------
+# Revisions — incremental re-review of a new draft  (--revise)
+# ---------------------------------------------------------------------------
+
+def save_source(out_root: Path, call_text: str, proposal_text: str) -> None:
+    """Keep the run's extracted documents for a later --revise to diff against.
+
+    Called once the run has completed, which also retires its --revise base.
+    """
+    write_if_changed(out_root / SOURCE_DIR / "call.txt", call_text)
+    write_if_changed(out_root / SOURCE_DIR / "proposal.txt", proposal_text)
+    shutil.rmtree(out_root / REVISE_BASE, ignore_errors=True)
+
+
+def revision_base(out_root: Path) -> Path:
+    """--revise into the run's own output dir: a copy of the run to revise from.
+
+    Reviews are overwritten as they are revised while .source/ moves on only
+    when the run completes, so a rerun after a failure would revise revised
+    reviews against the same diff again.  The documents and reviews are
+    copied to REVISE_BASE before anything is written and every attempt until
+    save_source() reads from that copy.
+    """
+    base = out_root / REVISE_BASE
+    if base.is_dir():
+        return base
+    tmp = out_root / f"{REVISE_BASE}.{os.getpid()}.{threading.get_ident()}.tmp"
+    shutil.rmtree(tmp, ignore_errors=True)
+    shutil.copytree(out_root / SOURCE_DIR, tmp / SOURCE_DIR)
+    for path in (out_root / "expert_reviews").glob("*/run_*.md"):
+        dest = tmp / path.relative_to(out_root)
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copyfile(path, dest)
+    try:
+        tmp.rename(base)
+    except OSError:                 # another worker of this run made it first
+        shutil.rmtree(tmp, ignore_errors=True)
+    return base
+
+
+def prepare_revision(prev_root: Path, call_text: str, proposal_text: str,
+                     out_root: Path) -> None:
+    """Diff this paper against the run in prev_root and set up --revise.
+
+    Writes REVISION.md.  Reviews are then updated from the diff, unless it is
+    too large to be worth it (REVISION_MAX_CHANGE), in which case they run
+    in full as usual.
+    """
+    global REVISE_FROM, REVISION_DIFF
+    base = prev_root
+    try:
+        if prev_root.resolve() == out_root.resolve():
+            base = revision_base(out_root)
+        old_call = (base / SOURCE_DIR / "call.txt").read_text(encoding="utf-8")
+        old_proposal = (base / SOURCE_DIR / "proposal.txt").read_text(encoding="utf-8")
+    except FileNotFoundError:
+        sys.exit(f"ERROR: {prev_root} has no {SOURCE_DIR}/ — --revise needs the output dir "
+                 "of a run that completed with this version of the script.")
+    changes = revisions.diff_sections(old_proposal, proposal_text)
+    for change in revisions.diff_sections(old_call, call_text):
+        if change.status != "unchanged":
+            change.title = f"Call — {change.title}"
+            changes.append(change)
+    REVISION_DIFF = revisions.compact_diff(changes)
+    write_if_changed(out_root / "REVISION.md", revisions.report(changes, str(prev_root)))
+
+    changed = [c for c in changes if c.status != "unchanged"]
+    print(f"[revise]  {len(changed)} of {len(changes)} section(s) changed since {prev_root}  "
+          f"(diff {len(REVISION_DIFF):,} chars, see REVISION.md)")
+    for c in changed:
+        print(f"          {c.status:9s} {c.title}")
+    if len(REVISION_DIFF) > REVISION_MAX_CHANGE * len(proposal_text):
+        print("          too much changed to update reviews from the diff — reviewing in full\n")
+        REVISE_FROM, REVISION_DIFF = None, ""
+        return
+    REVISE_FROM = base
+    print()
+
+
+# ---------------------------------------------------------------------------
+# Plan — pre-flight token, cost, and time estimate  (--plan / --budget)
+# ---------------------------------------------------------------------------
+
+def job_request(job: Job, inputs: tuple[str, ...]) -> tuple[str, dict]:
+    """(ledger phase, request params) of a scheduled job, given its inputs."""
+    fn, a = job.fn.func, job.fn.args
+    if fn is run_review:
+        _, persona, _, temp, ctx, _, _, prior = a
+        if prior is not None:
+            return "revision", revision_params(persona, temp, prior)
+        return "review", review_params(persona, temp, ctx)
+    if fn is run_part:
+        _, persona, _, temp, part_context, part, parts, _, _ = a
+        return "review-part", part_params(persona, temp, part_context, part, parts)
+    if fn is run_merge:
+        return "review", merge_params(a[1], a[3], inputs)
+    if fn is run_digest:
+        _, level, span, combo, call_text, proposal_text, _ = a
+        return "digest", digest_params(level, span, combo, call_text, proposal_text, inputs)
+    if fn is run_synthesis:
+        _, combo, call_text, proposal_text, _ = a
+        return "synthesis", synthesis_params(combo, call_text, proposal_text, inputs)
+    raise ValueError(f"cannot plan job {job.key}")
+
+
+def planned_calls(graph: JobGraph,
+                  history: planner.History) -> tuple[list[planner.PlannedCall], int]:
+    """The calls a built graph would make, and how many the cache already answers.
+
+    Inputs that do not exist yet (reviews feeding a synthesis) are stood in
+    for by placeholder text of the phase's expected output length.
+    """
+    calls: list[planner.PlannedCall] = []
+    outputs: dict[str, Optional[str]] = dict(graph.done)
+    cached = len(graph.done)
+    for key, job in graph.jobs.items():        # dependencies are added first
+        real = all(outputs.get(d) is not None for d in job.deps)
+        inputs = tuple(outputs.get(d) or "" for d in job.deps)
+        phase, params = job_request(job, inputs)
+        hit = RESPONSE_CACHE.get(params) if real and RESPONSE_CACHE is not None else None
+        if hit is not None:
+            outputs[key] = hit.text
+            cached += 1
+            continue
+        outputs[key] = None
+        calls.append(planner.PlannedCall(key, phase, params, job.deps))
+    # Placeholders, now that each missing input's phase is known.
+    phases = {c.key: c.phase for c in calls}
+    for c in calls:
+        if any(outputs.get(d) is None for d in c.deps):
+            inputs = tuple(outputs.get(d) or "word " * (history.output_for(phases.get(d, ""))
+                                                         * CHARS_PER_TOKEN // 5)
+                           for d in c.deps)
+            c.params = job_request(graph.jobs[c.key], inputs)[1]
+    return calls, cached
+
+
+def replaying() -> bool:
+    """True under --replay: RESPONSE_CACHE answers everything, nothing may reach the API."""
+    return isinstance(RESPONSE_CACHE, Cassette) and RESPONSE_CACHE.mode == "replay"
+
+
+def preflight(args: argparse.Namespace, client: Anthropic, call_text: str, proposal_text: str,
+              context: str, packed: dict[str, str], out_root: Path) -> planner.Plan:
+    """Estimate the run before any generation call; enforce --budget.
+
+    Over budget, the combo design is shrunk (orthogonal array, covering
+    design, then the largest random-k that fits); if even one synthesis is
+    too expensive the run is aborted.  Writes PLAN.md.  Under --replay,
+    requests missing from the cassette are planned as uncached calls and
+    reported instead of aborting the plan.
+    """
+    if not replaying():
+        return plan_run(args, client, call_text, proposal_text, context, packed, out_root)
+    with RESPONSE_CACHE.tolerant():
+        return plan_run(args, client, call_text, proposal_text, context, packed, out_root)
+
+
+def plan_run(args: argparse.Namespace, client: Anthropic, call_text: str, proposal_text: str,
+             context: str, packed: dict[str, str], out_root: Path) -> planner.Plan:
+    """preflight() proper."""
+    global COMBOS, COMBO_DESIGN
+    history = planner.History.from_ledger(ledger_for(out_root).path)
+    counted: dict[str, int] = {}
+
+    def count(calls: list[planner.PlannedCall]) -> dict[str, int]:
+        # --count-tokens: exact input counts from the API (free, rate-limited).
+        out = {}
+        for c in calls:
+            rkey = request_key(c.params)
+            if rkey not in counted:
+                counted[rkey] = client.messages.count_tokens(
+                    model=c.params["model"], system=c.params["system"],
+                    messages=c.params["messages"]).input_tokens
+            out[c.key] = counted[rkey]
+        return out
+
+    reviews = JobGraph()
+    with contextlib.redirect_stdout(io.StringIO()):
+        phase1(reviews, client, context, out_root, packed)
+
+    def estimate(design: list[tuple[int, ...]]) -> tuple[planner.Plan, int]:
+        global COMBOS
+        COMBOS = design
+        graph = JobGraph()
+        graph.jobs, graph.done = dict(reviews.jobs), dict(reviews.done)
+        with contextlib.redirect_stdout(io.StringIO()):
+            phase2(graph, client, call_text, proposal_text, out_root)
+        calls, cached = planned_calls(graph, history)
+        counts = count(calls) if args.count_tokens and not replaying() else None
+        return planner.Plan(calls, MODEL, history, args.max_concurrency, args.batch, counts), cached
+
+    plan, cached = estimate(COMBOS)
+    notes = []
+    if args.budget is not None and plan.cost > args.budget:
+        full, full_cost = COMBOS, plan.cost
+        levels, factors = len(TEMPERATURES), len(PERSONA_ORDER)
+        fit, cheapest = None, full_cost
+        for strategy in ("orthogonal", "covering"):
+            design = combos.select(strategy, levels, factors, None, 1, args.combo_seed)
+            if len(design) < len(full):
+                attempt = estimate(design)
+                cheapest = min(cheapest, attempt[0].cost)
+                if attempt[0].cost <= args.budget:
+                    fit = (strategy, None, design, attempt)
+                    break
+        if fit is None:
+            # Largest random-k that fits (cost grows with k).
+            lo, hi = 1, len(full) - 1
+            while lo <= hi:
+                k = (lo + hi) // 2
+                design = combos.select("random-k", levels, factors, k, 1, args.combo_seed)
+                attempt = estimate(design)
+                cheapest = min(cheapest, attempt[0].cost)
+                if attempt[0].cost <= args.budget:
+                    fit, lo = ("random-k", k, design, attempt), k + 1
+                else:
+                    hi = k - 1
+        if fit is None:
+            COMBOS = full
+            sys.exit(f"ERROR: even the smallest design projects to ${cheapest:,.2f} (full plan "
+                     f"${full_cost:,.2f}), over --budget ${args.budget:,.2f}; nothing was "
+                     "generated.")
+        strategy, k, COMBOS, (plan, cached) = fit
+        design = combos.describe(strategy, k, 1, args.combo_seed, levels)
+        COMBO_DESIGN = f"{design} (downsized to fit a ${args.budget:,.2f} budget)"
+        notes.append(f"**Downsized to fit --budget ${args.budget:,.2f}:** {design}, "
+                     f"{len(COMBOS)} of {len(full)} syntheses (full plan: ${full_cost:,.2f})")
+        write_run_config(out_root)
+    if replaying() and plan.calls:
+        notes.append(f"**Not in the cassette:** {len(plan.calls)} call(s) above are missing "
+                     f"from {RESPONSE_CACHE.path}; --replay stops at the first of them")
+    if replaying() and args.count_tokens:
+        notes.append("**--count-tokens ignored under --replay** (no API access): input tokens "
+                     "are local estimates")
+
+    write_if_changed(out_root / "PLAN.md", plan.report(args.proposal_pdf.name, cached, notes))
+    wall = ("batch turnaround" if args.batch
+            else f"~{plan.wall_seconds() / 60:,.1f} min at {args.max_concurrency} in flight")
+    print(f"[plan]    {len(plan.calls)} call(s) to make, {cached} cached  "
+          f"~{sum(c.input_tokens + c.cache_write + c.cache_read for c in plan.calls):,} in / "
+          f"~{sum(c.output_tokens for c in plan.calls):,} out tokens  "
+          f"${plan.cost:,.2f}  {wall}")
+    for note in notes:
+        print(f"          {note.replace('**', '')}")
+    print(f"          see {out_root / 'PLAN.md'}\n")
+    return plan
+
+
+# ---------------------------------------------------------------------------
+# Sweep — many papers on one scheduler  (gauntlet.py sweep)
+# ---------------------------------------------------------------------------
+
+DOCUMENT_SUFFIXES: tuple[str, ...] = (".pdf", ".md", ".txt")   # preference order
+
+
+def load_manifest(manifest: Path, default_call: Optional[Path]) -> list[tuple[str, Path, Path]]:
+    """(name, call_pdf, proposal_pdf) for every paper in a sweep manifest.
+
+    A directory contributes each document in it as a proposal reviewed
+    against default_call (a .pdf wins over a .md/.txt of the same stem; the
+    call document itself is skipped).  A JSONL file has one
+    {"proposal": …, "call": …, "name": …} object per line; "call" defaults
+    to default_call, "name" (the output subdirectory) to the proposal's
+    stem, and relative paths are resolved against the manifest's directory.
+    """
+    entries: list[dict] = []
+    if manifest.is_dir():
+        stems: dict[str, Path] = {}
+        for path in sorted(manifest.iterdir(), key=lambda p: (p.stem, p.suffix != ".pdf")):
+            if path.suffix.lower() in DOCUMENT_SUFFIXES and path.stem not in stems:
+                stems[path.stem] = path
+        entries = [{"proposal": str(path)} for path in stems.values()
+                   if default_call is None or path.resolve() != default_call.resolve()]
+        base = manifest
+    else:
+        for n, line in enumerate(manifest.read_text(encoding="utf-8").splitlines(), start=1):
+            if line.strip() and not line.lstrip().startswith("#"):
+                try:
+                    entries.append(json.loads(line))
+                except json.JSONDecodeError as e:
+                    raise ValueError(f"{manifest}:{n}: {e}") from None
+        base = manifest.parent
+
+    papers: list[tuple[str, Path, Path]] = []
+    for entry in entries:
+        proposal = base / entry["proposal"]
+        call = base / entry["call"] if entry.get("call") else default_call
+        if call is None:
+            raise ValueError(f"no call document for {proposal.name}: add \"call\" to the "
+                             "manifest or pass --call")
+        name = entry.get("name") or proposal.stem
+        if any(name == other for other, _, _ in papers):
+            raise ValueError(f"two papers would share output directory {name!r}; "
+                             "give them distinct \"name\"s")
+        papers.append((name, call, proposal))
+    return papers
+
+
+def sweep(args: argparse.Namespace, papers: list[tuple[str, Path, Path]]) -> bool:
+    """Review every paper on one scheduler, limiter, and cache.
+
+    Each paper writes its own tree under args.output.  Its jobs are keyed
+    "<name>/…" and prioritised by position, so earlier papers finish first
+    while the next paper's reviews fill any slots its syntheses leave idle.
+    Never prompts; returns True when every paper completed.
+    """
+    client = configure(args)
+    sched = DagScheduler(args.max_concurrency)
+    texts: dict[str, tuple[str, str]] = {}
+    for index, (name, call_pdf, proposal_pdf) in enumerate(papers):
+        out_root = args.output / name
+        print(f"[paper]   {name}  ({proposal_pdf.name} vs {call_pdf.name})")
+        call_text, proposal_text, context = load_paper(call_pdf, proposal_pdf,
+                                                       args.cache_dir, out_root)
+        texts[name] = (call_text, proposal_text)
+        packed = pack_contexts(call_text, proposal_text, out_root)
+        scope = ScopedScheduler(sched, f"{name}/", priority=2 * index)
+        try:
+            phase1(scope, client, context, out_root, packed)
+            phase2(scope, client, call_text, proposal_text, out_root)
+        except CassetteMiss as e:
+            sys.exit(f"ERROR: {e}")
+
+    print(f"[sweep]   {len(papers)} paper(s)  (up to {args.max_concurrency} requests in flight "
+          "across all of them)\n")
+    result = sched.run()
+    print(f"  [limits]  {LIMITER.snapshot()}")
+    for key, err in result.failures.items():
+        print(f"  [error]   {key}: {err}")
+
+    lines = [
+        "# Gauntlet — Sweep",
+        "",
+        "| paper | calls | cached | failed | blocked | cost (USD) |",
+        "|---|---:|---:|---:|---:|---:|",
+    ]
+    ok = True
+    for name, _, _ in papers:
+        out_root = args.output / name
+        ledger = ledger_for(out_root)
+        write_stats(ledger.path, out_root / "RUN_STATS.md")
+        entries = [e for e in load_ledger(ledger.path) if e["run_id"] == ledger.run_id]
+        failed = sum(k.startswith(f"{name}/") for k in result.failures)
+        blocked = sum(k.startswith(f"{name}/") for k in result.blocked)
+        ok = ok and not failed and not blocked
+        if not failed and not blocked:
+            save_source(out_root, *texts[name])
+        lines.append(f"| {name} | {len(entries)} | {sum(e['cached'] for e in entries)} "
+                     f"| {failed} | {blocked} "
+                     f"| ${sum(e['cost_usd'] or 0.0 for e in entries):,.2f} |")
+        status = "[failed]" if failed or blocked else "[done]"
+        print(f"  {status:10s}{name}")
+    lines.append("")
+    (args.output / "SWEEP.md").write_text("\n".join(lines), encoding="utf-8")
+    return ok
+
+
 # ---------------------------------------------------------------------------
 # Entry point
 # ---------------------------------------------------------------------------
 
-def main() -> None:
+def build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(description="Gauntlet — flywheel multi-agent review engine")
-    parser.add_argument("call_pdf",     type=Path, help="solicitation / call-for-proposals PDF")
-    parser.add_argument("proposal_pdf", type=Path, help="your proposal PDF")
+    parser.add_argument("call_pdf",     type=Path,
+                        help="solicitation / call-for-proposals (PDF, .md or .txt)")
+    parser.add_argument("proposal_pdf", type=Path, help="your proposal (PDF, .md or .txt)")
+    parser.add_argument("-y", "--yes", action="store_true",
+                        help="resume into a non-empty output directory without asking")
+    parser.add_argument("--revise", type=Path, default=None, metavar="PREV_OUTPUT",
+                        help="the proposal is a revision of the one reviewed in PREV_OUTPUT: "
+                             "diff it by section and have reviewers update their previous "
+                             "reviews from the changes (PREV_OUTPUT may equal --output)")
+    parser.add_argument("--plan", "--dry-run", dest="plan", action="store_true",
+                        help="extract the documents, estimate tokens, cost and wall time of "
+                             "every pending request into PLAN.md, and stop without generating")
+    parser.add_argument("--budget", type=float, default=None, metavar="USD",
+                        help="before generating, shrink the combo design to the first that fits "
+                             "this projected cost (orthogonal array, covering design, largest "
+                             "random-k), or abort if even one synthesis does not fit")
+    parser.add_argument("--count-tokens", action="store_true",
+                        help="count input tokens with the API's count_tokens endpoint instead "
+                             "of the local estimate (--plan / --budget)")
+    add_run_options(parser)
+    return parser
+
+
+def add_run_options(parser: argparse.ArgumentParser, multi_config: bool = False) -> None:
+    """Options shared by single runs and sweeps (gauntlet.py sweep).
+
+    With multi_config, -c may be repeated and args.config is a list.
+    """
     parser.add_argument("-o", "--output", type=Path, default=BASE_DIR / "outputs",
                         help="output directory (default: <script dir>/outputs)")
-    parser.add_argument("-c", "--config", type=Path, default=BASE_DIR / "config.toml",
-                        help="project config file (default: <script dir>/config.toml)")
-    args = parser.parse_args()
+    if multi_config:
+        parser.add_argument("-c", "--config", type=Path, action="append", default=None,
+                            help="project config file; repeat to sweep several panels, each "
+                                 "into <output>/<config name>/ (default: <script dir>/config.toml)")
+    else:
+        parser.add_argument("-c", "--config", type=Path, default=BASE_DIR / "config.toml",
+                            help="project config file (default: <script dir>/config.toml)")
+    parser.add_argument("-j", "--max-concurrency", type=int, default=MAX_CONCURRENCY,
+                        help=f"max API requests in flight at once (default: {MAX_CONCURRENCY})")
+    parser.add_argument("--combo-strategy", choices=combos.STRATEGIES, default="full",
+                        help="which review combinations to synthesise: every one (full), a "
+                             "strength-2 orthogonal array, random-k, or a covering design "
+                             "(default: full)")
+    parser.add_argument("--combo-k", type=int, default=None,
+                        help="number of combos for --combo-strategy random-k")
+    parser.add_argument("--combo-min", type=int, default=1,
+                        help="times each review must appear for --combo-strategy covering "
+                             "(default: 1)")
+    parser.add_argument("--combo-seed", type=int, default=0,
+                        help="seed for random-k / covering designs (default: 0)")
+    parser.add_argument("--synthesis-fanout", type=int, default=0,
+                        help="with more than N personas, condense reviews in groups of N "
+                             "into cached digests and synthesise from those (default: flat)")
+    parser.add_argument("--pack-sections", type=int, default=0, metavar="TOKENS",
+                        help="give each reviewer only the proposal sections most relevant to "
+                             "its persona (local BM25 ranking), up to TOKENS — or the persona "
+                             "file's '**Context Budget:** N' line (default: 0, full text)")
+    parser.add_argument("--chunk-tokens", type=int, default=CHUNK_TOKENS, metavar="TOKENS",
+                        help="review documents longer than this in parts whose partial reviews "
+                             f"are merged (default: {CHUNK_TOKENS:,})")
+    parser.add_argument("--rpm", type=float, default=None,
+                        help="requests/min limit to assume until response headers report it")
+    parser.add_argument("--itpm", type=float, default=None,
+                        help="input tokens/min limit to assume until response headers report it")
+    parser.add_argument("--otpm", type=float, default=None,
+                        help="output tokens/min limit to assume until response headers report it")
+    parser.add_argument("--stream", action="store_true",
+                        help="stream responses into <file>.partial as tokens arrive and "
+                             "record time-to-first-token and tokens/sec")
+    parser.add_argument("--batch", action="store_true",
+                        help="submit each phase as a Message Batches job (cheaper, slower); "
+                             "resumes an in-flight batch if interrupted")
+    parser.add_argument("--queue", action="store_true",
+                        help=f"put the run's jobs in <output>/{QUEUE_FILE} and work them; more "
+                             "processes or hosts sharing the output dir can join with "
+                             "`python gauntlet.py worker <output>`")
+    parser.add_argument("--poll-interval", type=float, default=batch.POLL_INITIAL,
+                        help=f"initial batch poll interval in seconds, backs off to "
+                             f"{batch.POLL_MAX:.0f}s (default: {batch.POLL_INITIAL:.0f})")
+    parser.add_argument("--cache-dir", type=Path, default=CACHE_DIR,
+                        help="response cache shared across runs and configs "
+                             "(default: $GAUNTLET_CACHE_DIR or <script dir>/.gauntlet_cache)")
+    parser.add_argument("--cache-max-mb", type=int, default=DEFAULT_MAX_BYTES // 2**20,
+                        help="evict least recently used responses beyond this size "
+                             f"(default: {DEFAULT_MAX_BYTES // 2**20})")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="disable the response cache; resume by output files only")
+    cassette = parser.add_mutually_exclusive_group()
+    cassette.add_argument("--record", type=Path, default=None, metavar="CASSETTE",
+                          help="append every response of this run to a replayable cassette "
+                               "(.jsonl.gz)")
+    cassette.add_argument("--replay", type=Path, default=None, metavar="CASSETTE",
+                          help="answer every request from a recorded cassette; no network "
+                               "access or API key needed, a missing request is an error")
 
-    global PERSONA_ORDER, PERSONA_SHORT, SYNTHESIZER
+
+def configure(args: argparse.Namespace) -> Anthropic:
+    """Apply args to the runtime globals; returns the API client."""
+    global PERSONA_ORDER, PERSONA_SHORT, SYNTHESIZER, RESPONSE_CACHE, REVIEW_STORE, STREAM, LIMITER
+    global COMBOS, COMBO_DESIGN, SYNTH_TREE, PACK_BUDGET, CHUNK_TOKENS
     with open(args.config, "rb") as f:
         cfg = tomllib.load(f)
     PERSONA_ORDER  = [p["name"] for p in cfg["personas"]]
     PERSONA_SHORT  = {p["name"]: p["short"] for p in cfg["personas"]}
     SYNTHESIZER    = cfg["synthesizer"]
-
-    out_root = args.output
-    if out_root.exists() and any(out_root.iterdir()):
-        if input(f"  {out_root} already has contents — resume? [y/N] ").strip().lower() != "y":
-            sys.exit("Aborted.")
+    STREAM         = args.stream
+    PACK_BUDGET    = args.pack_sections
+    CHUNK_TOKENS   = args.chunk_tokens
+    LIMITER        = RateLimiter(args.max_concurrency, args.rpm, args.itpm, args.otpm)
+    try:
+        COMBOS = combos.select(args.combo_strategy, len(TEMPERATURES), len(PERSONA_ORDER),
+                               args.combo_k, args.combo_min, args.combo_seed)
+    except ValueError as e:
+        sys.exit(f"ERROR: {e}")
+    COMBO_DESIGN   = combos.describe(args.combo_strategy, args.combo_k, args.combo_min,
+                                     args.combo_seed, len(TEMPERATURES))
+    SYNTH_TREE     = combos.reduction_tree(len(PERSONA_ORDER), args.synthesis_fanout)
 
     api_key: Optional[str] = os.getenv("ANTHROPIC_API_KEY")
-    if not api_key:
+    if args.replay:
+        api_key = "replay"      # never sent: every request is answered from the cassette
+    elif not api_key:
         sys.exit("ERROR: ANTHROPIC_API_KEY not set. Check your .env file.")
 
-    # max_retries=5 so the SDK backs off & retries on 429s automatically.
+    # max_retries=5 so the SDK backs off & retries on 429s automatically
+    # (batch calls); call_model() turns it off when it retries via LIMITER.
     client = Anthropic(api_key=api_key, max_retries=MAX_RETRIES)
 
-    # --- Ingestion ---
+    RESPONSE_CACHE = REVIEW_STORE = None
+    if not args.no_cache:
+        RESPONSE_CACHE = ResponseCache(args.cache_dir / "responses", args.cache_max_mb * 2**20)
+        if not (args.record or args.replay):
+            REVIEW_STORE = ReviewStore(args.cache_dir / "reviews")
+    try:
+        if args.replay:
+            RESPONSE_CACHE = Cassette(args.replay, "replay")
+            print(f"[replay]  {len(RESPONSE_CACHE)} recorded responses from {args.replay}\n")
+        elif args.record:
+            RESPONSE_CACHE = Cassette(args.record, "record", inner=RESPONSE_CACHE)
+            print(f"[record]  appending responses to {args.record}\n")
+    except FileNotFoundError as e:
+        sys.exit(f"ERROR: {e}")
+    return client
+
+
+def load_paper(call_pdf: Path, proposal_pdf: Path, cache_dir: Path,
+               out_root: Path) -> tuple[str, str, str]:
+    """Ingest one call + proposal and prepare its output tree.
+
+    Returns (call_text, proposal_text, context).
+    """
     print("[setup]   Loading documents…")
-    call_text     = load_pdf_text(args.call_pdf)
-    proposal_text = load_pdf_text(args.proposal_pdf)
+    call_text     = load_document(call_pdf, cache_dir)
+    proposal_text = load_document(proposal_pdf, cache_dir)
     context       = build_context(call_text, proposal_text)
     print(f"          {len(call_text):,} chars (call) + {len(proposal_text):,} chars (proposal)\n")
 
-    # --- Metadata ---
-    out_root.mkdir(exist_ok=True)
+    out_root.mkdir(parents=True, exist_ok=True)
+    output_store(out_root)
     write_run_config(out_root)
+    return call_text, proposal_text, context
+
+
+def setup(args: argparse.Namespace) -> tuple[Anthropic, str, str, str]:
+    """configure() + load_paper() for a single-paper run.
+
+    Returns (client, call_text, proposal_text, context).  Shared by main()
+    and queue workers (gauntlet.py worker), which replay a run's argv.
+    """
+    client = configure(args)
+    call_text, proposal_text, context = load_paper(args.call_pdf, args.proposal_pdf,
+                                                   args.cache_dir, args.output)
+    if args.revise:
+        prepare_revision(args.revise, call_text, proposal_text, args.output)
+    return client, call_text, proposal_text, context
+
+
+def queue_graph(client: Anthropic, call_text: str, proposal_text: str, context: str,
+                out_root: Path, packed: dict[str, str]) -> JobGraph:
+    """The run's DAG, as phase1 + phase2 would hand it to the scheduler."""
+    graph = JobGraph()
+    try:
+        phase1(graph, client, context, out_root, packed)
+        phase2(graph, client, call_text, proposal_text, out_root)
+    except CassetteMiss as e:
+        sys.exit(f"ERROR: {e}")
+    return graph
+
+
+def drain(queue: JobQueue, graph: JobGraph, concurrency: int, out_root: Path) -> bool:
+    """Work the shared queue until it is empty; True when the whole run is done."""
+    done = work(queue, graph, concurrency)
+    print(f"  [limits]  {LIMITER.snapshot()}")
+    write_stats(ledger_for(out_root).path, out_root / "RUN_STATS.md")
+    for key, err in done.failures.items():
+        print(f"  [error]   {key}: {err}")
+    counts = queue.summary()
+    print(f"  [queue]   this worker: {len(done.completed)} job(s); run: {counts['done']} done, "
+          f"{counts['failed']} failed, {counts['pending']} blocked")
+    return counts["failed"] == 0 and counts["pending"] == 0 and counts["running"] == 0
+
+
+def queue_worker(queue: JobQueue, out_root: Path, concurrency: Optional[int]) -> bool:
+    """gauntlet.py worker: join a queued run using the argv it was started with."""
+    cwd = queue.get_meta("cwd")
+    if cwd and Path(cwd).is_dir():
+        os.chdir(cwd)           # relative input paths in argv
+    global COMBOS, COMBO_DESIGN
+    args = build_parser().parse_args(queue.get_meta("argv"))
+    args.output = out_root
+    if concurrency:
+        args.max_concurrency = concurrency
+    client, call_text, proposal_text, context = setup(args)
+    # The design the run settled on (--budget may have shrunk it).
+    if queue.get_meta("combos") is not None:
+        COMBOS = [tuple(c) for c in queue.get_meta("combos")]
+        COMBO_DESIGN = queue.get_meta("combo_design")
+        write_run_config(out_root)
+    packed = pack_contexts(call_text, proposal_text, out_root)
+    graph = queue_graph(client, call_text, proposal_text, context, out_root, packed)
+    return drain(queue, graph, args.max_concurrency, out_root)
+
+
+def main() -> None:
+    args = build_parser().parse_args()
+    out_root = args.output
+    if out_root.exists() and any(out_root.iterdir()) and not args.yes:
+        if input(f"  {out_root} already has contents — resume? [y/N] ").strip().lower() != "y":
+            sys.exit("Aborted.")
+    client, call_text, proposal_text, context = setup(args)
+    packed = pack_contexts(call_text, proposal_text, out_root)
+    if args.plan or args.budget is not None:
+        preflight(args, client, call_text, proposal_text, context, packed, out_root)
+        if args.plan:
+            print("[done]    dry run — no generation calls were made")
+            return
 
     n_reviews   = len(PERSONA_ORDER) * len(TEMPERATURES)
-    n_syntheses = len(TEMPERATURES) ** len(PERSONA_ORDER)
+    n_syntheses = len(COMBOS)
 
-    # --- Phase 1: expert reviews (sequential, resumes from cached outputs) ---
-    print(f"[phase 1] {n_reviews} expert reviews  (sequential, idempotent)\n")
-    reviews = phase1(client, context, out_root)
+    if args.batch:
+        # --- Batch mode: Phase 1 as one batch job, then Phase 2 as another ---
+        poll = {"initial": args.poll_interval}
+        print(f"[phase 1] {n_reviews} expert reviews  (message batch, idempotent)\n")
+        try:
+            failures = batch_phase1(client, context, out_root, poll, packed)
+            print(f"\n[phase 2] {n_syntheses} syntheses       (message batch, idempotent)\n")
+            failures += batch_phase2(client, call_text, proposal_text, out_root, poll)
+        except CassetteMiss as e:
+            write_stats(ledger_for(out_root).path, out_root / "RUN_STATS.md")
+            sys.exit(f"ERROR: {e}")
+        write_stats(ledger_for(out_root).path, out_root / "RUN_STATS.md")
+        if failures:
+            sys.exit(f"ERROR: {len(failures)} request(s) did not complete. "
+                     "Re-run the same command to resume.")
+        print(f"\n  -> batch run complete\n")
+    elif args.queue:
+        # --- Queue mode: publish the DAG, then drain it as the first worker ---
+        # Claims are leased in SQLite, so any number of workers (here or on
+        # other hosts sharing out_root) run each job exactly once.
+        queue = JobQueue(out_root / QUEUE_FILE)
+        queue.set_meta("script", "main")
+        queue.set_meta("argv", sys.argv[1:])
+        queue.set_meta("cwd", os.getcwd())
+        queue.set_meta("combos", COMBOS)
+        queue.set_meta("combo_design", COMBO_DESIGN)
+        graph = queue_graph(client, call_text, proposal_text, context, out_root, packed)
+        queue.enqueue(graph)
+        print(f"\n[queue]   {len(graph.jobs)} job(s) in {queue.path}  (up to "
+              f"{args.max_concurrency} in flight here); add workers with:\n"
+              f"          python gauntlet.py worker {out_root}\n")
+        if not drain(queue, graph, args.max_concurrency, out_root):
+            sys.exit("ERROR: the run did not complete. Re-run the same command to retry "
+                     "failed jobs.")
+        print(f"\n  -> queued run complete\n")
+    else:
+        # --- Phases 1 + 2: one dependency-driven pipeline ---
+        # Each synthesis launches as soon as its own reviews exist, so the two
+        # phases overlap; completed outputs are skipped on resume.
+        print(f"[pipeline] {n_reviews} expert reviews + {n_syntheses} syntheses  "
+              f"(up to {args.max_concurrency} in flight, idempotent)\n")
+        sched = DagScheduler(args.max_concurrency)
+        try:
+            phase1(sched, client, context, out_root, packed)
+            phase2(sched, client, call_text, proposal_text, out_root)
+        except CassetteMiss as e:
+            sys.exit(f"ERROR: {e}")
+        result = sched.run()
+        print(f"  [limits]  {LIMITER.snapshot()}")
+        write_stats(ledger_for(out_root).path, out_root / "RUN_STATS.md")
 
-    # --- Phase 2: syntheses (sequential, resumes from cached outputs) ---
-    print(f"[phase 2] {n_syntheses} syntheses       (sequential, idempotent)\n")
-    phase2(client, call_text, proposal_text, reviews, out_root)
+        for key, err in result.failures.items():
+            print(f"  [error]   {key}: {err}")
+        if not result.ok:
+            sys.exit(f"ERROR: {len(result.failures)} job(s) failed, "
+                     f"{len(result.blocked)} blocked on them. Re-run the same command to resume.")
+        print(f"\n  -> pipeline complete\n")
+    save_source(out_root, call_text, proposal_text)
 
     # --- Summary ---
     print("[done]")
     print(f"  expert_reviews/  — {n_reviews} reviews ({len(PERSONA_ORDER)} personas × {len(TEMPERATURES)} runs)")
     print(f"  syntheses/       — {n_syntheses} self-contained folders")
     print(f"  RUN_CONFIG.md    — temperature & naming reference")
+    print(f"  ledger.jsonl     — per-call latency, tokens, cache hits, retries, cost")
+    print(f"  RUN_STATS.md     — p50/p95 latency, tokens and cost per phase")
+    if args.revise:
+        print(f"  REVISION.md      — sections changed since {args.revise}")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,147 @@
+"""Content-addressed output store with a manifest index, per output tree.
+
+Every model output written into an output tree is stored once as a blob,
+
+    <out_root>/.blobs/<sha256[:2]>/<sha256[2:]>
+
+and the visible file (expert_reviews/…/run_1.md, a synthesis folder's copy
+of that review, …) is a hard link to it — a symlink where hard links are
+not supported, a plain copy as the last resort.  The self-contained
+synthesis folders therefore cost one directory entry per review instead of
+one copy, and disk use grows with unique content rather than combo count.
+Files are always replaced by rename, never rewritten in place, and blobs
+are read-only, so one output changing never changes another that shared
+its blob.
+
+<out_root>/.outputs.jsonl is the manifest: one {"path", "sha", "size",
+"status"} line per write, the last line for a path winning.  Resume checks
+look a path up there and confirm it with a single stat() instead of
+reading the file; paths the manifest does not know (older trees, edits
+made by hand) return None so the caller can fall back to reading.  Appends
+are single short writes, so threads and queue workers on several hosts
+can share one manifest.
+
+This module has no import-time side effects so any script can use it.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import threading
+from pathlib import Path
+from typing import Optional
+
+BLOB_DIR: str = ".blobs"
+MANIFEST_FILE: str = ".outputs.jsonl"
+
+# Blobs (and so every hard link to them) are read-only: an in-place edit
+# would change every output sharing the blob.
+BLOB_MODE: int = 0o444
+
+# Outputs starting with this are error placeholders, never valid.
+ERROR_PREFIX: str = "[ERROR"
+
+
+class OutputStore:
+    """Blob store + manifest for one output tree."""
+
+    def __init__(self, root: Path) -> None:
+        self.root = root
+        self.blobs = root / BLOB_DIR
+        self.manifest = root / MANIFEST_FILE
+        self._abs_root = root.absolute()
+        self._entries: dict[str, dict] = {}
+        self._lock = threading.Lock()
+        if self.manifest.exists():
+            with self.manifest.open(encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue            # torn line from a killed writer
+                    self._entries[entry["path"]] = entry
+
+    def _rel(self, path: Path) -> str:
+        return path.absolute().relative_to(self._abs_root).as_posix()
+
+    def __contains__(self, path: Path) -> bool:
+        try:
+            self._rel(path)
+        except ValueError:
+            return False
+        return True
+
+    def _blob(self, sha: str) -> Path:
+        return self.blobs / sha[:2] / sha[2:]
+
+    def _place(self, blob: Path, path: Path) -> None:
+        """Atomically make path show blob's content."""
+        if path.exists() and os.path.samefile(path, blob):
+            return                  # (renaming a link over its twin would be a no-op)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            os.link(blob, tmp)
+        except OSError:
+            try:
+                os.symlink(os.path.relpath(blob, path.parent), tmp)
+            except OSError:
+                shutil.copyfile(blob, tmp)
+        os.replace(tmp, path)
+
+    def _record(self, path: Path, sha: str, size: int, status: str) -> None:
+        entry = {"path": self._rel(path), "sha": sha, "size": size, "status": status}
+        with self._lock:
+            self._entries[entry["path"]] = entry
+            with self.manifest.open("a", encoding="utf-8") as f:
+                f.write(json.dumps(entry) + "\n")
+
+    def _current(self, path: Path) -> Optional[dict]:
+        """Manifest entry for path, if the file on disk still matches it."""
+        entry = self._entries.get(self._rel(path))
+        if entry is None:
+            return None
+        try:
+            if path.stat().st_size != entry["size"]:
+                return None
+        except FileNotFoundError:
+            return None
+        return entry
+
+    def write(self, path: Path, text: str) -> None:
+        """Store text and make path a view of it (no-op if it already is)."""
+        data = text.encode("utf-8")
+        sha = hashlib.sha256(data).hexdigest()
+        entry = self._current(path)
+        if entry is not None and entry["sha"] == sha:
+            return
+        blob = self._blob(sha)
+        if not blob.exists() or blob.stat().st_size != len(data):
+            # (Re)write a missing blob, or one damaged by an in-place edit.
+            blob.parent.mkdir(parents=True, exist_ok=True)
+            tmp = blob.with_name(f"{blob.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+            tmp.write_bytes(data)
+            os.chmod(tmp, BLOB_MODE)
+            os.replace(tmp, blob)
+        self._place(blob, path)
+        self._record(path, sha, len(data), "error" if text.startswith(ERROR_PREFIX) else "ok")
+
+    def link(self, src: Path, dest: Path) -> None:
+        """Make dest show the same stored content as src."""
+        entry = self._current(src)
+        if entry is None or not self._blob(entry["sha"]).exists():
+            self.write(dest, src.read_text(encoding="utf-8"))
+            return
+        current = self._current(dest)
+        if current is not None and current["sha"] == entry["sha"]:
+            return
+        self._place(self._blob(entry["sha"]), dest)
+        self._record(dest, entry["sha"], entry["size"], entry["status"])
+
+    def valid(self, path: Path) -> Optional[bool]:
+        """True/False for a path the manifest vouches for; None if it cannot tell."""
+        entry = self._current(path)
+        if entry is None:
+            return False if not path.exists() else None
+        return entry["status"] == "ok"
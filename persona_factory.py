@@ -3,18 +3,36 @@
 Given a template persona file and a list of topics, this script uses Claude
 to instantiate customized expert personas for each topic. Useful for rapidly
 creating domain-specific reviewers for different research areas.
+
+Topics are generated concurrently (-j) under one shared rate limiter.  With
+--per-call N, N topics share one request: the template is sent once, the
+model writes each persona between numbered marker lines, and a reply that
+does not deliver exactly one persona per topic is rejected and its topics
+are regenerated one by one.
+
+With --queue the topics become jobs in <output>/queue.sqlite (job_queue.py)
+so several processes or hosts can generate them together via
+`python gauntlet.py worker <output>`.
 """
 
 import argparse
+import functools
+import os
 import re
 import sys
-import time
+import threading
 from pathlib import Path
 from typing import Optional
 
 from anthropic import Anthropic
 from dotenv import load_dotenv
 
+from engine import call_model, result_fields, text_block
+from job_queue import QUEUE_FILE, JobGraph, JobQueue, work
+from rate_limiter import RateLimiter
+from run_ledger import RunLedger, write_stats
+from scheduler import DagScheduler
+
 
 # ---------------------------------------------------------------------------
 # Configuration
@@ -25,8 +43,19 @@ load_dotenv(BASE_DIR / ".env")
 MODEL = "claude-opus-4-5-20251101"
 GENERATION_TEMP: float = 0.7
 
-# Rate limiting: pause between API calls to avoid throttling.
-RATE_LIMIT_DELAY: float = 2.0
+# Rate limiting: calls go through a RateLimiter that paces itself from the
+# API's rate-limit headers and backs off on 429s, instead of a fixed sleep.
+# Default number of requests in flight (-j); the limiter lowers it on 429s.
+MAX_CONCURRENCY: int = 4
+
+# Topics instantiated per request (--per-call).  Output room grows with the
+# group, up to MAX_BATCH_TOKENS (the SDK refuses larger non-streaming calls).
+TOPICS_PER_CALL: int = 1
+PERSONA_MAX_TOKENS: int = 4096
+MAX_BATCH_TOKENS: int = 21_000
+
+# One JSONL line per API call, summarised in persona_factory_RUN_STATS.md.
+LEDGER_PATH: Path = BASE_DIR / "logs" / "persona_factory.jsonl"
 
 
 # ---------------------------------------------------------------------------
@@ -65,45 +94,233 @@ def sanitize_filename(name: str) -> str:
     return name.strip('_') + ".md"
 
 
+def write_atomic(path: Path, text: str) -> None:
+    """Write via a unique temp file so concurrent workers never tear a persona."""
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    tmp.write_text(text, encoding="utf-8")
+    tmp.replace(path)
+
+
 # ---------------------------------------------------------------------------
 # Persona generation
 # ---------------------------------------------------------------------------
 
-def generate_persona(client: Anthropic, topic: str, template_content: str) -> str:
-    """Call Claude to instantiate the template for a specific topic."""
-    print(f"   ...Synthesizing expert for: {topic}...")
-
-    prompt = f"""
+PERSONA_PROMPT = """
 You are an expert creative writer for technical roleplay.
 
 **YOUR TASK:**
 I will provide you a "Persona Template" with placeholders (e.g., [Insert Name], [Insert Field]).
-You must generate a specific, realistic, and highly technical persona file for the research topic: "{topic}".
+{task}
 
 **INSTRUCTIONS:**
-1. Fill in ALL placeholders in the template with creative, domain-specific details relevant to "{topic}".
+1. Fill in ALL placeholders in the template with creative, domain-specific details relevant to the topic.
 2. Invent a fictional but realistic name (e.g., Dr. Archi, Prof. Q).
 3. Use real technical jargon, real corner cases, and real baseline examples for this field.
-4. Output ONLY the final Markdown content. Do not output the "System Prompt" wrapper text.
+4. {output} Do not output the "System Prompt" wrapper text.
 
 **THE TEMPLATE:**
-{template_content}
+{template}
 """
 
-    response = client.messages.create(
-        model=MODEL,
-        max_tokens=4096,
-        temperature=GENERATION_TEMP,
-        messages=[{"role": "user", "content": prompt}],
-    )
-    return response.content[0].text
+# PERSONA_PROMPT's {task} and {output} for one topic, and for a group of {n}.
+SINGLE_TASK = ("You must generate a specific, realistic, and highly technical persona file "
+               "for the research topic given after the template.")
+SINGLE_OUTPUT = "Output ONLY the final Markdown content."
+GROUP_TASK = ("You must generate {n} specific, realistic, and highly technical persona files, "
+              "one for each research topic listed after the template.")
+GROUP_OUTPUT = ("Output ONLY the {n} personas' Markdown content, each between its own numbered "
+                "marker lines as shown after the template, and nothing outside them.")
+
+_MARKER = re.compile(r"^=+\s*(END\s+)?PERSONA\s+(\d+)\b[^\n]*?=+\s*$", re.MULTILINE | re.IGNORECASE)
+_FENCE = re.compile(r"^```[a-z]*\n(.*)\n```$", re.DOTALL)
+# Bold section labels of a template ("**Your Mission:**"): once per persona.
+_LABEL = re.compile(r"^\*\*[^*\n]{1,60}:\*\*", re.MULTILINE)
+
+
+def persona_params(topics: list[str], template_content: str) -> dict:
+    """Messages API parameters instantiating the template for one or more topics.
+
+    The template prompt comes first as a cached block, so every call of a
+    run with the same group size shares it and only the topic list differs.
+    """
+    n = len(topics)
+    if n == 1:
+        prompt = PERSONA_PROMPT.format(task=SINGLE_TASK, output=SINGLE_OUTPUT,
+                                       template=template_content)
+        task = f'**RESEARCH TOPIC:** "{topics[0]}"'
+    else:
+        prompt = PERSONA_PROMPT.format(task=GROUP_TASK.format(n=n),
+                                       output=GROUP_OUTPUT.format(n=n), template=template_content)
+        listed = "\n".join(f'{i}. "{t}"' for i, t in enumerate(topics, start=1))
+        task = (
+            f"**RESEARCH TOPICS:** write {len(topics)} separate personas, one per topic below. "
+            f"Each is a different person with their own name.\n{listed}\n\n"
+            "Put each persona between marker lines exactly like these, and write nothing "
+            "outside them:\n"
+            "=== PERSONA 1 ===\n(persona for topic 1)\n=== END PERSONA 1 ==="
+        )
+    return {
+        "model": MODEL,
+        "max_tokens": min(PERSONA_MAX_TOKENS * len(topics), MAX_BATCH_TOKENS),
+        "temperature": GENERATION_TEMP,
+        "messages": [{"role": "user", "content": [
+            text_block(prompt, cache=True),
+            text_block(task),
+        ]}],
+    }
+
+
+def split_personas(text: str, count: int) -> dict[int, str]:
+    """Personas 1..count found between complete marker pairs in a grouped reply.
+
+    A persona without its END marker (a reply cut off at max_tokens) or with
+    an empty body is left out, as are numbers outside 1..count.
+    """
+    found: dict[int, str] = {}
+    open_n, start = None, 0
+    for m in _MARKER.finditer(text):
+        n = int(m.group(2))
+        if not m.group(1):
+            open_n, start = n, m.end()
+        elif n == open_n:
+            body = text[start:m.start()].strip()
+            fenced = _FENCE.match(body)
+            body = fenced.group(1).strip() if fenced else body
+            if body and 1 <= n <= count and n not in found:
+                found[n] = body
+            open_n = None
+    return found
+
+
+def group_problem(found: dict[int, str], count: int, template_content: str) -> Optional[str]:
+    """Why a grouped reply cannot be trusted, or None.
+
+    Every requested persona must be delimited, and none may hold a section
+    label of the template twice (two personas run together after a dropped
+    marker).
+    """
+    if len(found) != count:
+        return f"{len(found)} of {count} personas delimited"
+    labels = set(_LABEL.findall(template_content))
+    for n, body in sorted(found.items()):
+        if any(_LABEL.findall(body).count(label) > 1 for label in labels):
+            return f"persona {n} holds more than one persona"
+    return None
+
+
+def generate_personas(client: Anthropic, topics: list[str], template_content: str,
+                      limiter: Optional[RateLimiter] = None,
+                      ledger: Optional[RunLedger] = None) -> dict[str, str]:
+    """Call Claude once for a group of topics; returns the personas it delivered.
+
+    A grouped reply that does not hold exactly one persona per topic is
+    rejected as a whole (nothing is returned).
+    """
+    if len(topics) == 1:
+        print(f"   ...Synthesizing expert for: {topics[0]}...")
+    else:
+        print(f"   ...Synthesizing {len(topics)} experts for: {'; '.join(topics)}...")
+    result = call_model(client, persona_params(topics, template_content), limiter=limiter)
+    if ledger is not None:
+        ledger.record("persona", MODEL, topic="; ".join(topics), topics=len(topics),
+                      temperature=GENERATION_TEMP, **result_fields(result))
+    if len(topics) == 1:
+        return {topics[0]: result.text}
+    found = split_personas(result.text, len(topics))
+    problem = group_problem(found, len(topics), template_content)
+    if problem is not None:
+        print(f"   [reject]  grouped reply: {problem}")
+        return {}
+    return {topics[n - 1]: body for n, body in found.items()}
+
+
+def generate_persona(client: Anthropic, topic: str, template_content: str,
+                     limiter: Optional[RateLimiter] = None,
+                     ledger: Optional[RunLedger] = None) -> str:
+    """Call Claude to instantiate the template for a specific topic."""
+    return generate_personas(client, [topic], template_content, limiter, ledger)[topic]
+
+
+# ---------------------------------------------------------------------------
+# Jobs — one per group of topics (DagScheduler, or job_queue.py with --queue)
+# ---------------------------------------------------------------------------
+
+def run_persona_job(client: Anthropic, topics: list[str], template_content: str,
+                    filepaths: list[Path], limiter: RateLimiter, ledger: RunLedger) -> None:
+    """Generate a group of topics; topics the grouped reply missed are redone one by one."""
+    personas = generate_personas(client, topics, template_content, limiter, ledger)
+    for topic, filepath in zip(topics, filepaths):
+        if topic not in personas:
+            print(f"   [retry]   {topic:50s} (not in an accepted grouped reply)")
+            personas[topic] = generate_persona(client, topic, template_content, limiter, ledger)
+        write_atomic(filepath, personas[topic])
+        print(f"   ✅ Saved: {filepath}\n")
+
+
+def add_persona_jobs(sched: DagScheduler | JobGraph, client: Anthropic, topics: list[str],
+                     template_content: str, out_dir: Path, limiter: RateLimiter, ledger: RunLedger,
+                     per_call: int = TOPICS_PER_CALL) -> None:
+    """One job per group of per_call topics; topics whose file already exists are done.
+
+    Groups are cut from the full topic list, so every queue worker derives
+    the same job keys.
+    """
+    files: dict[str, str] = {}
+    for topic in topics:
+        files.setdefault(sanitize_filename(topic), topic)
+    names = list(files)
+    for i in range(0, len(names), max(1, per_call)):
+        group = names[i:i + max(1, per_call)]
+        key = "persona:" + "+".join(group)
+        pending = [name for name in group if not (out_dir / name).exists()]
+        for name in group:
+            if name not in pending:
+                print(f"   [skip]    {files[name]:50s} (cached)")
+        if not pending:
+            sched.complete(key, None)
+            continue
+        sched.add(key, functools.partial(run_persona_job, client, [files[n] for n in pending],
+                                         template_content, [out_dir / n for n in pending],
+                                         limiter, ledger))
+
+
+def drain(queue: JobQueue, graph: JobGraph, concurrency: int) -> bool:
+    """Work the shared queue until it is empty; True when every topic is done."""
+    done = work(queue, graph, concurrency)
+    write_stats(LEDGER_PATH, LEDGER_PATH.with_name("persona_factory_RUN_STATS.md"))
+    for key, err in done.failures.items():
+        print(f"   ❌ Error generating {key}: {err}")
+    counts = queue.summary()
+    print(f"[queue] this worker: {len(done.completed)} job(s); run: {counts['done']} done, "
+          f"{counts['failed']} failed")
+    return counts["failed"] == 0 and counts["pending"] == 0 and counts["running"] == 0
+
+
+def queue_worker(queue: JobQueue, out_dir: Path, concurrency: Optional[int]) -> bool:
+    """gauntlet.py worker: join a queued run using the argv it was started with."""
+    cwd = queue.get_meta("cwd")
+    if cwd and Path(cwd).is_dir():
+        os.chdir(cwd)           # relative input paths in argv
+    args = build_parser().parse_args(queue.get_meta("argv"))
+    api_key = os.getenv("ANTHROPIC_API_KEY")
+    if not api_key:
+        sys.exit("ERROR: ANTHROPIC_API_KEY not set. Check your .env file.")
+    concurrency = concurrency or args.max_concurrency
+    template_content = load_file(args.template)
+    topics = load_topics(args.topics)
+    if not template_content or not topics:
+        sys.exit("ERROR: Failed to load template or topics.")
+    graph = JobGraph()
+    add_persona_jobs(graph, Anthropic(api_key=api_key), topics, template_content, out_dir,
+                     RateLimiter(concurrency), RunLedger(LEDGER_PATH), args.per_call)
+    return drain(queue, graph, concurrency)
 
 
 # ---------------------------------------------------------------------------
 # Entry point
 # ---------------------------------------------------------------------------
 
-def main() -> None:
+def build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(
         description="Persona Factory — generate expert personas from templates"
     )
@@ -113,8 +330,20 @@ def main() -> None:
                         help="Path to the .txt file containing topics (one per line)")
     parser.add_argument("-o", "--output", type=Path, default=BASE_DIR / "generated_personas",
                         help="Output directory (default: <script dir>/generated_personas)")
+    parser.add_argument("-j", "--max-concurrency", type=int, default=MAX_CONCURRENCY,
+                        help=f"requests in flight at once (default: {MAX_CONCURRENCY})")
+    parser.add_argument("--per-call", type=int, default=TOPICS_PER_CALL, metavar="N",
+                        help="topics instantiated per request; the template is sent once per "
+                             f"group (default: {TOPICS_PER_CALL})")
+    parser.add_argument("--queue", action="store_true",
+                        help=f"queue one job per topic in <output>/{QUEUE_FILE} and work them; "
+                             "more processes or hosts can join with "
+                             "`python gauntlet.py worker <output>`")
+    return parser
 
-    args = parser.parse_args()
+
+def main() -> None:
+    args = build_parser().parse_args()
 
     # --- Check API key ---
     api_key: Optional[str] = None
@@ -128,6 +357,8 @@ def main() -> None:
         sys.exit("ERROR: ANTHROPIC_API_KEY not set. Check your .env file.")
 
     client = Anthropic(api_key=api_key)
+    limiter = RateLimiter(args.max_concurrency)
+    ledger = RunLedger(LEDGER_PATH)
 
     # --- Load inputs ---
     template_content = load_file(args.template)
@@ -138,33 +369,39 @@ def main() -> None:
 
     print(f"🏭 Persona Factory Initialized")
     print(f"   📄 Template: {args.template}")
-    print(f"   📚 Topics: {len(topics)}")
+    grouping = f" ({args.per_call} per call)" if args.per_call > 1 else ""
+    print(f"   📚 Topics: {len(topics)}{grouping}")
     print(f"   📂 Output: {args.output}\n")
 
     args.output.mkdir(parents=True, exist_ok=True)
 
-    # --- Generate personas ---
-    for topic in topics:
-        try:
-            filename = sanitize_filename(topic)
-            filepath = args.output / filename
-
-            # --- resume: skip if already exists ---
-            if filepath.exists():
-                print(f"   [skip]    {topic:50s} (cached)")
-                continue
-
-            persona_content = generate_persona(client, topic, template_content)
-            filepath.write_text(persona_content, encoding="utf-8")
-
-            print(f"   ✅ Saved: {filepath}\n")
-
-            # Rate limiting politeness
-            time.sleep(RATE_LIMIT_DELAY)
-
-        except Exception as e:
-            print(f"   ❌ Error generating {topic}: {e}")
+    if args.queue:
+        queue = JobQueue(args.output / QUEUE_FILE)
+        queue.set_meta("script", "persona_factory")
+        queue.set_meta("argv", sys.argv[1:])
+        queue.set_meta("cwd", os.getcwd())
+        graph = JobGraph()
+        add_persona_jobs(graph, client, topics, template_content, args.output, limiter, ledger,
+                         args.per_call)
+        queue.enqueue(graph)
+        print(f"[queue] {len(graph.jobs)} topic(s) in {queue.path}; add workers with:\n"
+              f"        python gauntlet.py worker {args.output}\n")
+        if not drain(queue, graph, args.max_concurrency):
+            sys.exit("ERROR: some personas were not generated. Re-run to retry.")
+        print("[done] Generated personas successfully.")
+        return
 
+    # --- Generate personas ---
+    sched = DagScheduler(args.max_concurrency)
+    add_persona_jobs(sched, client, topics, template_content, args.output, limiter, ledger,
+                     args.per_call)
+    result = sched.run()
+
+    write_stats(LEDGER_PATH, LEDGER_PATH.with_name("persona_factory_RUN_STATS.md"))
+    for key, err in result.failures.items():
+        print(f"   ❌ Error generating {key}: {err}")
+    if not result.ok:
+        sys.exit("ERROR: some personas were not generated. Re-run to retry.")
     print("[done] Generated personas successfully.")
 
 
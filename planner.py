@@ -0,0 +1,198 @@
+"""Pre-flight estimates of a run's tokens, cost, and wall time (--plan, --budget).
+
+The caller describes every call the run would make as a PlannedCall: its
+request parameters (built with placeholder inputs where they depend on
+outputs that do not exist yet), the phase, and its dependencies.  This
+module
+
+  * splits each request's input into uncached, cache-write, and cache-read
+    tokens by replaying the prompt-cache breakpoints in order (the first
+    request with a prefix writes it, later ones read it),
+  * prices the calls with run_ledger.PRICES, and
+  * simulates the DAG on `concurrency` workers for the wall time.
+
+Input tokens come from engine.estimate_request_tokens() unless the caller
+supplies exact counts (the count_tokens endpoint).  Output tokens and
+latencies are taken from a previous ledger when there is one, else from
+DEFAULT_OUTPUT_TOKENS and OUTPUT_TOKENS_PER_SEC.
+
+This module has no import-time side effects so any script can use it.
+"""
+
+import heapq
+import statistics
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Optional
+
+from engine import content_text, estimate_request_tokens, estimate_tokens
+from run_ledger import cost_usd, load as load_ledger
+
+# Expected output tokens per phase when no earlier ledger says otherwise.
+DEFAULT_OUTPUT_TOKENS: dict[str, int] = {
+    "review": 2000,
+    "revision": 2000,
+    "review-part": 1500,
+    "digest": 2000,
+    "synthesis": 3500,
+}
+FALLBACK_OUTPUT_TOKENS: int = 2000
+
+# Latency model without history: time to first token + output at this rate.
+FIRST_TOKEN_SECONDS: float = 5.0
+OUTPUT_TOKENS_PER_SEC: float = 40.0
+
+
+@dataclass
+class PlannedCall:
+    key: str
+    phase: str
+    params: dict[str, Any]
+    deps: tuple[str, ...] = ()
+    input_tokens: int = 0           # filled in by Plan
+    cache_write: int = 0
+    cache_read: int = 0
+    output_tokens: int = 0
+    seconds: float = 0.0
+    cost: float = 0.0
+
+
+@dataclass
+class History:
+    """Mean output tokens and median latency per phase from earlier runs."""
+    output_tokens: dict[str, float] = field(default_factory=dict)
+    seconds: dict[str, float] = field(default_factory=dict)
+
+    @classmethod
+    def from_ledger(cls, path: Path) -> "History":
+        out = cls()
+        if not path.exists():
+            return out
+        by_phase: dict[str, list[dict[str, Any]]] = {}
+        for e in load_ledger(path):
+            if not e.get("cached"):
+                by_phase.setdefault(e["phase"], []).append(e)
+        for phase, entries in by_phase.items():
+            out.output_tokens[phase] = statistics.fmean(e["output_tokens"] for e in entries)
+            latencies = [e["latency"] for e in entries if e.get("latency") and not e.get("batch")]
+            if latencies:
+                out.seconds[phase] = statistics.median(latencies)
+        return out
+
+    def output_for(self, phase: str) -> int:
+        if phase in self.output_tokens:
+            return round(self.output_tokens[phase])
+        return DEFAULT_OUTPUT_TOKENS.get(phase, FALLBACK_OUTPUT_TOKENS)
+
+    def seconds_for(self, phase: str) -> float:
+        if phase in self.seconds:
+            return self.seconds[phase]
+        return FIRST_TOKEN_SECONDS + self.output_for(phase) / OUTPUT_TOKENS_PER_SEC
+
+
+def cache_prefixes(params: dict[str, Any]) -> list[str]:
+    """Request text up to each cache breakpoint, in prompt order (system, then messages)."""
+    blocks: list[Any] = []
+    for part in [params.get("system", "")] + [m.get("content") for m in params.get("messages", [])]:
+        blocks += part if isinstance(part, list) else [{"text": content_text(part)}]
+    prefixes, text = [], ""
+    for block in blocks:
+        text += content_text([block])
+        if isinstance(block, dict) and "cache_control" in block:
+            prefixes.append(text)
+    return prefixes
+
+
+class Plan:
+    """Priced, timed estimate of a list of planned calls."""
+
+    def __init__(self, calls: list[PlannedCall], model: str, history: History,
+                 concurrency: int, batch: bool = False,
+                 counts: Optional[dict[str, int]] = None) -> None:
+        self.calls = calls
+        self.model = model
+        self.concurrency = max(1, concurrency)
+        self.batch = batch
+        seen: set[str] = set()
+        for c in calls:
+            estimated, _ = estimate_request_tokens(c.params)
+            total = (counts or {}).get(c.key, estimated)
+            scale = total / estimated if estimated else 1.0
+            prefixes = cache_prefixes(c.params)
+            read = max((estimate_tokens(p) for p in prefixes if p in seen), default=0)
+            cached = estimate_tokens(prefixes[-1]) if prefixes else 0
+            seen.update(prefixes)
+            c.cache_read = round(read * scale)
+            c.cache_write = round((cached - read) * scale) if cached > read else 0
+            c.input_tokens = max(0, total - c.cache_read - c.cache_write)
+            c.output_tokens = history.output_for(c.phase)
+            c.seconds = history.seconds_for(c.phase)
+            c.cost = cost_usd(model, {
+                "input_tokens": c.input_tokens,
+                "output_tokens": c.output_tokens,
+                "cache_creation_input_tokens": c.cache_write,
+                "cache_read_input_tokens": c.cache_read,
+            }, batch=batch) or 0.0
+
+    @property
+    def cost(self) -> float:
+        return sum(c.cost for c in self.calls)
+
+    def wall_seconds(self) -> float:
+        """Makespan of the DAG on `concurrency` workers (dependencies outside
+        the plan are already done)."""
+        keys = {c.key for c in self.calls}
+        waiting = {c.key: {d for d in c.deps if d in keys} for c in self.calls}
+        dependants: dict[str, list[str]] = {}
+        for c in self.calls:
+            for d in waiting[c.key]:
+                dependants.setdefault(d, []).append(c.key)
+        by_key = {c.key: c for c in self.calls}
+        order = {c.key: i for i, c in enumerate(self.calls)}
+        ready = [(order[k], k) for k, deps in waiting.items() if not deps]
+        heapq.heapify(ready)
+        running: list[tuple[float, str]] = []
+        now = 0.0
+        while ready or running:
+            while ready and len(running) < self.concurrency:
+                _, key = heapq.heappop(ready)
+                heapq.heappush(running, (now + by_key[key].seconds, key))
+            now, key = heapq.heappop(running)
+            for k in dependants.get(key, []):
+                waiting[k].discard(key)
+                if not waiting[k]:
+                    heapq.heappush(ready, (order[k], k))
+        return now
+
+    def report(self, title: str, cached: int, notes: list[str] = ()) -> str:
+        """PLAN.md: calls, tokens, and cost per phase, plus projected wall time."""
+        lines = [
+            f"# Gauntlet — Plan: {title}",
+            "",
+            f"- **Model:** `{self.model}`" + ("  (message batch: half price)" if self.batch else ""),
+            f"- **Calls:** {len(self.calls)} to make, {cached} already cached",
+            f"- **Projected cost:** ${self.cost:,.2f}",
+        ]
+        if self.batch:
+            lines.append("- **Projected wall time:** batch turnaround (up to 24 h)")
+        else:
+            lines.append(f"- **Projected wall time:** {self.wall_seconds() / 60:,.1f} min at "
+                         f"{self.concurrency} request(s) in flight")
+        lines += [f"- {n}" for n in notes]
+        lines += [
+            "",
+            "| phase | calls | input | cache write | cache read | output | cost (USD) |",
+            "|---|---:|---:|---:|---:|---:|---:|",
+        ]
+        phases: dict[str, list[PlannedCall]] = {}
+        for c in self.calls:
+            phases.setdefault(c.phase, []).append(c)
+        for phase, calls in list(phases.items()) + [("**total**", self.calls)]:
+            lines.append(
+                f"| {phase} | {len(calls)} | {sum(c.input_tokens for c in calls):,} "
+                f"| {sum(c.cache_write for c in calls):,} | {sum(c.cache_read for c in calls):,} "
+                f"| {sum(c.output_tokens for c in calls):,} | ${sum(c.cost for c in calls):,.2f} |"
+            )
+        lines += ["", "Output tokens and latencies are estimates (from the previous ledger "
+                  "when there is one).", ""]
+        return "\n".join(lines)
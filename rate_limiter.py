@@ -0,0 +1,210 @@
+"""Adaptive rate limiter shared by every thread (and script) making API calls.
+
+Three token buckets — requests, input tokens, output tokens per minute —
+gate dispatch.  Before a request goes out, its footprint is estimated
+(engine.estimate_request_tokens) and taken from the buckets; once it
+returns, the estimate is reconciled against the real usage.
+
+The org's limits are not configured up front: every response carries
+anthropic-ratelimit-{requests,input-tokens,output-tokens}-{limit,remaining}
+headers, and the buckets resize and resynchronise to them as they arrive.
+The server's `remaining` does not yet count requests still in flight, so
+what those requests reserved is subtracted from it.  Limits passed to the
+constructor only seed the buckets until then.
+
+Concurrency adapts AIMD-style: a 429/529 halves the number of requests
+allowed in flight and pauses dispatch for retry-after; each success with
+comfortable headroom on every bucket lets one more request in, up to
+max_concurrency.  The result is to run just under the quota instead of
+oscillating through 429 storms.
+
+This module has no import-time side effects so any script can use it.
+"""
+
+import threading
+import time
+from typing import Any, Mapping, Optional
+
+# Fraction of a bucket that must remain before concurrency is raised again.
+HEADROOM: float = 0.2
+
+_HEADER_PREFIX = "anthropic-ratelimit-"
+_DIMENSIONS: tuple[str, ...] = ("requests", "input-tokens", "output-tokens")
+
+
+class _Bucket:
+    """Token bucket refilled continuously at capacity per minute."""
+
+    def __init__(self, per_minute: Optional[float]) -> None:
+        self.capacity = per_minute
+        self.level = per_minute or 0.0
+        self.reserved = 0.0         # taken by requests still in flight
+        self.stamp = time.monotonic()
+
+    def refill(self, now: float) -> None:
+        if self.capacity is not None:
+            self.level = min(self.capacity, self.level + (now - self.stamp) * self.capacity / 60)
+        self.stamp = now
+
+    def wait_for(self, amount: float) -> float:
+        """Seconds until amount is available (0 if now).  Oversized requests
+        only need a full bucket, so they cannot wait forever."""
+        if self.capacity is None:
+            return 0.0
+        need = min(amount, self.capacity) - self.level
+        return max(0.0, need * 60 / self.capacity)
+
+    def take(self, amount: float) -> None:
+        if self.capacity is not None:
+            self.level -= amount
+
+    def reserve(self, amount: float) -> None:
+        self.take(amount)
+        self.reserved += amount
+
+    def settle(self, amount: float) -> None:
+        """A reserved request finished: the server's counters now include it."""
+        self.reserved = max(0.0, self.reserved - amount)
+
+    def sync(self, limit: Optional[float], remaining: Optional[float]) -> None:
+        """Adopt the server's view of this bucket, less what in-flight requests hold."""
+        if limit is not None:
+            self.capacity = limit
+        if remaining is not None:
+            level = remaining if self.capacity is None else min(remaining, self.capacity)
+            self.level = level - self.reserved
+
+    def headroom(self) -> float:
+        if not self.capacity:
+            return 1.0
+        return max(0.0, self.level) / self.capacity
+
+
+def _header_float(headers: Mapping[str, str], name: str) -> Optional[float]:
+    value = headers.get(name)
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+class RateLimiter:
+    """Token buckets + adaptive concurrency gate; thread-safe."""
+
+    def __init__(
+        self,
+        max_concurrency: int,
+        requests_per_min: Optional[float] = None,
+        input_tokens_per_min: Optional[float] = None,
+        output_tokens_per_min: Optional[float] = None,
+    ) -> None:
+        self.max_concurrency = max(1, max_concurrency)
+        self.concurrency = self.max_concurrency
+        self.in_flight = 0
+        self.buckets = {
+            "requests": _Bucket(requests_per_min),
+            "input-tokens": _Bucket(input_tokens_per_min),
+            "output-tokens": _Bucket(output_tokens_per_min),
+        }
+        self._paused_until = 0.0
+        self._cond = threading.Condition()
+
+    def acquire(self, est_input: int, est_output: int) -> None:
+        """Block until a request of this estimated size may be dispatched."""
+        need = {"requests": 1, "input-tokens": est_input, "output-tokens": est_output}
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                for b in self.buckets.values():
+                    b.refill(now)
+                wait = max([self._paused_until - now] +
+                           [self.buckets[d].wait_for(need[d]) for d in _DIMENSIONS])
+                if self.in_flight < self.concurrency and wait <= 0:
+                    for d in _DIMENSIONS:
+                        self.buckets[d].reserve(need[d])
+                    self.in_flight += 1
+                    return
+                self._cond.wait(timeout=wait if wait > 0 else None)
+
+    def release(
+        self,
+        headers: Optional[Mapping[str, str]] = None,
+        est: Optional[tuple[int, int]] = None,
+        actual: Optional[tuple[int, int]] = None,
+    ) -> None:
+        """Return a slot after a successful call and learn from its headers.
+
+        est/actual are (input, output) token counts; the difference is given
+        back to (or taken from) the buckets.
+        """
+        with self._cond:
+            self._settle(est)
+            if est is not None and actual is not None:
+                self.buckets["input-tokens"].take(actual[0] - est[0])
+                self.buckets["output-tokens"].take(actual[1] - est[1])
+            if headers is not None:
+                self._sync(headers)
+            if (self.concurrency < self.max_concurrency
+                    and all(b.headroom() > HEADROOM for b in self.buckets.values())):
+                self.concurrency += 1
+            self._cond.notify_all()
+
+    def throttled(self, retry_after: Optional[float],
+                  headers: Optional[Mapping[str, str]] = None,
+                  est: Optional[tuple[int, int]] = None) -> None:
+        """Return a slot after a 429/529: halve concurrency and pause dispatch."""
+        with self._cond:
+            self._settle(est)
+            self.concurrency = max(1, self.concurrency // 2)
+            if retry_after:
+                self._paused_until = max(self._paused_until, time.monotonic() + retry_after)
+            if headers is not None:
+                self._sync(headers)
+            self._cond.notify_all()
+
+    def failed(self, est: Optional[tuple[int, int]] = None) -> None:
+        """Return a slot after a non-throttling failure."""
+        with self._cond:
+            self._settle(est)
+            self._cond.notify_all()
+
+    def cancelled(self, est: tuple[int, int]) -> None:
+        """Return a slot, and its tokens, for a request that was never sent."""
+        with self._cond:
+            self._settle(est)
+            for d, amount in zip(_DIMENSIONS, (1, *est)):
+                bucket = self.buckets[d]
+                bucket.take(-amount)
+                if bucket.capacity is not None:
+                    bucket.level = min(bucket.level, bucket.capacity)
+            self._cond.notify_all()
+
+    def _settle(self, est: Optional[tuple[int, int]]) -> None:
+        """Take one request off the in-flight count and drop its reservation.
+
+        Without est (the acquire() sizes), an average share is dropped.
+        """
+        if est is not None:
+            done = {"requests": 1, "input-tokens": est[0], "output-tokens": est[1]}
+        else:
+            done = {d: b.reserved / max(1, self.in_flight) for d, b in self.buckets.items()}
+        for d in _DIMENSIONS:
+            self.buckets[d].settle(done[d])
+        self.in_flight -= 1
+
+    def _sync(self, headers: Mapping[str, str]) -> None:
+        for d in _DIMENSIONS:
+            self.buckets[d].sync(
+                _header_float(headers, f"{_HEADER_PREFIX}{d}-limit"),
+                _header_float(headers, f"{_HEADER_PREFIX}{d}-remaining"),
+            )
+
+    def snapshot(self) -> dict[str, Any]:
+        """Current state, for progress output."""
+        with self._cond:
+            return {
+                "concurrency": self.concurrency,
+                "in_flight": self.in_flight,
+                **{d: (None if b.capacity is None else round(b.level))
+                   for d, b in self.buckets.items()},
+            }
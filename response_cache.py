@@ -0,0 +1,119 @@
+"""Content-addressed on-disk cache of Messages API responses.
+
+The key is a SHA-256 over the normalised request (model, system prompt,
+messages, temperature, max_tokens, …), so a changed persona file, model,
+temperature, or paper is a miss and re-executes, while an identical request
+is served from disk no matter which output directory, config, or persona
+file name produced it.
+
+Entries live under <root>/<aa>/<sha256>.json.  Reads refresh an entry's
+mtime; when the store grows past max_bytes the least recently used entries
+are evicted.
+
+This module has no import-time side effects so any script can use it.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any
+
+from engine import CallResult
+
+# Bump when the meaning of a cached entry changes, to invalidate old ones.
+CACHE_VERSION: int = 1
+
+DEFAULT_MAX_BYTES: int = 512 * 1024 * 1024
+
+
+def _normalise(obj: Any) -> Any:
+    """Drop fields that cannot change the generated text (cache_control)."""
+    if isinstance(obj, dict):
+        return {k: _normalise(v) for k, v in obj.items() if k != "cache_control"}
+    if isinstance(obj, list):
+        return [_normalise(v) for v in obj]
+    return obj
+
+
+def request_key(params: dict[str, Any]) -> str:
+    """Stable hex digest identifying a request's content."""
+    payload = json.dumps(
+        {"v": CACHE_VERSION, "params": _normalise(params)},
+        sort_keys=True, ensure_ascii=False, separators=(",", ":"),
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """Request-hash → response store with size-based LRU eviction."""
+
+    def __init__(self, root: Path, max_bytes: int = DEFAULT_MAX_BYTES) -> None:
+        self.root = root
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._size: int | None = None
+
+    def _path(self, key: str) -> Path:
+        return self.root / key[:2] / f"{key}.json"
+
+    def _entries(self) -> list[os.DirEntry]:
+        if not self.root.exists():
+            return []
+        entries = []
+        for shard in os.scandir(self.root):
+            if shard.is_dir():
+                entries.extend(e for e in os.scandir(shard.path) if e.name.endswith(".json"))
+        return entries
+
+    def get(self, params: dict[str, Any]) -> CallResult | None:
+        """Cached result for params, or None on a miss."""
+        path = self._path(request_key(params))
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+            result = CallResult(text=data["text"], usage=data.get("usage", {}), cached=True)
+        except (FileNotFoundError, UnicodeDecodeError, json.JSONDecodeError,
+                KeyError, TypeError):
+            return None  # missing or corrupt: re-execute and overwrite
+        try:
+            os.utime(path)  # mark as recently used
+        except OSError:
+            pass
+        return result
+
+    def put(self, params: dict[str, Any], result: CallResult) -> None:
+        """Store result under params' key."""
+        self.store(request_key(params), result)
+
+    def store(self, key: str, result: CallResult) -> None:
+        """Store result under a precomputed key, then evict down to max_bytes."""
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        body = json.dumps({"text": result.text, "usage": result.usage}, ensure_ascii=False)
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp.write_text(body, encoding="utf-8")
+        old = path.stat().st_size if path.exists() else 0
+        tmp.replace(path)
+        with self._lock:
+            if self._size is None:
+                self._size = sum(e.stat().st_size for e in self._entries())
+            else:
+                self._size += path.stat().st_size - old
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def _evict(self) -> None:
+        """Delete least recently used entries until under max_bytes (lock held)."""
+        entries = sorted(self._entries(), key=lambda e: e.stat().st_mtime)
+        total = sum(e.stat().st_size for e in entries)
+        for e in entries:
+            if total <= self.max_bytes:
+                break
+            size = e.stat().st_size
+            try:
+                os.unlink(e.path)
+            except FileNotFoundError:
+                pass
+            total -= size
+        self._size = total
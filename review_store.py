@@ -0,0 +1,144 @@
+"""Shared store of expert reviews, reused across configs and output dirs.
+
+A review depends only on the paper, the persona's prompt, the temperature,
+and the model, so it is stored under exactly that key:
+
+    <root>/<paper sha256[:16]>/<persona sha256[:16]>-t<temperature>-<model>.md
+                                                                  (+ .json)
+
+The paper hash covers the documents the reviewer sees; the persona hash
+covers the persona prompt and the review instruction, so editing either
+re-reviews while renaming a persona file or moving it between panels does
+not.  Every config and output directory that reviews the same paper
+consults the store first: a persona shared by several panels is reviewed
+once and only the synthesis layer is recomputed.
+
+Unlike the response cache the store is never evicted.  A lock per entry
+makes a run that needs a review another process is already writing wait for
+it instead of paying for it twice.  The lock is an flock() on
+<entry>.lock, taken only once the request may be sent (engine.call_model's
+gate) and released by the OS if its holder dies, so a crashed run never
+blocks the others; the file names the holder (host:pid) for diagnostics.
+
+This module has no import-time side effects so any script can use it.
+"""
+
+import fcntl
+import hashlib
+import json
+import os
+import socket
+import threading
+import time
+from pathlib import Path
+from typing import Any, Optional
+
+from engine import CallResult
+
+# How often a run waiting on another's review checks for it.
+LOCK_POLL_SECONDS: float = 2.0
+
+
+def sha256_text(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class ReviewStore:
+    """(paper, persona, temperature, model) → review text, shared by every run."""
+
+    def __init__(self, root: Path) -> None:
+        self.root = root
+        self._held: dict[str, int] = {}     # key → descriptor holding its lock
+        self._held_lock = threading.Lock()
+
+    @staticmethod
+    def key(paper: str, persona: str, temperature: float, model: str) -> str:
+        """Relative entry path (without suffix) for one review."""
+        return (f"{sha256_text(paper)[:16]}/"
+                f"{sha256_text(persona)[:16]}-t{temperature:g}-{model}")
+
+    def _path(self, key: str, suffix: str) -> Path:
+        return self.root / f"{key}{suffix}"
+
+    def get(self, key: str) -> Optional[CallResult]:
+        """Stored review, or None."""
+        try:
+            text = self._path(key, ".md").read_text(encoding="utf-8")
+            meta = json.loads(self._path(key, ".json").read_text(encoding="utf-8"))
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+        return CallResult(text=text, usage=meta.get("usage", {}), cached=True)
+
+    def put(self, key: str, result: CallResult, **labels: Any) -> None:
+        """Store a review (metadata first, so a visible .md is always complete)."""
+        meta = {"usage": result.usage, "stored": round(time.time(), 3), **labels}
+        for suffix, body in ((".json", json.dumps(meta, ensure_ascii=False)),
+                             (".md", result.text)):
+            path = self._path(key, suffix)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+            tmp.write_text(body, encoding="utf-8")
+            tmp.replace(path)
+
+    def _locked_elsewhere(self, key: str) -> bool:
+        """True while another holder (any process or thread) has the entry's lock."""
+        try:
+            fd = os.open(self._path(key, ".lock"), os.O_RDONLY)
+        except FileNotFoundError:
+            return False
+        try:
+            fcntl.flock(fd, fcntl.LOCK_SH | fcntl.LOCK_NB)
+        except BlockingIOError:
+            return True
+        finally:
+            os.close(fd)
+        return False
+
+    def wait(self, key: str) -> Optional[CallResult]:
+        """Stored review, waiting while another run holds the entry's lock.
+
+        None when the entry is neither stored nor being written: the caller
+        generates it, taking the lock with lock() as the request goes out.
+        """
+        while True:
+            hit = self.get(key)
+            if hit is not None or not self._locked_elsewhere(key):
+                return hit or self.get(key)
+            time.sleep(LOCK_POLL_SECONDS)
+
+    def lock(self, key: str) -> bool:
+        """Take the entry's lock without waiting.
+
+        False if someone else holds it, or if the review was stored since
+        the caller last looked: wait() for it instead.
+        """
+        path = self._path(key, ".lock")
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(path, os.O_CREAT | os.O_RDWR)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            # A previous holder unlinks the file on release: a lock on the
+            # old inode guards nothing.
+            current = os.stat(path).st_ino == os.fstat(fd).st_ino
+        except (BlockingIOError, FileNotFoundError):
+            current = False
+        if not current or self.get(key) is not None:
+            os.close(fd)
+            return False
+        os.ftruncate(fd, 0)
+        os.write(fd, f"{socket.gethostname()}:{os.getpid()}\n".encode())
+        with self._held_lock:
+            self._held[key] = fd
+        return True
+
+    def unlock(self, key: str) -> None:
+        """Release a lock taken by lock() (no-op if not held)."""
+        with self._held_lock:
+            fd = self._held.pop(key, None)
+        if fd is None:
+            return
+        try:
+            self._path(key, ".lock").unlink()
+        except FileNotFoundError:
+            pass
+        os.close(fd)
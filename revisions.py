@@ -0,0 +1,161 @@
+"""Section-aware diffs between two drafts of a paper.
+
+split_sections() cuts extracted text at its headings: Markdown `#` lines,
+numbered headings ("3 Method", "4.2 Ablations", "IV. RESULTS"), and the
+usual unnumbered ones (Abstract, Introduction, References, …).  Text before
+the first heading is "(front matter)".  diff_sections() pairs the sections
+of two drafts by normalised title and classifies each as added, removed,
+modified, or unchanged; compact_diff() renders the changes as the short
+unified diff that --revise hands to reviewers alongside their prior review.
+
+This module is stdlib-only and has no import-time side effects.
+"""
+
+import difflib
+import re
+from dataclasses import dataclass
+
+FRONT_MATTER: str = "(front matter)"
+
+# Lines of context around each change in a modified section.
+DIFF_CONTEXT: int = 2
+
+# A section's diff is cut off beyond this many characters.
+MAX_SECTION_DIFF_CHARS: int = 6000
+
+_NAMED = (r"abstract|introduction|background|motivation|related work|method(?:s|ology)?"
+          r"|approach|design|implementation|evaluation|experiments?|results|discussion"
+          r"|limitations|future work|conclusions?|references|bibliography"
+          r"|acknowledge?ments?|appendix(?: [a-z0-9]+)?")
+
+_HEADING = re.compile(
+    r"^(?:"
+    r"#{1,6}\s+(?P<md>\S.*?)\s*#*"                                          # ## Markdown
+    r"|(?-i:(?P<num>(?:\d+(?:\.\d+)*\.?|[IVX]+\.)\s+[A-Z][^.!?:;]{0,80}))"  # 3.1 Title / IV. TITLE
+    r"|(?P<named>(?:" + _NAMED + r")):?"                                    # Abstract
+    r")\s*$",
+    re.IGNORECASE,
+)
+_NUMBERING = re.compile(r"^(?:\d+(?:\.\d+)*\.?|[IVX]+\.)\s+", re.IGNORECASE)
+
+
+@dataclass
+class Section:
+    title: str
+    body: str
+
+
+@dataclass
+class SectionChange:
+    title: str
+    status: str          # added | removed | modified | unchanged
+    added: int = 0       # lines
+    removed: int = 0
+    diff: str = ""
+
+
+def _is_heading(line: str) -> bool:
+    m = _HEADING.match(line.strip())
+    if m is None:
+        return False
+    if m.group("num"):
+        # "3 We propose…" is a sentence, not a heading: require title-like text.
+        # (The pattern already requires a capital after the number, so body lines
+        # such as "4 cores per socket" never get here.)
+        words = _NUMBERING.sub("", line.strip()).split()
+        return 0 < len(words) <= 12 and not line.rstrip().endswith(",")
+    return True
+
+
+def split_sections(text: str) -> list[Section]:
+    """Sections of a document, in order, split at heading lines."""
+    sections: list[Section] = []
+    title, lines = FRONT_MATTER, []
+    for line in text.splitlines():
+        if _is_heading(line):
+            if lines or title != FRONT_MATTER:
+                sections.append(Section(title, "\n".join(lines).strip()))
+            title, lines = line.strip().lstrip("#").strip(), []
+        else:
+            lines.append(line)
+    if lines or title != FRONT_MATTER:
+        sections.append(Section(title, "\n".join(lines).strip()))
+    return [s for s in sections if s.body or s.title != FRONT_MATTER]
+
+
+def _norm(title: str) -> str:
+    """Title key that survives renumbering and case changes."""
+    return re.sub(r"\s+", " ", _NUMBERING.sub("", title)).strip().lower()
+
+
+def _keyed(sections: list[Section]) -> dict[str, Section]:
+    keyed: dict[str, Section] = {}
+    for s in sections:
+        key, n = _norm(s.title), 2
+        while key in keyed:                 # repeated titles: "results", "results#2"
+            key, n = f"{_norm(s.title)}#{n}", n + 1
+        keyed[key] = s
+    return keyed
+
+
+def _unified(old: str, new: str) -> tuple[str, int, int]:
+    lines = list(difflib.unified_diff(old.splitlines(), new.splitlines(),
+                                      n=DIFF_CONTEXT, lineterm=""))[2:]   # drop ---/+++
+    added = sum(1 for l in lines if l.startswith("+"))
+    removed = sum(1 for l in lines if l.startswith("-"))
+    diff = "\n".join(lines)
+    if len(diff) > MAX_SECTION_DIFF_CHARS:
+        diff = diff[:MAX_SECTION_DIFF_CHARS] + "\n… (diff truncated)"
+    return diff, added, removed
+
+
+def diff_sections(old_text: str, new_text: str) -> list[SectionChange]:
+    """Per-section changes from old_text to new_text, in the new draft's order
+    (removed sections last)."""
+    old, new = _keyed(split_sections(old_text)), _keyed(split_sections(new_text))
+    changes: list[SectionChange] = []
+    for key, section in new.items():
+        before = old.get(key)
+        if before is None:
+            diff, added, _ = _unified("", section.body)
+            changes.append(SectionChange(section.title, "added", added, 0, diff))
+        elif before.body == section.body:
+            changes.append(SectionChange(section.title, "unchanged"))
+        else:
+            diff, added, removed = _unified(before.body, section.body)
+            changes.append(SectionChange(section.title, "modified", added, removed, diff))
+    for key, section in old.items():
+        if key not in new:
+            changes.append(SectionChange(section.title, "removed", 0,
+                                         len(section.body.splitlines())))
+    return changes
+
+
+def compact_diff(changes: list[SectionChange]) -> str:
+    """The changed sections only, as headed unified diffs ('' if nothing changed)."""
+    parts = []
+    for c in changes:
+        if c.status == "unchanged":
+            continue
+        if c.status == "removed":
+            parts.append(f"### {c.title}  [removed]")
+            continue
+        parts.append(f"### {c.title}  [{c.status}, +{c.added}/-{c.removed} lines]\n{c.diff}")
+    return "\n\n".join(parts)
+
+
+def report(changes: list[SectionChange], previous: str) -> str:
+    """REVISION.md: which sections changed since `previous`, and how."""
+    lines = [
+        "# Gauntlet — Revision",
+        "",
+        f"Compared with the draft reviewed in `{previous}`.",
+        "",
+        "| section | status | + lines | − lines |",
+        "|---|---|---:|---:|",
+    ]
+    for c in changes:
+        lines.append(f"| {c.title} | {c.status} | {c.added} | {c.removed} |")
+    diff = compact_diff(changes)
+    lines += ["", "## Changes", "", "```diff", diff or "(no changes)", "```", ""]
+    return "\n".join(lines)
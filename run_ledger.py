@@ -0,0 +1,161 @@
+"""Run ledger: one JSONL line per API call, plus a RUN_STATS.md summary.
+
+Every script that calls a model appends an entry per call with its phase,
+labels (persona, combo, topic, …), model, temperature, latency, TTFT,
+token usage, prompt-cache reads/writes, retries, whether it was served
+from the response cache or a message batch, and its cost in USD from
+PRICES.  write_stats() turns a ledger into a Markdown table of calls,
+p50/p95 latency, tokens, and cost per phase.
+
+This module is stdlib-only and has no import-time side effects so any
+script (Anthropic or Gemini) can use it.
+"""
+
+import json
+import math
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Optional
+
+# USD per million tokens: (input, output, cache write, cache read), matched
+# by longest model-name prefix.  Anthropic cache writes are the 5-minute
+# tier (1.25× input), reads 0.1× input.
+PRICES: dict[str, tuple[float, float, float, float]] = {
+    "claude-opus-4-5":   (5.00, 25.00, 6.25, 0.50),
+    "claude-opus-4":     (15.00, 75.00, 18.75, 1.50),
+    "claude-sonnet-4":   (3.00, 15.00, 3.75, 0.30),
+    "claude-haiku-4-5":  (1.00, 5.00, 1.25, 0.10),
+    "gemini-2.5-pro":    (1.25, 10.00, 0.00, 0.31),
+    "gemini-2.5-flash":  (0.30, 2.50, 0.00, 0.075),
+}
+
+# Message Batches are billed at half price.
+BATCH_DISCOUNT: float = 0.5
+
+USAGE_FIELDS: tuple[str, ...] = (
+    "input_tokens",
+    "output_tokens",
+    "cache_creation_input_tokens",
+    "cache_read_input_tokens",
+)
+
+
+def price_for(model: str) -> Optional[tuple[float, float, float, float]]:
+    matches = [prefix for prefix in PRICES if model.startswith(prefix)]
+    return PRICES[max(matches, key=len)] if matches else None
+
+
+def cost_usd(model: str, usage: dict[str, int], batch: bool = False) -> Optional[float]:
+    """Dollar cost of one call, or None for a model missing from PRICES."""
+    price = price_for(model)
+    if price is None:
+        return None
+    cost = sum(usage.get(f, 0) * rate for f, rate in zip(USAGE_FIELDS, price)) / 1e6
+    return cost * BATCH_DISCOUNT if batch else cost
+
+
+class RunLedger:
+    """Thread-safe JSONL ledger; entries from one process share a run id."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.run_id = f"{time.strftime('%Y%m%dT%H%M%S')}-{uuid.uuid4().hex[:6]}"
+        self._lock = threading.Lock()
+
+    def record(
+        self,
+        phase: str,
+        model: str,
+        usage: dict[str, int],
+        latency: float = 0.0,
+        ttft: Optional[float] = None,
+        tokens_per_sec: Optional[float] = None,
+        retries: int = 0,
+        cached: bool = False,
+        batch: bool = False,
+        **labels: Any,
+    ) -> None:
+        """Append one call.  A response-cache hit costs nothing."""
+        cost = 0.0 if cached else cost_usd(model, usage, batch)
+        entry = {
+            "ts": round(time.time(), 3),
+            "run_id": self.run_id,
+            "phase": phase,
+            **labels,
+            "model": model,
+            "latency": round(latency, 3),
+            "ttft": None if ttft is None else round(ttft, 3),
+            "tokens_per_sec": None if tokens_per_sec is None else round(tokens_per_sec, 1),
+            "retries": retries,
+            "cached": cached,
+            "batch": batch,
+            **{f: usage.get(f, 0) for f in USAGE_FIELDS},
+            "cost_usd": None if cost is None else round(cost, 6),
+        }
+        line = json.dumps(entry, ensure_ascii=False)
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with self.path.open("a", encoding="utf-8") as f:
+                f.write(line + "\n")
+
+
+def load(path: Path) -> list[dict[str, Any]]:
+    """All entries of a ledger (empty if it does not exist)."""
+    if not path.exists():
+        return []
+    return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()
+            if line.strip()]
+
+
+def percentile(values: list[float], q: float) -> Optional[float]:
+    """Nearest-rank percentile, q in [0, 100]."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(q / 100 * len(ordered)) - 1)]
+
+
+def _secs(value: Optional[float]) -> str:
+    return "–" if value is None else f"{value:.1f}s"
+
+
+def write_stats(ledger_path: Path, out_path: Path) -> None:
+    """Summarise a ledger as RUN_STATS.md: one row per phase plus a total."""
+    entries = load(ledger_path)
+    phases: dict[str, list[dict[str, Any]]] = {}
+    for e in entries:
+        phases.setdefault(e["phase"], []).append(e)
+
+    lines = [
+        "# Run Statistics",
+        "",
+        f"From `{ledger_path.name}`: {len(entries)} call(s) across "
+        f"{len({e['run_id'] for e in entries})} run(s).  Latency percentiles exclude "
+        "response-cache hits and batch results; cost excludes calls to models missing "
+        "from the price table.",
+        "",
+        "| phase | calls | cached | retries | p50 latency | p95 latency | p50 TTFT "
+        "| input tok | output tok | cache read | cache write | cost (USD) |",
+        "|---|---:|---:|---:|---:|---:|---:|---:|---:|---:|---:|---:|",
+    ]
+    for name, group in [*phases.items(), ("**total**", entries)]:
+        live = [e for e in group if not e["cached"]]
+        latencies = [e["latency"] for e in live if not e["batch"]]
+        ttfts = [e["ttft"] for e in live if e["ttft"] is not None]
+        cost = sum(e["cost_usd"] or 0.0 for e in group)
+        lines.append(
+            f"| {name} | {len(group)} | {len(group) - len(live)} "
+            f"| {sum(e['retries'] for e in group)} "
+            f"| {_secs(percentile(latencies, 50))} | {_secs(percentile(latencies, 95))} "
+            f"| {_secs(percentile(ttfts, 50))} "
+            f"| {sum(e['input_tokens'] for e in live):,} "
+            f"| {sum(e['output_tokens'] for e in live):,} "
+            f"| {sum(e['cache_read_input_tokens'] for e in live):,} "
+            f"| {sum(e['cache_creation_input_tokens'] for e in live):,} "
+            f"| ${cost:,.2f} |"
+        )
+    lines.append("")
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    out_path.write_text("\n".join(lines), encoding="utf-8")
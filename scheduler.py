@@ -0,0 +1,151 @@
+"""Dependency-driven job scheduler shared by the Gauntlet scripts.
+
+Jobs form a DAG: each one names the jobs it depends on and is launched the
+moment all of them have finished, so independent stages overlap instead of
+running phase-by-phase.  At most max_workers jobs are in flight at once;
+among ready jobs the lowest priority value goes first, ties by insertion
+order.
+
+A job's function receives its dependencies' results positionally, in the
+order the dependencies were listed.  A job whose dependency failed is never
+run and is reported as blocked.
+
+ScopedScheduler lets several independent DAGs (one per paper in a sweep)
+share one scheduler, and so one concurrency budget: it prefixes their keys
+and offsets their priorities.
+
+This module has no import-time side effects so any script can use it.
+"""
+
+import heapq
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Callable
+
+
+@dataclass
+class Job:
+    key: str
+    fn: Callable[..., Any]
+    deps: tuple[str, ...] = ()
+    priority: int = 0
+
+
+@dataclass
+class RunResult:
+    results: dict[str, Any] = field(default_factory=dict)
+    failures: dict[str, BaseException] = field(default_factory=dict)
+    blocked: list[str] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return not self.failures and not self.blocked
+
+
+class DagScheduler:
+    """Run a DAG of jobs on a bounded thread pool."""
+
+    def __init__(self, max_workers: int) -> None:
+        self.max_workers = max(1, max_workers)
+        self._jobs: dict[str, Job] = {}
+        self._order: dict[str, int] = {}
+        self._done: dict[str, Any] = {}
+
+    def add(self, key: str, fn: Callable[..., Any], deps: tuple[str, ...] = (),
+            priority: int = 0) -> None:
+        """Register a job.  Dependencies may be added later, but before run()."""
+        if key in self._jobs or key in self._done:
+            raise ValueError(f"duplicate job key: {key}")
+        self._jobs[key] = Job(key, fn, tuple(deps), priority)
+        self._order[key] = len(self._order)
+
+    def complete(self, key: str, value: Any) -> None:
+        """Record a result that needs no work (e.g. a cached output)."""
+        if key in self._jobs or key in self._done:
+            raise ValueError(f"duplicate job key: {key}")
+        self._done[key] = value
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._jobs or key in self._done
+
+    def run(self) -> RunResult:
+        """Execute every registered job; returns results, failures, and blocked keys."""
+        out = RunResult(results=dict(self._done))
+        for job in self._jobs.values():
+            missing = [d for d in job.deps if d not in self._jobs and d not in self._done]
+            if missing:
+                raise KeyError(f"job {job.key!r} depends on unknown job(s): {missing}")
+
+        waiting: dict[str, set[str]] = {
+            k: {d for d in j.deps if d not in out.results} for k, j in self._jobs.items()
+        }
+        dependents: dict[str, list[str]] = {}
+        for k, j in self._jobs.items():
+            for d in j.deps:
+                dependents.setdefault(d, []).append(k)
+
+        ready: list[tuple[int, int, str]] = []
+
+        def push(key: str) -> None:
+            heapq.heappush(ready, (self._jobs[key].priority, self._order[key], key))
+
+        for k, deps in list(waiting.items()):
+            if not deps:
+                push(k)
+                del waiting[k]
+
+        def block(key: str) -> None:
+            for child in dependents.get(key, []):
+                if child in waiting:
+                    del waiting[child]
+                    out.blocked.append(child)
+                    block(child)
+
+        in_flight: dict[Future, str] = {}
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            while ready or in_flight:
+                while ready and len(in_flight) < self.max_workers:
+                    _, _, key = heapq.heappop(ready)
+                    job = self._jobs[key]
+                    args = [out.results[d] for d in job.deps]
+                    in_flight[pool.submit(job.fn, *args)] = key
+
+                finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for fut in finished:
+                    key = in_flight.pop(fut)
+                    try:
+                        out.results[key] = fut.result()
+                    except Exception as e:
+                        out.failures[key] = e
+                        block(key)
+                        continue
+                    for child in dependents.get(key, []):
+                        if child in waiting:
+                            waiting[child].discard(key)
+                            if not waiting[child]:
+                                del waiting[child]
+                                push(child)
+
+        # Anything still waiting sits on a dependency cycle.
+        out.blocked.extend(waiting)
+        return out
+
+
+class ScopedScheduler:
+    """A view of a DagScheduler that namespaces keys and offsets priorities."""
+
+    def __init__(self, sched: DagScheduler, prefix: str, priority: int = 0) -> None:
+        self.sched = sched
+        self.prefix = prefix
+        self.priority = priority
+
+    def add(self, key: str, fn: Callable[..., Any], deps: tuple[str, ...] = (),
+            priority: int = 0) -> None:
+        self.sched.add(self.prefix + key, fn, tuple(self.prefix + d for d in deps),
+                       self.priority + priority)
+
+    def complete(self, key: str, value: Any) -> None:
+        self.sched.complete(self.prefix + key, value)
+
+    def __contains__(self, key: str) -> bool:
+        return self.prefix + key in self.sched
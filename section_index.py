@@ -0,0 +1,122 @@
+"""Local BM25 index over a paper's sections, for per-reviewer context packing.
+
+A methodology reviewer and an evaluation reviewer do not need the same
+pages.  pack() splits the proposal into sections (revisions.split_sections),
+scores them against the reviewer's persona prompt with Okapi BM25, and keeps
+the best-scoring sections that fit a token budget — always including the
+front matter and abstract, and printed back in document order with a note
+naming what was left out.  Papers too short to need it, or whose headings
+could not be found, are returned whole.
+
+Pure stdlib, no network, no import-time side effects.
+"""
+
+import math
+import re
+from collections import Counter
+from dataclasses import dataclass, field
+
+from engine import estimate_tokens
+from revisions import FRONT_MATTER, Section, split_sections
+
+# Okapi BM25 parameters (the usual defaults).
+BM25_K1: float = 1.5
+BM25_B: float = 0.75
+
+# Fewer sections than this means the headings were not found: use the full text.
+MIN_SECTIONS: int = 3
+
+# Kept in every packed context regardless of score (normalised titles).
+PINNED: tuple[str, ...] = (FRONT_MATTER, "abstract")
+
+_STOPWORDS = frozenset("""
+a about above after again against all also an and any are as at be because been
+before being below between both but by can could did do does doing down during each
+few for from further had has have having he her here hers him his how i if in into
+is it its itself just me more most my no nor not now of off on once only or other
+our out over own same she should so some such than that the their them then there
+these they this those through to too under until up very was we were what when where
+which while who whom why will with would you your yours
+""".split())
+
+_WORD = re.compile(r"[a-z0-9]+(?:-[a-z0-9]+)*")
+
+
+def tokenize(text: str) -> list[str]:
+    """Lower-cased word terms without stopwords or one-letter tokens."""
+    return [w for w in _WORD.findall(text.lower()) if len(w) > 1 and w not in _STOPWORDS]
+
+
+class BM25:
+    """Okapi BM25 over a fixed list of documents."""
+
+    def __init__(self, docs: list[str]) -> None:
+        self.terms = [Counter(tokenize(d)) for d in docs]
+        self.lengths = [sum(t.values()) for t in self.terms]
+        self.avg_length = (sum(self.lengths) / len(docs)) if docs else 0.0
+        df = Counter(term for t in self.terms for term in t)
+        n = len(docs)
+        self.idf = {term: math.log(1 + (n - f + 0.5) / (f + 0.5)) for term, f in df.items()}
+
+    def scores(self, query: str) -> list[float]:
+        """Relevance of every document to query, in document order."""
+        q = Counter(tokenize(query))
+        out = []
+        for terms, length in zip(self.terms, self.lengths):
+            norm = BM25_K1 * (1 - BM25_B + BM25_B * length / (self.avg_length or 1))
+            out.append(sum(
+                self.idf[term] * weight * terms[term] * (BM25_K1 + 1) / (terms[term] + norm)
+                for term, weight in q.items() if term in terms
+            ))
+        return out
+
+
+@dataclass
+class Packing:
+    text: str                               # the packed (or full) proposal
+    tokens: int
+    total_tokens: int
+    omitted: list[str] = field(default_factory=list)
+
+    @property
+    def full(self) -> bool:
+        return not self.omitted
+
+
+def _render(section: Section) -> str:
+    return section.body if section.title == FRONT_MATTER else f"{section.title}\n{section.body}"
+
+
+def _note(omitted: list[str]) -> str:
+    return f"[Sections omitted as less relevant to this review: {'; '.join(omitted)}]"
+
+
+def pack(text: str, query: str, budget: int) -> Packing:
+    """The sections of text most relevant to query, within budget tokens.
+
+    Only the pinned sections may take the result over budget.
+    """
+    total = estimate_tokens(text)
+    sections = split_sections(text)
+    if total <= budget or len(sections) < MIN_SECTIONS:
+        return Packing(text, total, total)
+
+    rendered = [_render(s) for s in sections]
+    cost = [estimate_tokens(r) + 1 for r in rendered]      # + the blank line joining it
+    keep = {i for i, s in enumerate(sections) if s.title.strip().lower() in PINNED}
+    # Room for the omission note at its longest (every unpinned section left out).
+    used = sum(cost[i] for i in keep) + estimate_tokens(
+        _note([s.title for i, s in enumerate(sections) if i not in keep]))
+    scores = BM25(rendered).scores(query)
+    for i in sorted(range(len(sections)), key=lambda i: -scores[i]):
+        if i not in keep and used + cost[i] <= budget:
+            keep.add(i)
+            used += cost[i]
+
+    omitted = [sections[i].title for i in range(len(sections)) if i not in keep]
+    if not omitted:
+        return Packing(text, total, total)
+    parts = [rendered[i] for i in sorted(keep)]
+    parts.append(_note(omitted))
+    packed = "\n\n".join(parts)
+    return Packing(packed, estimate_tokens(packed), total, omitted)
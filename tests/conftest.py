@@ -0,0 +1,62 @@
+"""Shared fixtures: the flat root modules on sys.path, and an offline main.py.
+
+The `gauntlet` fixture points main.py's runtime globals at a small plan
+(two personas, one temperature) and gives it a client for the local
+Messages API stand-in (tools/mock_anthropic.py) served on an ephemeral
+port, so nothing here reaches the network.
+"""
+
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+REPO = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO))
+sys.path.insert(0, str(REPO / "tools"))
+
+
+@pytest.fixture
+def mock_api():
+    """(base_url, MockState) of a mock Messages API on 127.0.0.1."""
+    import mock_anthropic as mock
+
+    state = mock.MockState(batch_delay=0.0)
+    server = mock.serve("127.0.0.1", 0, state)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}", state
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def gauntlet(monkeypatch, mock_api):
+    """main.py configured for a two-persona, one-temperature plan; yields (main, client)."""
+    from anthropic import Anthropic
+
+    import combos
+    import main
+    from rate_limiter import RateLimiter
+
+    personas = ["prof_amara_kito", "dr_silas_vane"]
+    monkeypatch.setattr(main, "PERSONA_ORDER", personas, raising=False)
+    monkeypatch.setattr(main, "PERSONA_SHORT", {p: p.split("_")[-1] for p in personas},
+                        raising=False)
+    monkeypatch.setattr(main, "SYNTHESIZER", "synthesizer", raising=False)
+    monkeypatch.setattr(main, "TEMPERATURES", [0.3])
+    monkeypatch.setattr(main, "COMBOS", combos.select("full", 1, len(personas), None, 1, 0),
+                        raising=False)
+    monkeypatch.setattr(main, "COMBO_DESIGN", combos.describe("full", None, 1), raising=False)
+    monkeypatch.setattr(main, "SYNTH_TREE", combos.reduction_tree(len(personas), 0))
+    monkeypatch.setattr(main, "RESPONSE_CACHE", None)
+    monkeypatch.setattr(main, "REVIEW_STORE", None)
+    monkeypatch.setattr(main, "REVISE_FROM", None)
+    monkeypatch.setattr(main, "REVISION_DIFF", "")
+    monkeypatch.setattr(main, "STREAM", False)
+    monkeypatch.setattr(main, "LIMITER", RateLimiter(4))
+    monkeypatch.setattr(main, "LEDGERS", {})
+    monkeypatch.setattr(main, "OUTPUTS", {})
+    base_url, _ = mock_api
+    yield main, Anthropic(api_key="mock", base_url=base_url, max_retries=0)
@@ -0,0 +1,50 @@
+from anthropic import Anthropic
+
+import batch
+from engine import CallResult
+
+POLL = {"initial": 0.0, "sleep": lambda _: None}
+
+
+def params(n: int) -> dict:
+    return {"model": "claude-test", "max_tokens": 64,
+            "messages": [{"role": "user", "content": f"request {n}"}]}
+
+
+def test_interrupted_batch_resumes_without_resubmitting(mock_api, tmp_path):
+    base_url, state = mock_api
+    client = Anthropic(api_key="mock", base_url=base_url, max_retries=0)
+    state_path = tmp_path / ".batch_phase1.json"
+    requests = {f"review-{n}": params(n) for n in range(3)}
+    meta = {cid: {"slot": n} for n, cid in enumerate(requests)}
+
+    # The process dies after submitting, before any result is filed.
+    submitted = batch.submit(client, requests, meta, state_path)
+    assert batch.load_state(state_path) == submitted
+
+    filed = []
+    assert batch.resume(client, state_path, lambda entry, result: filed.append((entry, result)),
+                        **POLL)
+    assert len(state.batches) == 1
+    assert sorted(entry["slot"] for entry, _ in filed) == [0, 1, 2]
+    assert all(isinstance(result, CallResult) and result.batch for _, result in filed)
+    assert not state_path.exists()
+    assert not batch.resume(client, state_path, lambda *_: None, **POLL)
+
+
+def test_missing_results_are_reported(mock_api, tmp_path):
+    base_url, _ = mock_api
+    client = Anthropic(api_key="mock", base_url=base_url, max_retries=0)
+    state_path = tmp_path / "state.json"
+    submitted = batch.submit(client, {"a": params(0)}, {"a": {"n": 0}}, state_path)
+    # A request the batch never saw (e.g. meta edited by hand) gets an error string.
+    submitted["meta"]["b"] = {"n": 1}
+    filed = {}
+    batch.drain(client, submitted, state_path, lambda e, r: filed.__setitem__(e["n"], r), **POLL)
+    assert isinstance(filed[0], CallResult)
+    assert filed[1].startswith("missing")
+
+
+def test_run_skips_empty_request_sets(tmp_path):
+    batch.run(None, {}, {}, tmp_path / "state.json", lambda *_: None)
+    assert not (tmp_path / "state.json").exists()
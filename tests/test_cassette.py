@@ -0,0 +1,101 @@
+import argparse
+import gzip
+import json
+from pathlib import Path
+
+import pytest
+
+from cassette import Cassette, CassetteMiss
+from engine import CallResult
+from job_queue import JobGraph
+from response_cache import request_key
+from scheduler import DagScheduler
+
+PARAMS = {"model": "m", "max_tokens": 10, "messages": [{"role": "user", "content": "hi"}]}
+
+
+def paper(sections: int) -> tuple[str, str]:
+    body = "The method is evaluated on three workloads and compared with prior art. " * 20
+    proposal = "\n\n".join(f"## Section {n}\n\n{body}" for n in range(1, sections + 1))
+    return "Call for proposals on systems research.", proposal
+
+
+def test_round_trip(tmp_path):
+    path = tmp_path / "run.cassette.jsonl.gz"
+    rec = Cassette(path, "record")
+    rec.put(PARAMS, CallResult(text="hello", usage={"output_tokens": 1}))
+    rec.put(PARAMS, CallResult(text="hello", usage={"output_tokens": 1}))   # not re-appended
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        assert [json.loads(line)["key"] for line in f] == [request_key(PARAMS)]
+
+    replay = Cassette(path, "replay")
+    hit = replay.get(PARAMS)
+    assert (hit.text, hit.usage, hit.cached) == ("hello", {"output_tokens": 1}, True)
+    with pytest.raises(CassetteMiss):
+        replay.get({**PARAMS, "max_tokens": 11})
+
+
+def test_record_copies_inner_cache_hits(tmp_path):
+    class Inner:
+        def get(self, params):
+            return CallResult(text="from cache", usage={})
+
+    path = tmp_path / "c.jsonl.gz"
+    Cassette(path, "record", inner=Inner()).get(PARAMS)
+    assert Cassette(path, "replay").get(PARAMS).text == "from cache"
+
+
+def test_replay_without_cassette_file(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        Cassette(tmp_path / "missing.jsonl.gz", "replay")
+
+
+def test_chunked_review_replays(gauntlet, mock_api, monkeypatch, tmp_path):
+    main, client = gauntlet
+    _, state = mock_api
+    monkeypatch.setattr(main, "CHUNK_TOKENS", 600)
+    context = main.build_context(*paper(6))
+    path = tmp_path / "run.cassette.jsonl.gz"
+
+    monkeypatch.setattr(main, "RESPONSE_CACHE", Cassette(path, "record"))
+    sched = DagScheduler(4)
+    main.phase1(sched, client, context, tmp_path / "recorded")
+    result = sched.run()
+    assert not result.failures
+    assert any(key.endswith(":part2") for key in result.results)
+    calls = state.counts["messages"]
+
+    monkeypatch.setattr(main, "RESPONSE_CACHE", Cassette(path, "replay"))
+    graph = JobGraph()
+    main.phase1(graph, client, context, tmp_path / "replayed")
+    assert not graph.jobs
+    for persona in main.PERSONA_ORDER:
+        key = main.review_key(persona, 1)
+        assert graph.done[key] == result.results[key]
+    assert state.counts["messages"] == calls
+
+
+def test_plan_under_replay_reports_missing_requests(gauntlet, monkeypatch, tmp_path, capsys):
+    main, client = gauntlet
+    context = main.build_context(*paper(2))
+    path = tmp_path / "run.cassette.jsonl.gz"
+    monkeypatch.setattr(main, "RESPONSE_CACHE", Cassette(path, "record"))
+    sched = DagScheduler(4)
+    main.phase1(sched, client, context, tmp_path / "recorded")
+    assert sched.run().ok
+
+    # One more persona than was recorded: its review and the synthesis are missing.
+    personas = [*main.PERSONA_ORDER, "dr_julian_rex"]
+    monkeypatch.setattr(main, "PERSONA_ORDER", personas)
+    monkeypatch.setattr(main, "PERSONA_SHORT", {p: p.split("_")[-1] for p in personas})
+    monkeypatch.setattr(main, "COMBOS", [(1, 1, 1)])
+    monkeypatch.setattr(main, "SYNTH_TREE", [])
+    monkeypatch.setattr(main, "RESPONSE_CACHE", Cassette(path, "replay"))
+    args = argparse.Namespace(count_tokens=True, budget=None, max_concurrency=4, batch=False,
+                              proposal_pdf=Path("paper.pdf"), combo_seed=0)
+    out = tmp_path / "replayed"
+    plan = main.preflight(args, client, *paper(2), context, {}, out)
+    assert sorted(c.phase for c in plan.calls) == ["review", "synthesis"]
+    assert "2 call(s) to make, 2 cached" in capsys.readouterr().out
+    report = (out / "PLAN.md").read_text(encoding="utf-8")
+    assert "Not in the cassette" in report and "--count-tokens ignored" in report
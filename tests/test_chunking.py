@@ -0,0 +1,61 @@
+import pytest
+
+from chunking import chunk
+from engine import estimate_tokens
+
+CALL = "=== SOLICITATION / CALL FOR PROPOSALS ==="
+PROPOSAL = "=== MY PROPOSAL ==="
+
+
+def section(title: str, n: int) -> str:
+    return f"{title}\n" + "\n\n".join(f"{title} paragraph {k}: " + "word " * 30 for k in range(n))
+
+
+CONTEXT = "\n".join([
+    CALL, "Proposals must address scalable systems.", "",
+    PROPOSAL, "Scalable Directories", "Abstract", "We propose directories.",
+    section("1 Introduction", 6),
+    section("2 Design", 30),                     # larger than a whole part
+    section("3 Evaluation", 6),
+    section("4 Conclusion", 2),
+]) + "\n"
+
+
+def body_lines(parts: list[str]) -> list[str]:
+    """The context's lines as the parts carry them, without repeated labels."""
+    return [line.rstrip() for p in parts for line in p.splitlines()
+            if line.strip() and not line.endswith("(continued)")]
+
+
+def test_a_context_that_fits_is_one_part():
+    assert chunk(CONTEXT, estimate_tokens(CONTEXT)) == [CONTEXT]
+
+
+@pytest.mark.parametrize("budget", [120, 200, 400, 1000])
+def test_parts_stay_within_budget_and_keep_every_line(budget):
+    parts = chunk(CONTEXT, budget)
+    assert len(parts) > 1
+    assert all(estimate_tokens(p) <= budget for p in parts)
+    assert body_lines(parts) == [line.rstrip() for line in CONTEXT.splitlines() if line.strip()]
+
+
+def test_continuation_parts_repeat_the_document_label():
+    parts = chunk(CONTEXT, 200)
+    assert parts[0].startswith(CALL)
+    for part in parts[1:]:
+        assert part.startswith(f"{PROPOSAL} (continued)\n") or part.startswith(PROPOSAL)
+    assert sum(p.startswith(f"{PROPOSAL} (continued)") for p in parts) == len(parts) - 1
+
+
+def test_oversized_section_is_split():
+    parts = chunk(CONTEXT, 200)
+    design = [p for p in parts if "2 Design paragraph" in p]
+    assert len(design) > 1
+    assert estimate_tokens(section("2 Design", 30)) > 200
+
+
+def test_unbroken_text_is_cut_mid_line():
+    context = f"{PROPOSAL}\n" + "x" * 4000
+    parts = chunk(context, 100)
+    assert all(estimate_tokens(p) <= 100 for p in parts)
+    assert "".join(p.split("\n", 1)[1].strip() for p in parts) == "x" * 4000
@@ -0,0 +1,55 @@
+import itertools
+from collections import Counter
+
+import pytest
+
+import combos
+
+
+def pair_counts(rows, levels):
+    factors = len(rows[0])
+    for i, j in itertools.combinations(range(factors), 2):
+        counts = Counter((r[i], r[j]) for r in rows)
+        yield [counts[(a, b)] for a in range(1, levels + 1) for b in range(1, levels + 1)]
+
+
+@pytest.mark.parametrize("levels, factors, rows", [
+    (2, 3, 4), (3, 4, 9), (3, 6, 27), (4, 5, 16), (5, 4, 25), (8, 3, 64), (9, 10, 81),
+])
+def test_prime_power_levels_are_balanced(levels, factors, rows):
+    array = combos.orthogonal_array(levels, factors)
+    assert len(array) == rows
+    assert combos.balanced(levels)
+    for counts in pair_counts(array, levels):
+        assert len(set(counts)) == 1
+
+
+@pytest.mark.parametrize("levels, factors", [(6, 3), (6, 8), (10, 4)])
+def test_other_levels_cover_every_pair(levels, factors):
+    array = combos.orthogonal_array(levels, factors)
+    assert not combos.balanced(levels)
+    assert all(min(counts) >= 1 for counts in pair_counts(array, levels))
+    assert all(1 <= run <= levels for row in array for run in row)
+
+
+def test_describe_states_the_guarantee():
+    assert "equally often" in combos.describe("orthogonal", levels=4)
+    collapsed = combos.describe("orthogonal", levels=6)
+    assert "not equally often" in collapsed and "6 runs" in collapsed
+
+
+def test_covering_and_random_k():
+    design = combos.covering(3, 4, 2, seed=1)
+    assert design == combos.covering(3, 4, 2, seed=1)
+    counts = Counter((j, r) for combo in design for j, r in enumerate(combo))
+    assert min(counts.values()) >= 2 and len(counts) == 12
+    sample = combos.random_k(3, 4, 10, seed=7)
+    assert sample == combos.random_k(3, 4, 10, seed=7)
+    assert len(set(sample)) == 10 and set(sample) <= set(combos.full_factorial(3, 4))
+
+
+def test_reduction_tree():
+    assert combos.reduction_tree(4, 0) == []
+    levels = combos.reduction_tree(7, 3)
+    assert levels == [[(0, 3), (3, 6), (6, 7)]]
+    assert combos.children(levels, 1, (0, 7)) == [(0, 3), (3, 6), (6, 7)]
@@ -0,0 +1,66 @@
+import sys
+import warnings
+from pathlib import Path
+
+import pytest
+
+from cassette import Cassette, CassetteMiss
+from run_ledger import RunLedger
+
+with warnings.catch_warnings():
+    warnings.simplefilter("ignore", FutureWarning)     # google.generativeai is deprecated
+    import idea_generator
+
+PERSONAS = ["dr_silas_vane", "prof_amara_kito"]
+
+
+def test_recorded_digests_replay_on_a_cold_cache(monkeypatch, tmp_path):
+    monkeypatch.setattr(idea_generator, "DIGEST_DIR", tmp_path / "warm")
+    for name in PERSONAS:
+        idea_generator.write_digest(idea_generator.digest_key(idea_generator.load_persona(name)),
+                                    f"digest of {name}")
+    ledger = RunLedger(tmp_path / "ledger.jsonl")
+    path = tmp_path / "ideas.cassette.jsonl.gz"
+    recorded = idea_generator.persona_digests(PERSONAS, Cassette(path, "record"), ledger, 2)
+
+    monkeypatch.setattr(idea_generator, "DIGEST_DIR", tmp_path / "cold")
+    monkeypatch.setattr(idea_generator, "configure_gemini", lambda: pytest.fail("network"))
+    assert idea_generator.persona_digests(PERSONAS, Cassette(path, "replay"), ledger, 2) == recorded
+
+
+def test_replay_miss_raises(monkeypatch, tmp_path):
+    monkeypatch.setattr(idea_generator, "DIGEST_DIR", tmp_path / "cold")
+    path = tmp_path / "empty.jsonl.gz"
+    Cassette(path, "record").record("unrelated", "text", {})
+    with pytest.raises(CassetteMiss):
+        idea_generator.persona_digests(PERSONAS, Cassette(path, "replay"),
+                                       RunLedger(tmp_path / "ledger.jsonl"), 2)
+
+
+def test_config_is_repeatable_before_the_baseline():
+    parser = idea_generator.build_parser()
+    args = parser.parse_args(["-c", "config_archresearch.toml", "baseline.pdf"])
+    assert args.config == [Path("config_archresearch.toml")]
+    assert args.baseline_pdf == Path("baseline.pdf")
+    args = parser.parse_args(["-c", "a.toml", "-c", "b.toml", "-j", "4", "baseline.pdf"])
+    assert args.config == [Path("a.toml"), Path("b.toml")]
+    assert parser.parse_args(["baseline.pdf"]).config is None
+
+
+def test_replayed_kernels_are_converted_to_pdf(monkeypatch, tmp_path):
+    baseline = tmp_path / "baseline.pdf"
+    baseline.write_bytes(b"%PDF-1.4 baseline")
+    config = idea_generator.BASE_DIR / "config_archresearch.toml"
+    path = tmp_path / "idea.jsonl.gz"
+    recorder = Cassette(path, "record")
+    for kernel in idea_generator.load_kernels([config], baseline, tmp_path):
+        recorder.record(kernel.key, "# Kernel", {})
+
+    converted = []
+    monkeypatch.setattr(idea_generator, "write_pdf", lambda text, out: converted.append(out))
+    monkeypatch.setattr(idea_generator, "configure_gemini", lambda: pytest.fail("network"))
+    monkeypatch.setattr(sys, "argv", ["idea_generator.py", "-c", str(config), "-o", str(tmp_path),
+                                      "--replay", str(path), str(baseline)])
+    idea_generator.main()
+    assert (tmp_path / "idea_kernel.md").read_text(encoding="utf-8") == "# Kernel"
+    assert converted == [tmp_path]
@@ -0,0 +1,85 @@
+import pytest
+from pypdf import PageObject, PdfWriter
+from pypdf.generic import DecodedStreamObject, DictionaryObject, NameObject
+
+import ingest
+
+
+def make_pdf(path, pages: list[str]) -> None:
+    writer = PdfWriter()
+    font = writer._add_object(DictionaryObject({
+        NameObject("/Type"): NameObject("/Font"),
+        NameObject("/Subtype"): NameObject("/Type1"),
+        NameObject("/BaseFont"): NameObject("/Helvetica"),
+    }))
+    for text in pages:
+        page = writer.add_blank_page(612, 792)
+        stream = DecodedStreamObject()
+        stream.set_data(f"BT /F1 12 Tf 72 720 Td ({text}) Tj ET".encode())
+        page[NameObject("/Contents")] = writer._add_object(stream)
+        page[NameObject("/Resources")] = DictionaryObject({
+            NameObject("/Font"): DictionaryObject({NameObject("/F1"): font}),
+        })
+    with open(path, "wb") as f:
+        writer.write(f)
+
+
+@pytest.fixture
+def extractions(monkeypatch):
+    """Texts of the pages pypdf actually extracts (in this process)."""
+    seen = []
+    original = PageObject.extract_text
+
+    def counting(self, *args, **kwargs):
+        text = original(self, *args, **kwargs)
+        seen.append(text)
+        return text
+
+    monkeypatch.setattr(PageObject, "extract_text", counting)
+    return seen
+
+
+def test_revised_pdf_reextracts_only_changed_pages(tmp_path, extractions):
+    cache = tmp_path / "cache"
+    draft = tmp_path / "draft.pdf"
+    make_pdf(draft, ["Abstract", "Method", "Results"])
+    assert ingest.load_document(draft, cache, workers=1).split("\n") == \
+        ["Abstract", "Method", "Results"]
+    assert len(extractions) == 3
+    assert len(list((cache / "pdf_pages").rglob("*.txt"))) == 3
+
+    revised = tmp_path / "revised.pdf"
+    make_pdf(revised, ["Abstract", "Better method", "Results"])
+    assert ingest.load_document(revised, cache, workers=1).split("\n") == \
+        ["Abstract", "Better method", "Results"]
+    assert extractions[3:] == ["Better method"]
+    assert (cache / "pdf_text" / f"{ingest.file_sha256(revised)}.txt").exists()
+
+
+def test_unchanged_file_is_one_read(tmp_path, monkeypatch):
+    cache = tmp_path / "cache"
+    pdf = tmp_path / "paper.pdf"
+    make_pdf(pdf, ["Only page"])
+    first = ingest.load_document(pdf, cache)
+    monkeypatch.setattr(ingest, "PdfReader", lambda *a: pytest.fail("PDF parsed again"))
+    assert ingest.load_document(pdf, cache) == first == "Only page"
+
+
+def test_text_inputs_skip_pdf_parsing(tmp_path, monkeypatch):
+    monkeypatch.setattr(ingest, "PdfReader", lambda *a: pytest.fail("PDF parser used"))
+    paper = tmp_path / "paper.md"
+    paper.write_text("# Title\n\nBody", encoding="utf-8")
+    assert ingest.load_document(paper) == "# Title\n\nBody"
+    with pytest.raises(FileNotFoundError):
+        ingest.load_document(tmp_path / "missing.pdf")
+
+
+def test_fingerprint_ignores_object_numbers(tmp_path):
+    from pypdf import PdfReader
+
+    a, b = tmp_path / "a.pdf", tmp_path / "b.pdf"
+    make_pdf(a, ["Same", "Page"])
+    make_pdf(b, ["Extra", "Same", "Page"])
+    fa = [ingest.page_fingerprint(p) for p in PdfReader(a).pages]
+    fb = [ingest.page_fingerprint(p) for p in PdfReader(b).pages]
+    assert fa == fb[1:]
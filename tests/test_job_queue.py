@@ -0,0 +1,104 @@
+import time
+
+import pytest
+
+import job_queue
+from job_queue import JobGraph, JobQueue, work
+
+
+def chain_graph() -> JobGraph:
+    graph = JobGraph()
+    graph.complete("cached", "c")
+    graph.add("a", lambda: "A", priority=1)
+    graph.add("b", lambda: "B", priority=0)
+    graph.add("ab", lambda a, b, c: a + b + c, deps=("a", "b", "cached"), priority=0)
+    return graph
+
+
+def test_claims_follow_priority_and_dependencies(tmp_path):
+    queue = JobQueue(tmp_path / "queue.sqlite")
+    queue.enqueue(chain_graph())
+    first = queue.claim("w1")
+    assert first.key == "b"                 # lower priority value first; "ab" is not ready
+    assert queue.claim("w1").key == "a"
+    assert queue.claim("w1") is None
+    queue.finish("a", "w1", "A")
+    queue.finish("b", "w1", "B")
+    ready = queue.claim("w1")
+    assert (ready.key, ready.deps) == ("ab", ("a", "b", "cached"))
+    assert queue.results(ready.deps) == ["A", "B", "c"]
+
+
+def test_expired_lease_is_reclaimed_and_the_old_owner_loses_it(tmp_path):
+    queue = JobQueue(tmp_path / "queue.sqlite")
+    graph = JobGraph()
+    graph.add("job", lambda: None)
+    queue.enqueue(graph)
+
+    assert queue.claim("dead", lease=0.05).attempts == 1
+    assert queue.claim("live") is None      # lease still valid
+    assert queue.active() == 1
+    time.sleep(0.1)
+    assert queue.active() == 0
+    taken = queue.claim("live")
+    assert (taken.key, taken.attempts) == ("job", 2)
+    assert not queue.heartbeat("job", "dead")
+    assert not queue.finish("job", "dead", "late")
+    assert queue.heartbeat("job", "live")
+    assert queue.finish("job", "live", "ok")
+    assert queue.summary()["done"] == 1
+
+
+def test_job_fails_after_max_attempts(monkeypatch, tmp_path):
+    monkeypatch.setattr(job_queue, "MAX_ATTEMPTS", 2)
+    queue = JobQueue(tmp_path / "queue.sqlite")
+    graph = JobGraph()
+    graph.add("crashes", lambda: None)
+    queue.enqueue(graph)
+    for _ in range(2):
+        assert queue.claim("w", lease=0.01) is not None
+        time.sleep(0.02)
+    assert queue.claim("w") is None
+    assert queue.failures() == {"crashes": "lease expired 2 times"}
+
+
+def test_enqueue_keeps_live_claims_and_resets_the_rest(tmp_path):
+    queue = JobQueue(tmp_path / "queue.sqlite")
+    graph = JobGraph()
+    graph.add("held", lambda: None)
+    graph.add("failed", lambda: None)
+    queue.enqueue(graph)
+    queue.claim("w")
+    failed = queue.claim("w")
+    queue.fail(failed.key, "w", RuntimeError("boom"))
+    assert queue.summary() == {"pending": 0, "running": 1, "done": 0, "failed": 1}
+    queue.enqueue(graph)
+    assert queue.summary() == {"pending": 1, "running": 1, "done": 0, "failed": 0}
+
+
+def test_workers_drain_the_queue_and_share_results(tmp_path):
+    queue = JobQueue(tmp_path / "queue.sqlite")
+    graph = chain_graph()
+    queue.enqueue(graph)
+    first = work(queue, graph, 2, owner="w1")
+    assert sorted(first.completed) == ["a", "ab", "b"] and not first.failures
+    assert queue.results(("ab",)) == ["ABc"]
+    # A second worker that joins late finds nothing left to do.
+    assert work(queue, chain_graph(), 2, owner="w2").completed == []
+
+
+def test_failures_block_dependents(tmp_path):
+    queue = JobQueue(tmp_path / "queue.sqlite")
+    graph = JobGraph()
+
+    def boom():
+        raise RuntimeError("no")
+
+    graph.add("bad", boom)
+    graph.add("after", lambda bad: bad, deps=("bad",))
+    queue.enqueue(graph)
+    result = work(queue, graph, 1)
+    assert list(result.failures) == ["bad"]
+    assert queue.summary() == {"pending": 1, "running": 0, "done": 0, "failed": 1}
+    with pytest.raises(ValueError):
+        graph.add("bad", boom)
@@ -0,0 +1,78 @@
+import hashlib
+import json
+import os
+import stat
+
+from output_store import BLOB_MODE, ERROR_PREFIX, OutputStore
+
+
+def manifest(root):
+    return [json.loads(line) for line in (root / ".outputs.jsonl").read_text().splitlines()]
+
+
+def test_write_stores_one_readonly_blob_and_a_manifest_line(tmp_path):
+    store = OutputStore(tmp_path)
+    review = tmp_path / "expert_reviews" / "p" / "run_1.md"
+    store.write(review, "a review")
+    sha = hashlib.sha256(b"a review").hexdigest()
+    blob = tmp_path / ".blobs" / sha[:2] / sha[2:]
+    assert review.read_text() == "a review"
+    assert os.path.samefile(review, blob)
+    assert stat.S_IMODE(blob.stat().st_mode) == BLOB_MODE
+    assert manifest(tmp_path) == [{"path": "expert_reviews/p/run_1.md", "sha": sha,
+                                   "size": 8, "status": "ok"}]
+    store.write(review, "a review")                     # unchanged: nothing appended
+    assert len(manifest(tmp_path)) == 1
+
+
+def test_links_share_a_blob_and_rewrites_do_not_leak(tmp_path):
+    store = OutputStore(tmp_path)
+    review = tmp_path / "expert_reviews" / "p" / "run_1.md"
+    copy = tmp_path / "syntheses" / "combo" / "p_review.md"
+    store.write(review, "first")
+    store.link(review, copy)
+    assert os.path.samefile(review, copy)
+    store.write(review, "second")
+    assert (review.read_text(), copy.read_text()) == ("second", "first")
+    assert len(list((tmp_path / ".blobs").rglob("*"))) == 4      # two dirs, two blobs
+    assert not list(tmp_path.rglob("*.tmp"))
+
+
+def test_manifest_reload_and_validity(tmp_path):
+    store = OutputStore(tmp_path)
+    good, bad, edited = (tmp_path / f"{n}.md" for n in ("good", "bad", "edited"))
+    store.write(good, "fine")
+    store.write(bad, f"{ERROR_PREFIX}: failed]")
+    store.write(edited, "short")
+    with (tmp_path / ".outputs.jsonl").open("a") as f:
+        f.write('{"path": "torn", "sh')                # a writer killed mid-line
+    edited.unlink()
+    edited.write_text("edited by hand, longer")
+
+    reloaded = OutputStore(tmp_path)
+    assert reloaded.valid(good) is True
+    assert reloaded.valid(bad) is False
+    assert reloaded.valid(edited) is None               # manifest cannot vouch: read it
+    assert reloaded.valid(tmp_path / "missing.md") is False
+    assert (tmp_path / "x.md") in reloaded and tmp_path.parent / "x.md" not in reloaded
+
+
+def test_damaged_blob_is_rewritten(tmp_path):
+    store = OutputStore(tmp_path)
+    first = tmp_path / "a.md"
+    store.write(first, "shared text")
+    sha = hashlib.sha256(b"shared text").hexdigest()
+    blob = tmp_path / ".blobs" / sha[:2] / sha[2:]
+    os.chmod(blob, 0o644)
+    blob.write_text("clobbered in place, longer")
+    second = tmp_path / "b.md"
+    store.write(second, "shared text")
+    assert second.read_text() == "shared text"
+
+
+def test_run_config_describes_the_linked_reviews(gauntlet, tmp_path):
+    main, _ = gauntlet
+    main.write_run_config(tmp_path)
+    text = (tmp_path / "RUN_CONFIG.md").read_text(encoding="utf-8")
+    assert "hard links" in text and "do not edit them in place" in text
+    assert "copies of the" not in text
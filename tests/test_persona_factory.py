@@ -0,0 +1,70 @@
+from types import SimpleNamespace
+
+import persona_factory
+from persona_factory import group_problem, persona_params, split_personas
+
+TEMPLATE = "You are **[Insert Name]**.\n\n**Your Mission:**\n[Insert Mission]\n"
+
+
+def persona(name: str) -> str:
+    return f"You are **{name}**.\n\n**Your Mission:**\nReview {name}'s field."
+
+
+def grouped(*bodies: str) -> str:
+    return "\n".join(f"=== PERSONA {n} ===\n{body}\n=== END PERSONA {n} ==="
+                     for n, body in enumerate(bodies, start=1))
+
+
+class ScriptedClient:
+    """Answers successive Messages API calls with the given texts."""
+
+    def __init__(self, *replies: str) -> None:
+        self.replies = list(replies)
+        self.sent: list[dict] = []
+        self.messages = SimpleNamespace(with_raw_response=self)
+
+    def create(self, **params):
+        self.sent.append(params)
+        text = self.replies.pop(0)
+        usage = SimpleNamespace(input_tokens=10, output_tokens=len(text) // 4)
+        response = SimpleNamespace(content=[SimpleNamespace(text=text)], usage=usage)
+        return SimpleNamespace(parse=lambda: response, headers={})
+
+
+def test_prompt_wording_follows_the_count():
+    single = persona_params(["caches"], TEMPLATE)["messages"][0]["content"][0]["text"]
+    group = persona_params(["caches", "networks", "compilers"],
+                           TEMPLATE)["messages"][0]["content"][0]["text"]
+    assert "for the research topic given" in single and "marker" not in single
+    assert "generate 3 specific" in group and "Output ONLY the 3 personas'" in group
+    assert "Output ONLY the final Markdown content" not in group
+
+
+def test_split_personas():
+    text = ("preamble\n" + grouped(persona("A"), "```markdown\n" + persona("B") + "\n```")
+            + "\n=== PERSONA 3 ===\ncut off")
+    assert split_personas(text, 3) == {1: persona("A"), 2: persona("B")}
+    assert split_personas(grouped(persona("A"), persona("B")), 1) == {1: persona("A")}
+
+
+def test_group_problem():
+    assert group_problem({1: persona("A"), 2: persona("B")}, 2, TEMPLATE) is None
+    assert group_problem({1: persona("A")}, 2, TEMPLATE) == "1 of 2 personas delimited"
+    merged = {1: persona("A") + "\n\n" + persona("B"), 2: persona("C")}
+    assert group_problem(merged, 2, TEMPLATE) == "persona 1 holds more than one persona"
+
+
+def test_mismatched_reply_is_rejected_and_topics_redone(tmp_path):
+    merged = grouped(persona("A") + "\n\n" + persona("B"), persona("C"))
+    client = ScriptedClient(merged, persona("A"), persona("B"))
+    files = [tmp_path / "a.md", tmp_path / "b.md"]
+    persona_factory.run_persona_job(client, ["caches", "networks"], TEMPLATE, files, None, None)
+    assert len(client.sent) == 3
+    assert [f.read_text(encoding="utf-8") for f in files] == [persona("A"), persona("B")]
+
+
+def test_matching_reply_is_accepted(tmp_path):
+    client = ScriptedClient(grouped(persona("A"), persona("B")))
+    found = persona_factory.generate_personas(client, ["caches", "networks"], TEMPLATE)
+    assert found == {"caches": persona("A"), "networks": persona("B")}
+    assert len(client.sent) == 1
@@ -0,0 +1,130 @@
+import argparse
+from pathlib import Path
+
+import pytest
+
+import combos
+import planner
+from engine import text_block
+from planner import History, Plan, PlannedCall
+from run_ledger import RunLedger
+
+MODEL = "claude-opus-4-5-20251101"       # $5 in, $25 out, $6.25 cache write, $0.50 read
+PAPER = "p" * 4000                       # 1,001 tokens as a cached prefix
+
+
+def review(key: str, question: str) -> PlannedCall:
+    # 4,000 + 396 characters: 1,100 input tokens, 1,001 of them up to the breakpoint.
+    content = [text_block(PAPER, cache=True), text_block(question.ljust(396))]
+    return PlannedCall(key, "review", {"model": MODEL, "max_tokens": 4096, "system": "",
+                                       "messages": [{"role": "user", "content": content}]})
+
+
+def test_first_call_writes_the_prefix_and_later_calls_read_it():
+    first, second = review("r1", "methods?"), review("r2", "evaluation?")
+    plan = Plan([first, second], MODEL, History(), concurrency=2)
+    assert (first.input_tokens, first.cache_write, first.cache_read) == (99, 1001, 0)
+    assert (second.input_tokens, second.cache_write, second.cache_read) == (99, 0, 1001)
+    assert first.output_tokens == second.output_tokens == 2000
+    # 99×$5 + 2,000×$25 + 1,001×$6.25, then 99×$5 + 2,000×$25 + 1,001×$0.50, per million
+    assert first.cost == pytest.approx(0.05675125)
+    assert second.cost == pytest.approx(0.0509955)
+    assert plan.cost == pytest.approx(0.10774675)
+    batch = Plan([review("r1", "methods?"), review("r2", "evaluation?")], MODEL, History(),
+                 concurrency=2, batch=True)
+    assert batch.cost == pytest.approx(0.10774675 / 2)
+
+
+def test_exact_counts_scale_the_split():
+    first, second = review("r1", "methods?"), review("r2", "evaluation?")
+    Plan([first, second], MODEL, History(), concurrency=1, counts={"r1": 2200, "r2": 550})
+    assert (first.input_tokens, first.cache_write, first.cache_read) == (198, 2002, 0)
+    assert (second.input_tokens, second.cache_write, second.cache_read) == (50, 0, 500)
+
+
+def test_wall_seconds_simulates_the_dag():
+    calls = [review(f"r{n}", "q") for n in range(3)]
+    synthesis = PlannedCall("s", "synthesis", calls[0].params,
+                            deps=("r0", "r1", "r2", "outside-the-plan"))
+    # Without history: 5 s to first token + output at 40 tok/s (review 55 s, synthesis 92.5 s).
+    assert Plan(calls + [synthesis], MODEL, History(), 3).wall_seconds() == 55 + 92.5
+    assert Plan(calls + [synthesis], MODEL, History(), 2).wall_seconds() == 55 * 2 + 92.5
+    assert Plan(calls, MODEL, History(), 1).wall_seconds() == 55 * 3
+
+
+def test_history_from_the_previous_ledger(tmp_path):
+    ledger = RunLedger(tmp_path / "ledger.jsonl")
+    for out, latency in ((1000, 10.0), (3000, 30.0), (2000, 20.0)):
+        ledger.record("review", MODEL, {"output_tokens": out}, latency=latency)
+    ledger.record("review", MODEL, {"output_tokens": 99_999}, latency=999.0, cached=True)
+    ledger.record("synthesis", MODEL, {"output_tokens": 4000}, latency=3600.0, batch=True)
+    history = History.from_ledger(tmp_path / "ledger.jsonl")
+    assert (history.output_for("review"), history.seconds_for("review")) == (2000, 20.0)
+    assert history.output_for("synthesis") == 4000
+    assert history.seconds_for("synthesis") == 5.0 + 4000 / 40      # batch latency ignored
+    assert history.output_for("merge") == planner.FALLBACK_OUTPUT_TOKENS
+
+
+@pytest.fixture
+def panel(gauntlet, monkeypatch):
+    """Three personas × two temperatures: 6 reviews and 8 full-factorial syntheses."""
+    main, client = gauntlet
+    personas = ["prof_amara_kito", "dr_silas_vane", "dr_julian_rex"]
+    monkeypatch.setattr(main, "PERSONA_ORDER", personas)
+    monkeypatch.setattr(main, "PERSONA_SHORT", {p: p.split("_")[-1] for p in personas})
+    monkeypatch.setattr(main, "TEMPERATURES", [0.3, 0.7])
+    monkeypatch.setattr(main, "COMBOS", combos.select("full", 2, 3))
+    monkeypatch.setattr(main, "COMBO_DESIGN", combos.describe("full"))
+    monkeypatch.setattr(main, "SYNTH_TREE", [])
+    return main, client
+
+
+def preflight(main, client, tmp_path, budget):
+    args = argparse.Namespace(count_tokens=False, budget=budget, max_concurrency=4, batch=False,
+                              proposal_pdf=Path("paper.pdf"), combo_seed=0)
+    call, proposal = "Call for proposals.", "We propose a directory protocol. " * 200
+    return main.preflight(args, client, call, proposal, main.build_context(call, proposal), {},
+                          tmp_path)
+
+
+def test_budget_downsizes_the_design(panel, tmp_path):
+    main, client = panel
+    full = main.COMBOS
+
+    def cost_of(design, name):
+        main.COMBOS = design
+        return preflight(main, client, tmp_path / name, None).cost
+
+    full_cost = cost_of(full, "full")
+    oa = combos.orthogonal_array(2, 3)
+    cover = combos.select("covering", 2, 3)
+    oa_cost, cover_cost = cost_of(oa, "oa"), cost_of(cover, "cover")
+    assert (len(oa), len(cover)) == (4, 2)
+    assert cover_cost < oa_cost < full_cost
+
+    def downsized(budget, name):
+        main.COMBOS = full
+        return preflight(main, client, tmp_path / name, budget)
+
+    # Just under the full plan: the orthogonal array fits.
+    plan = downsized(full_cost - 0.01, "to-oa")
+    assert main.COMBOS == oa and plan.cost == pytest.approx(oa_cost)
+    assert main.COMBO_DESIGN.endswith(f"(downsized to fit a ${full_cost - 0.01:,.2f} budget)")
+    assert "Downsized to fit --budget" in (tmp_path / "to-oa" / "PLAN.md").read_text()
+
+    # Under the orthogonal array: the covering design.
+    plan = downsized(oa_cost - 0.001, "to-cover")
+    assert main.COMBOS == cover and plan.cost == pytest.approx(cover_cost)
+
+    # Under the covering design: the largest random-k that fits.
+    budget = cover_cost - 0.001
+    plan = downsized(budget, "to-k")
+    k = len(main.COMBOS)
+    assert main.COMBO_DESIGN.startswith(f"random-k (k={k}, seed=0)")
+    assert plan.cost <= budget
+    assert cost_of(combos.select("random-k", 2, 3, k + 1), "k+1") > budget
+
+    # Not even one synthesis fits: abort, keeping the full design.
+    with pytest.raises(SystemExit, match="over --budget"):
+        downsized(0.01, "none")
+    assert main.COMBOS == full
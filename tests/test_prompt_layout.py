@@ -0,0 +1,54 @@
+from engine import CACHE_CONTROL
+
+MAX_BREAKPOINTS = 4         # the Messages API rejects more cache_control blocks
+
+
+def blocks(params: dict) -> list[dict]:
+    """Every content block in prompt order: system, then each message."""
+    out = list(params["system"])
+    for message in params["messages"]:
+        content = message["content"]
+        out += [{"type": "text", "text": content}] if isinstance(content, str) else content
+    return out
+
+
+def breakpoints(params: dict) -> list[int]:
+    return [i for i, b in enumerate(blocks(params)) if "cache_control" in b]
+
+
+def test_review_caches_the_documents_before_the_persona(gauntlet):
+    main, _ = gauntlet
+    context = main.build_context("Call for proposals.", "We propose a directory protocol.")
+    params = main.review_params("prof_amara_kito", 0.3, context)
+    documents, persona = params["system"]
+    assert documents == {"type": "text", "text": context, "cache_control": CACHE_CONTROL}
+    assert persona == {"type": "text", "text": main.load_persona("prof_amara_kito")}
+    assert params["messages"] == [{"role": "user", "content": main.REVIEW_INSTRUCTION}]
+    assert breakpoints(params) == [0]
+
+    # Every reviewer and temperature shares the cached prefix, and only that.
+    other = main.review_params("dr_silas_vane", 0.7, context)
+    assert other["system"][0] == documents
+    assert other["system"][1] != persona
+
+
+def test_part_reviews_cache_their_part_before_the_persona(gauntlet):
+    main, _ = gauntlet
+    params = main.part_params("dr_silas_vane", 0.3, "=== MY PROPOSAL ===\npart one", 1, 2)
+    assert params["system"][0]["text"] == "=== MY PROPOSAL ===\npart one"
+    assert params["system"][1] == {"type": "text", "text": main.load_persona("dr_silas_vane")}
+    assert breakpoints(params) == [0]
+
+
+def test_synthesis_caches_documents_then_leading_reviews(gauntlet):
+    main, _ = gauntlet
+    combo = (1,) * len(main.PERSONA_ORDER)
+    reviews = tuple(f"review by {p}" for p in main.PERSONA_ORDER)
+    params = main.synthesis_params(combo, "Call.", "Proposal.", reviews)
+    assert params["system"] == [{"type": "text", "text": main.load_persona(main.SYNTHESIZER)}]
+    # documents ⟂ all reviews but the last ⟂ the last review (fresh input)
+    assert breakpoints(params) == [1, 2]
+    assert blocks(params)[1]["text"] == main.build_context("Call.", "Proposal.")
+    assert "cache_control" not in blocks(params)[-1]
+    assert len(breakpoints(params)) <= MAX_BREAKPOINTS
+
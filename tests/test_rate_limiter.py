@@ -0,0 +1,51 @@
+from rate_limiter import RateLimiter
+
+PREFIX = "anthropic-ratelimit-"
+
+
+def headers(**remaining):
+    out = {}
+    for dim, (limit, left) in remaining.items():
+        dim = dim.replace("_", "-")
+        out[f"{PREFIX}{dim}-limit"] = str(limit)
+        out[f"{PREFIX}{dim}-remaining"] = str(left)
+    return out
+
+
+def test_sync_keeps_in_flight_reservations():
+    limiter = RateLimiter(4, requests_per_min=10, input_tokens_per_min=10_000,
+                          output_tokens_per_min=1_000)
+    limiter.acquire(1_000, 100)
+    limiter.acquire(2_000, 200)
+    # The first request returns; the server has counted it but not the second.
+    limiter.release(headers(requests=(10, 9), input_tokens=(10_000, 9_000),
+                            output_tokens=(1_000, 900)), (1_000, 100), (1_000, 100))
+    snap = limiter.snapshot()
+    assert snap["in_flight"] == 1
+    assert snap["requests"] == 8
+    assert snap["input-tokens"] == 7_000
+    assert snap["output-tokens"] == 700
+
+
+def test_reservations_dropped_on_failure_and_throttle():
+    limiter = RateLimiter(4, requests_per_min=10, input_tokens_per_min=10_000)
+    limiter.acquire(1_000, 0)
+    limiter.acquire(1_000, 0)
+    limiter.failed((1_000, 0))
+    limiter.throttled(None, headers(requests=(10, 10), input_tokens=(10_000, 10_000)),
+                      (1_000, 0))
+    snap = limiter.snapshot()
+    assert snap["in_flight"] == 0
+    assert snap["requests"] == 10
+    assert snap["input-tokens"] == 10_000
+    assert snap["concurrency"] == 2
+
+
+def test_settle_without_estimate_drops_an_average_share():
+    limiter = RateLimiter(4, input_tokens_per_min=10_000)
+    limiter.acquire(1_000, 0)
+    limiter.acquire(3_000, 0)
+    limiter.failed()
+    assert limiter.buckets["input-tokens"].reserved == 2_000
+    limiter.failed()
+    assert limiter.buckets["input-tokens"].reserved == 0
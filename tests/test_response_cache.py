@@ -0,0 +1,77 @@
+import os
+
+import pytest
+
+from engine import CallResult
+from response_cache import ResponseCache, request_key
+
+PARAMS = {
+    "model": "claude-opus-4-1",
+    "max_tokens": 1024,
+    "temperature": 0.3,
+    "system": [{"type": "text", "text": "You are Prof. Kito."}],
+    "messages": [{"role": "user", "content": [{"type": "text", "text": "Review this."}]}],
+}
+
+
+def edited(**changes) -> dict:
+    return {**PARAMS, **changes}
+
+
+@pytest.mark.parametrize("changed", [
+    edited(model="claude-sonnet-4-5"),
+    edited(temperature=0.7),
+    edited(system=[{"type": "text", "text": "You are Dr. Vane."}]),
+    edited(messages=[{"role": "user", "content": [{"type": "text", "text": "Review that."}]}]),
+])
+def test_content_changes_change_the_key(changed):
+    assert request_key(changed) != request_key(PARAMS)
+
+
+def test_cache_control_does_not_change_the_key():
+    marked = edited(
+        system=[{"type": "text", "text": "You are Prof. Kito.",
+                 "cache_control": {"type": "ephemeral"}}],
+        messages=[{"role": "user", "content": [
+            {"type": "text", "text": "Review this.", "cache_control": {"type": "ephemeral"}},
+        ]}],
+    )
+    assert request_key(marked) == request_key(PARAMS)
+    assert request_key(dict(reversed(PARAMS.items()))) == request_key(PARAMS)
+
+
+def test_round_trip(tmp_path):
+    cache = ResponseCache(tmp_path)
+    assert cache.get(PARAMS) is None
+    cache.put(PARAMS, CallResult(text="a review", usage={"output_tokens": 2}))
+    hit = cache.get(PARAMS)
+    assert (hit.text, hit.usage, hit.cached) == ("a review", {"output_tokens": 2}, True)
+
+
+def test_eviction_is_oldest_first_by_mtime(tmp_path):
+    cache = ResponseCache(tmp_path, max_bytes=10 ** 6)
+    requests = [edited(temperature=t / 10) for t in range(4)]
+    for n, params in enumerate(requests):
+        cache.put(params, CallResult(text="x" * 100, usage={}))
+        path = cache._path(request_key(params))
+        os.utime(path, (1_000 + n, 1_000 + n))
+    # Reading the oldest entry makes it the most recently used.
+    cache.get(requests[0])
+    size = cache._path(request_key(requests[0])).stat().st_size
+
+    cache.max_bytes = 3 * size
+    cache.put(edited(temperature=1.0), CallResult(text="x" * 100, usage={}))
+    assert [cache.get(p) is not None for p in requests] == [True, False, False, True]
+    assert cache.get(edited(temperature=1.0)) is not None
+    assert sum(e.stat().st_size for e in cache._entries()) <= cache.max_bytes
+
+
+@pytest.mark.parametrize("body", [b'{"text": "trunc', b"\xff\xfe\x00", b"[]", b'{"usage": {}}'])
+def test_corrupt_entry_is_a_miss(tmp_path, body):
+    cache = ResponseCache(tmp_path)
+    path = cache._path(request_key(PARAMS))
+    path.parent.mkdir(parents=True)
+    path.write_bytes(body)
+    assert cache.get(PARAMS) is None
+    cache.put(PARAMS, CallResult(text="fresh", usage={}))
+    assert cache.get(PARAMS).text == "fresh"
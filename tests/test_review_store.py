@@ -0,0 +1,106 @@
+import subprocess
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+import review_store
+from engine import CallResult, call_model
+from rate_limiter import RateLimiter
+from review_store import ReviewStore
+from scheduler import DagScheduler
+
+KEY = ReviewStore.key("paper", "persona", 0.7, "model")
+
+
+def test_key_and_round_trip(tmp_path):
+    store = ReviewStore(tmp_path)
+    assert KEY.endswith("-t0.7-model") and KEY.count("/") == 1
+    assert store.get(KEY) is None
+    store.put(KEY, CallResult(text="review", usage={"output_tokens": 3}), persona="p")
+    hit = store.get(KEY)
+    assert (hit.text, hit.usage, hit.cached) == ("review", {"output_tokens": 3}, True)
+
+
+def test_lock_is_exclusive_and_released(tmp_path):
+    first, second = ReviewStore(tmp_path), ReviewStore(tmp_path)
+    assert first.lock(KEY)
+    assert not second.lock(KEY)
+    assert second._locked_elsewhere(KEY)
+    first.unlock(KEY)
+    assert not (tmp_path / f"{KEY}.lock").exists()
+    assert second.lock(KEY)
+    second.unlock(KEY)
+
+
+def test_lock_refused_once_stored(tmp_path):
+    store = ReviewStore(tmp_path)
+    store.put(KEY, CallResult(text="review"))
+    assert not store.lock(KEY)
+
+
+def test_dead_holder_does_not_block(tmp_path):
+    holder = subprocess.Popen(
+        [sys.executable, "-c",
+         "import sys; from pathlib import Path; from review_store import ReviewStore; "
+         f"ReviewStore(Path(sys.argv[1])).lock({KEY!r}); print('locked', flush=True); "
+         "sys.stdin.read()",
+         str(tmp_path)],
+        stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True,
+        cwd=Path(review_store.__file__).parent)
+    assert holder.stdout.readline().strip() == "locked"
+    store = ReviewStore(tmp_path)
+    assert not store.lock(KEY)
+    assert (tmp_path / f"{KEY}.lock").read_text().endswith(f":{holder.pid}\n")
+    holder.kill()
+    holder.wait()
+    assert store.wait(KEY) is None
+    assert store.lock(KEY)
+    store.unlock(KEY)
+
+
+def test_wait_returns_the_holders_review(monkeypatch, tmp_path):
+    monkeypatch.setattr(review_store, "LOCK_POLL_SECONDS", 0.01)
+    writer, reader = ReviewStore(tmp_path), ReviewStore(tmp_path)
+    assert writer.lock(KEY)
+
+    def finish():
+        writer.put(KEY, CallResult(text="written elsewhere"))
+        writer.unlock(KEY)
+
+    timer = threading.Timer(0.1, finish)
+    timer.start()
+    assert reader.wait(KEY).text == "written elsewhere"
+    timer.join()
+
+
+class UnusedClient:
+    def with_options(self, **kwargs):
+        return self
+
+    @property
+    def messages(self):
+        pytest.fail("a gated-off request was sent")
+
+
+def test_closed_gate_gives_the_limiter_slot_back():
+    limiter = RateLimiter(2, requests_per_min=10, input_tokens_per_min=1_000)
+    params = {"model": "m", "max_tokens": 10, "messages": [{"role": "user", "content": "hi"}]}
+    assert call_model(UnusedClient(), params, limiter=limiter, gate=lambda: False) is None
+    snap = limiter.snapshot()
+    assert (snap["in_flight"], snap["requests"], snap["input-tokens"]) == (0, 10, 1_000)
+
+
+def test_reviews_are_shared_across_output_dirs(gauntlet, mock_api, monkeypatch, tmp_path):
+    main, client = gauntlet
+    _, state = mock_api
+    monkeypatch.setattr(main, "REVIEW_STORE", ReviewStore(tmp_path / "reviews"))
+    context = main.build_context("call", "proposal")
+    for out in ("a", "b"):
+        sched = DagScheduler(4)
+        main.phase1(sched, client, context, tmp_path / out)
+        assert sched.run().ok
+    assert state.counts["messages"] == len(main.PERSONA_ORDER)
+    assert len(list((tmp_path / "reviews").rglob("*.md"))) == len(main.PERSONA_ORDER)
+    assert not list((tmp_path / "reviews").rglob("*.lock"))
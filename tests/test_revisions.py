@@ -0,0 +1,101 @@
+import pytest
+
+import revisions
+
+OLD = """Title of the paper
+
+1 Introduction
+We study caches.
+
+2 Method
+We use a table.
+It has rows.
+
+3 Results
+It is fast.
+
+References
+[1] A paper.
+"""
+
+NEW = """Title of the paper
+
+1 Introduction
+We study caches.
+
+2 Approach Details
+New section.
+
+3 Method
+We use a table.
+It has many rows.
+
+4 Results
+It is fast.
+"""
+
+
+def test_split_sections():
+    sections = revisions.split_sections(OLD)
+    assert [s.title for s in sections] == [revisions.FRONT_MATTER, "1 Introduction", "2 Method",
+                                           "3 Results", "References"]
+    assert sections[2].body == "We use a table.\nIt has rows."
+
+
+@pytest.mark.parametrize("line", [
+    "3 we propose a new cache",
+    "4 cores per socket",
+    "2 x 4 mesh topology",
+    "iv. results are shown below",
+    "3 We propose a new cache,",
+])
+def test_body_lines_are_not_headings(line):
+    assert not revisions._is_heading(line)
+    assert len(revisions.split_sections(f"1 Introduction\nText.\n{line}\nMore text.")) == 1
+
+
+@pytest.mark.parametrize("line", ["3 Method", "4.2 Ablations", "IV. RESULTS", "ABSTRACT",
+                                  "references", "## Related work"])
+def test_heading_lines(line):
+    assert revisions._is_heading(line)
+
+
+def test_diff_sections_pairs_renumbered_titles():
+    changes = {c.title: c for c in revisions.diff_sections(OLD, NEW)}
+    assert changes["1 Introduction"].status == "unchanged"
+    assert changes["4 Results"].status == "unchanged"
+    assert changes["2 Approach Details"].status == "added"
+    assert changes["References"].status == "removed"
+    method = changes["3 Method"]
+    assert (method.status, method.added, method.removed) == ("modified", 1, 1)
+    assert "-It has rows." in method.diff and "+It has many rows." in method.diff
+
+
+def test_compact_diff_lists_only_changes():
+    diff = revisions.compact_diff(revisions.diff_sections(OLD, NEW))
+    assert "Introduction" not in diff
+    assert "### References  [removed]" in diff
+    assert "### 3 Method  [modified, +1/-1 lines]" in diff
+    assert revisions.compact_diff(revisions.diff_sections(OLD, OLD)) == ""
+
+
+def test_revise_in_place_is_resumable(gauntlet, monkeypatch, tmp_path):
+    main, _ = gauntlet
+    monkeypatch.setattr(main, "REVISION_MAX_CHANGE", 10.0)    # a tiny paper, mostly changed
+    out = tmp_path / "run"
+    main.save_source(out, "call", OLD)
+    review = out / "expert_reviews" / "prof_amara_kito" / "run_1.md"
+    main.write_output(review, "review of the first draft")
+
+    main.prepare_revision(out, "call", NEW, out)
+    assert main.prior_review("prof_amara_kito", 1) == "review of the first draft"
+    # The run revises the review in place, then fails before it completes.
+    main.write_output(review, "revised review")
+
+    main.prepare_revision(out, "call", NEW, out)
+    assert main.prior_review("prof_amara_kito", 1) == "review of the first draft"
+    assert "3 Method" in main.REVISION_DIFF
+
+    main.save_source(out, "call", NEW)
+    assert not (out / main.REVISE_BASE).exists()
+    assert (out / main.SOURCE_DIR / "proposal.txt").read_text(encoding="utf-8") == NEW
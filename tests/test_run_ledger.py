@@ -0,0 +1,65 @@
+import pytest
+
+from run_ledger import RunLedger, cost_usd, load, percentile, price_for, write_stats
+
+USAGE = {"input_tokens": 1_000, "output_tokens": 2_000,
+         "cache_creation_input_tokens": 4_000, "cache_read_input_tokens": 10_000}
+
+
+def test_prices_match_the_longest_model_prefix():
+    assert price_for("claude-opus-4-5-20251101") == (5.00, 25.00, 6.25, 0.50)
+    assert price_for("claude-opus-4-1-20250805") == (15.00, 75.00, 18.75, 1.50)
+    assert price_for("gpt-4o") is None
+
+
+def test_cost_per_model_and_batch_discount():
+    # 1k×$5 + 2k×$25 + 4k×$6.25 + 10k×$0.50 per million
+    assert cost_usd("claude-opus-4-5-20251101", USAGE) == pytest.approx(0.085)
+    assert cost_usd("claude-opus-4-1", USAGE) == pytest.approx(0.255)
+    assert cost_usd("claude-opus-4-5-20251101", USAGE, batch=True) == pytest.approx(0.0425)
+    assert cost_usd("claude-sonnet-4-5", {"output_tokens": 1_000_000}) == pytest.approx(15.0)
+    assert cost_usd("unknown-model", USAGE) is None
+
+
+def test_cache_hits_cost_nothing(tmp_path):
+    ledger = RunLedger(tmp_path / "ledger.jsonl")
+    ledger.record("review", "claude-opus-4-5", USAGE, persona="kito")
+    ledger.record("review", "claude-opus-4-5", USAGE, cached=True, persona="kito")
+    ledger.record("review", "claude-opus-4-5", USAGE, batch=True, persona="kito")
+    ledger.record("review", "unknown-model", USAGE)
+    live, hit, batched, unknown = load(tmp_path / "ledger.jsonl")
+    assert live["cost_usd"] == pytest.approx(0.085) and live["persona"] == "kito"
+    assert hit["cost_usd"] == 0.0 and hit["cached"]
+    assert batched["cost_usd"] == pytest.approx(0.0425)
+    assert unknown["cost_usd"] is None
+    assert len({e["run_id"] for e in (live, hit, batched, unknown)}) == 1
+
+
+def test_nearest_rank_percentiles():
+    latencies = [float(n) for n in range(20, 0, -1)]     # 20.0 … 1.0, unsorted
+    assert percentile(latencies, 50) == 10.0
+    assert percentile(latencies, 95) == 19.0
+    assert percentile(latencies, 100) == 20.0
+    assert percentile(latencies, 0) == 1.0
+    assert percentile([3.0, 1.0, 2.0], 50) == 2.0
+    assert percentile([], 50) is None
+
+
+def test_write_stats_rows(tmp_path):
+    ledger = RunLedger(tmp_path / "ledger.jsonl")
+    for n in range(1, 21):
+        ledger.record("review", "claude-opus-4-5", {"input_tokens": 100, "output_tokens": 10},
+                      latency=float(n), ttft=0.5)
+    ledger.record("review", "claude-opus-4-5", USAGE, latency=99.0, cached=True)
+    ledger.record("review", "claude-opus-4-5", {"output_tokens": 40_000}, latency=500.0,
+                  batch=True)
+    ledger.record("synthesis", "claude-opus-4-5", {"output_tokens": 40_000}, latency=30.0,
+                  retries=2)
+    write_stats(tmp_path / "ledger.jsonl", tmp_path / "RUN_STATS.md")
+    rows = (tmp_path / "RUN_STATS.md").read_text(encoding="utf-8").splitlines()
+    assert "23 call(s) across 1 run(s)" in rows[2]
+    # 20 live reviews: 2,000 in × $5 + 200 out × $25; the batch: 40,000 × $25 × 0.5
+    assert "| review | 22 | 1 | 0 | 10.0s | 19.0s | 0.5s | 2,000 | 40,200 | 0 | 0 | $0.52 |" in rows
+    assert "| synthesis | 1 | 0 | 2 | 30.0s | 30.0s | – | 0 | 40,000 | 0 | 0 | $1.00 |" in rows
+    assert rows[-1].startswith("| **total** | 23 | 1 | 2 | 11.0s | 20.0s | 0.5s | 2,000 | 80,200 |")
+    assert rows[-1].endswith("| $1.52 |")
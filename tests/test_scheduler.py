@@ -0,0 +1,113 @@
+import threading
+import time
+
+import pytest
+
+from scheduler import DagScheduler, ScopedScheduler
+
+
+def recorder(log: list, key: str, value=None):
+    def run(*args):
+        log.append((key, args))
+        return key if value is None else value
+    return run
+
+
+def test_dependencies_run_first_and_receive_results_in_order():
+    log = []
+    sched = DagScheduler(4)
+    sched.add("synth", recorder(log, "synth"), deps=("review_b", "review_a", "cached"))
+    sched.add("review_a", recorder(log, "review_a", "A"))
+    sched.add("review_b", recorder(log, "review_b", "B"))
+    sched.complete("cached", "C")
+    result = sched.run()
+    assert result.ok
+    assert log[-1] == ("synth", ("B", "A", "C"))
+    assert result.results == {"cached": "C", "review_a": "A", "review_b": "B", "synth": "synth"}
+
+
+def test_ready_jobs_start_by_priority_then_insertion_order():
+    log = []
+    sched = DagScheduler(1)
+    sched.add("late", recorder(log, "late"), priority=2)
+    sched.add("first", recorder(log, "first"), priority=0)
+    sched.add("second", recorder(log, "second"), priority=1)
+    sched.add("third", recorder(log, "third"), priority=1)
+    sched.add("after_first", recorder(log, "after_first"), deps=("first",), priority=0)
+    sched.run()
+    assert [key for key, _ in log] == ["first", "after_first", "second", "third", "late"]
+
+
+def test_failure_blocks_dependents_transitively():
+    def boom():
+        raise RuntimeError("API error")
+
+    sched = DagScheduler(2)
+    sched.add("review", boom)
+    sched.add("other", lambda: "ok")
+    sched.add("synth", lambda r: r, deps=("review",))
+    sched.add("meta", lambda s, o: s + o, deps=("synth", "other"))
+    result = sched.run()
+    assert not result.ok
+    assert list(result.failures) == ["review"]
+    assert isinstance(result.failures["review"], RuntimeError)
+    assert sorted(result.blocked) == ["meta", "synth"]
+    assert result.results == {"other": "ok"}
+
+
+def test_cycles_are_reported_as_blocked():
+    sched = DagScheduler(2)
+    sched.add("a", lambda b: b, deps=("b",))
+    sched.add("b", lambda a: a, deps=("a",))
+    sched.add("c", lambda: "c")
+    result = sched.run()
+    assert sorted(result.blocked) == ["a", "b"]
+    assert result.results == {"c": "c"}
+
+
+def test_unknown_dependency_and_duplicate_keys_are_rejected():
+    sched = DagScheduler(2)
+    sched.add("synth", lambda r: r, deps=("review",))
+    with pytest.raises(KeyError, match="review"):
+        sched.run()
+    sched.complete("done", 1)
+    for key in ("synth", "done"):
+        with pytest.raises(ValueError, match="duplicate"):
+            sched.add(key, lambda: None)
+        with pytest.raises(ValueError, match="duplicate"):
+            sched.complete(key, None)
+
+
+def test_in_flight_jobs_never_exceed_max_workers():
+    lock = threading.Lock()
+    running = peak = 0
+
+    def job():
+        nonlocal running, peak
+        with lock:
+            running += 1
+            peak = max(peak, running)
+        time.sleep(0.02)
+        with lock:
+            running -= 1
+
+    sched = DagScheduler(3)
+    for n in range(12):
+        sched.add(f"job{n}", job)
+    assert sched.run().ok
+    assert peak == 3
+
+
+def test_scoped_scheduler_prefixes_keys_and_offsets_priorities():
+    log = []
+    sched = DagScheduler(1)
+    first = ScopedScheduler(sched, "paper1/", priority=0)
+    second = ScopedScheduler(sched, "paper2/", priority=10)
+    second.add("review", recorder(log, "paper2/review"))
+    first.add("review", recorder(log, "paper1/review"), priority=5)
+    first.add("synth", recorder(log, "paper1/synth"), deps=("review",), priority=5)
+    second.complete("cached", "C")
+    assert "review" in first and "cached" in second and "cached" not in first
+    result = sched.run()
+    assert [key for key, _ in log] == ["paper1/review", "paper1/synth", "paper2/review"]
+    assert result.results["paper2/cached"] == "C"
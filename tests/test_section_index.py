@@ -0,0 +1,84 @@
+import section_index
+from engine import estimate_tokens
+from section_index import BM25, pack, tokenize
+
+
+def paragraph(words: str, n: int = 40) -> str:
+    return " ".join([words] * n)
+
+
+PAPER = "\n".join([
+    "CoherenceX: Scalable Directory Protocols",
+    "A. Author, B. Author",
+    "Abstract",
+    "We propose a directory protocol for many-core chips.",
+    "1 Introduction",
+    paragraph("Many-core chips need scalable coherence."),
+    "2 Directory Protocol Design",
+    paragraph("The directory tracks sharers with coarse vectors and invalidation trees."),
+    "3 Evaluation Methodology",
+    paragraph("We evaluate on PARSEC benchmarks against baselines with statistical significance."),
+    "4 Related Work",
+    paragraph("Prior snooping and token coherence work did not scale."),
+    "5 Conclusion",
+    paragraph("Directories scale."),
+])
+
+EVALUATOR = "I scrutinise evaluation methodology: benchmarks, baselines, statistical significance."
+
+
+def test_tokenize_drops_stopwords_and_single_letters():
+    assert tokenize("The many-core chip is a 2-level design, x") == \
+        ["many-core", "chip", "2-level", "design"]
+
+
+def test_bm25_ranks_the_matching_document_first():
+    docs = ["cache coherence directory", "benchmark evaluation baselines", "related work"]
+    scores = BM25(docs).scores("evaluation against baselines")
+    assert scores.index(max(scores)) == 1
+    assert scores[2] == 0.0
+
+
+def test_pack_keeps_relevant_and_pinned_sections_within_budget():
+    budget = estimate_tokens(PAPER) // 2
+    packing = pack(PAPER, EVALUATOR, budget)
+    assert not packing.full
+    assert packing.tokens <= budget < packing.total_tokens
+    text = packing.text
+    # Front matter and abstract are pinned; the evaluation section is the best match.
+    assert text.startswith("CoherenceX: Scalable Directory Protocols\nA. Author, B. Author")
+    assert "Abstract\nWe propose a directory protocol" in text
+    assert "3 Evaluation Methodology\nWe evaluate on PARSEC" in text
+    assert "2 Directory Protocol Design" in packing.omitted
+    assert "2 Directory Protocol Design\n" not in text
+    # Kept sections stay in document order, followed by the omission note.
+    assert text.index("Abstract") < text.index("3 Evaluation")
+    assert text.endswith("[Sections omitted as less relevant to this review: "
+                         + "; ".join(packing.omitted) + "]")
+
+
+def test_only_pinned_sections_can_exceed_the_budget():
+    pinned = pack(PAPER, EVALUATOR, 1).tokens
+    for budget in range(pinned, estimate_tokens(PAPER) + 1, 7):
+        assert pack(PAPER, EVALUATOR, budget).tokens <= budget
+
+
+def test_pinned_sections_survive_a_tiny_budget():
+    packing = pack(PAPER, EVALUATOR, 1)
+    assert packing.omitted == ["1 Introduction", "2 Directory Protocol Design",
+                               "3 Evaluation Methodology", "4 Related Work", "5 Conclusion"]
+    assert "Abstract" in packing.text and "A. Author" in packing.text
+
+
+def test_short_or_unstructured_papers_are_returned_whole(monkeypatch):
+    total = estimate_tokens(PAPER)
+    assert pack(PAPER, EVALUATOR, total).text == PAPER
+    assert pack(PAPER, EVALUATOR, total).full
+
+    flat = paragraph("No headings anywhere in this extracted text.", 200)
+    packing = pack(flat, EVALUATOR, 10)
+    assert (packing.text, packing.omitted) == (flat, [])
+    assert packing.tokens == packing.total_tokens == estimate_tokens(flat)
+
+    monkeypatch.setattr(section_index, "MIN_SECTIONS", 20)
+    assert pack(PAPER, EVALUATOR, 10).text == PAPER
@@ -0,0 +1,76 @@
+import json
+import threading
+
+import anthropic
+import pytest
+from anthropic import Anthropic
+
+import mock_anthropic as mock
+from engine import call_model
+from response_cache import ResponseCache
+
+PARAMS = {"model": "claude-test", "max_tokens": 1024, "temperature": 0.3,
+          "messages": [{"role": "user", "content": "Review this."}]}
+
+
+@pytest.fixture
+def client(mock_api):
+    base_url, state = mock_api
+    return Anthropic(api_key="mock", base_url=base_url, max_retries=0), state
+
+
+def test_stream_writes_partial_then_renames(client, tmp_path):
+    client, state = client
+    state.behaviour = mock.Behaviour(output_tokens=200, tokens_per_sec=1000)
+    out = tmp_path / "run_1.md"
+    partial = tmp_path / "run_1.md.partial"
+    seen = []
+
+    def watch():
+        while not done.is_set():
+            renamed = out.exists()
+            try:
+                seen.append((partial.stat().st_size, renamed))
+            except FileNotFoundError:
+                pass
+
+    done = threading.Event()
+    watcher = threading.Thread(target=watch)
+    watcher.start()
+    try:
+        result = call_model(client, PARAMS, stream_to=out)
+    finally:
+        done.set()
+        watcher.join()
+    assert not any(renamed for _, renamed in seen)
+    assert any(0 < size < len(result.text) for size, _ in seen)     # written as it arrived
+    assert out.read_text(encoding="utf-8") == result.text
+    assert result.text == mock.make_message(PARAMS, 200)["content"][0]["text"]
+    assert not partial.exists()
+
+
+def test_interrupted_stream_keeps_partial(client, tmp_path):
+    client, state = client
+    state.behaviour = mock.Behaviour(output_tokens=200, drop_after=2)
+    cache = ResponseCache(tmp_path / "cache")
+    out = tmp_path / "run_1.md"
+    with pytest.raises(anthropic.APIConnectionError):
+        call_model(client, PARAMS, cache, stream_to=out)
+    text = mock.make_message(PARAMS, 200)["content"][0]["text"]
+    assert (tmp_path / "run_1.md.partial").read_text(encoding="utf-8") == text[:32]
+    assert not out.exists()
+    assert cache.get(PARAMS) is None
+
+
+def test_ttft_and_rate_are_in_the_ledger(gauntlet, mock_api, monkeypatch, tmp_path):
+    main, client = gauntlet
+    _, state = mock_api
+    state.behaviour = mock.Behaviour(latency=0.05, output_tokens=400, tokens_per_sec=4000)
+    monkeypatch.setattr(main, "STREAM", True)
+    out = tmp_path / "expert_reviews" / "kito" / "run_1.md"
+    text = main.run_review(client, "prof_amara_kito", 1, 0.3, "a paper", tmp_path, out)
+    assert out.read_text(encoding="utf-8") == text
+    entry, = [json.loads(line) for line in (tmp_path / "ledger.jsonl").read_text().splitlines()]
+    assert entry["phase"] == "review" and entry["output_tokens"] > 0
+    assert entry["ttft"] >= 0.05
+    assert 0 < entry["tokens_per_sec"] <= 4000 * 1.5
@@ -0,0 +1,49 @@
+import json
+
+import pytest
+
+from scheduler import DagScheduler, ScopedScheduler
+
+
+def test_manifest_directory(gauntlet, tmp_path):
+    main, _ = gauntlet
+    for name in ("call.pdf", "alpha.pdf", "alpha.md", "beta.txt", "notes.docx"):
+        (tmp_path / name).write_text("x", encoding="utf-8")
+    papers = main.load_manifest(tmp_path, tmp_path / "call.pdf")
+    assert [(n, p.name) for n, _, p in papers] == [("alpha", "alpha.pdf"), ("beta", "beta.txt")]
+    assert all(c == tmp_path / "call.pdf" for _, c, _ in papers)
+
+
+def test_manifest_jsonl(gauntlet, tmp_path):
+    main, _ = gauntlet
+    manifest = tmp_path / "papers.jsonl"
+    manifest.write_text("# papers\n" + "\n".join(json.dumps(e) for e in [
+        {"proposal": "a.pdf", "call": "c1.pdf"},
+        {"proposal": "sub/a.pdf", "name": "a2"},
+    ]) + "\n", encoding="utf-8")
+    papers = main.load_manifest(manifest, tmp_path / "default.pdf")
+    assert papers == [("a", tmp_path / "c1.pdf", tmp_path / "a.pdf"),
+                      ("a2", tmp_path / "default.pdf", tmp_path / "sub" / "a.pdf")]
+
+    manifest.write_text('{"proposal": "a.pdf"}\n{"proposal": "x/a.pdf"}\n', encoding="utf-8")
+    with pytest.raises(ValueError, match="share output directory"):
+        main.load_manifest(manifest, tmp_path / "default.pdf")
+    with pytest.raises(ValueError, match="no call document"):
+        main.load_manifest(manifest, None)
+
+
+def test_papers_share_one_scheduler(gauntlet, tmp_path):
+    main, client = gauntlet
+    sched = DagScheduler(4)
+    for index, name in enumerate(("first", "second")):
+        call, proposal = "call", f"proposal {name}"
+        scope = ScopedScheduler(sched, f"{name}/", priority=2 * index)
+        out = tmp_path / name
+        main.phase1(scope, client, main.build_context(call, proposal), out)
+        main.phase2(scope, client, call, proposal, out)
+    result = sched.run()
+    assert result.ok
+    for name in ("first", "second"):
+        assert f"{name}/review:prof_amara_kito:1" in result.results
+        assert any(k.startswith(f"{name}/synth:") for k in result.results)
+        assert list((tmp_path / name / "syntheses").iterdir())
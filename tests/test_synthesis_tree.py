@@ -0,0 +1,45 @@
+from collections import Counter
+
+from run_ledger import load
+from scheduler import DagScheduler
+
+PERSONAS = ["prof_amara_kito", "dr_silas_vane", "dr_julian_rex", "torsten_hoefler"]
+
+
+def write_config(path):
+    path.write_text('synthesizer = "synthesizer"\n' + "".join(
+        f'[[personas]]\nname = "{p}"\nshort = "{p.split("_")[-1]}"\n' for p in PERSONAS),
+        encoding="utf-8")
+    return path
+
+
+def test_combos_sharing_a_subgroup_share_its_digest(gauntlet, mock_api, monkeypatch, tmp_path):
+    main, client = gauntlet
+    _, state = mock_api
+    for name in ("PACK_BUDGET", "CHUNK_TOKENS"):        # configure() sets these too
+        monkeypatch.setattr(main, name, getattr(main, name))
+    monkeypatch.setattr(main, "TEMPERATURES", [0.3, 0.7])
+    monkeypatch.setenv("ANTHROPIC_API_KEY", "mock")
+    args = main.build_parser().parse_args([
+        "call.md", "paper.md", "-c", str(write_config(tmp_path / "panel.toml")),
+        "--synthesis-fanout", "2", "--no-cache",
+    ])
+    main.configure(args)
+    assert main.SYNTH_TREE == [[(0, 2), (2, 4)]]
+    assert len(main.COMBOS) == 16
+
+    call, proposal = "Call for proposals.", "We propose a directory protocol."
+    out = tmp_path / "out"
+    sched = DagScheduler(4)
+    main.phase1(sched, client, main.build_context(call, proposal), out)
+    main.phase2(sched, client, call, proposal, out)
+    assert sched.run().ok
+
+    # One digest per (pair of personas, their run indices), not one per combo.
+    subgroups = {(span, combo[span[0]:span[1]])
+                 for combo in main.COMBOS for span in main.SYNTH_TREE[0]}
+    assert len(subgroups) == 8 < 2 * len(main.COMBOS)
+    calls = Counter(e["phase"] for e in load(out / "ledger.jsonl"))
+    assert calls == {"review": 8, "digest": len(subgroups), "synthesis": 16}
+    assert state.counts["messages"] == 8 + len(subgroups) + 16
+    assert len(list((out / "digests").rglob("*.md"))) == len(subgroups)
@@ -0,0 +1,122 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from web_fetch import Fetcher, extract_text
+
+PAGE = (b"<html><head><title>Prof. Ada</title><script>var x = 1;</script></head>"
+        b"<body><nav>Home | News</nav><h1>Ada Lovelace</h1>"
+        b"<p>Works on <b>analytical engines</b>.</p><footer>(c) 1843</footer></body></html>")
+TEXT = "Prof. Ada\nAda Lovelace\nWorks on analytical engines."
+LAST_MODIFIED = "Mon, 01 Jan 2024 00:00:00 GMT"
+
+
+class Site:
+    """A local http.server: /fresh (max-age), /etag and /dated (revalidated), counting traffic."""
+
+    def __init__(self) -> None:
+        self.connections = 0
+        self.requests: list[tuple[str, dict]] = []
+        site = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"           # keep-alive, so the pool can reuse
+
+            def setup(self):
+                site.connections += 1
+                super().setup()
+
+            def do_GET(self):
+                site.requests.append((self.path, dict(self.headers)))
+                headers = {"Content-Type": "text/html; charset=utf-8"}
+                if self.path == "/fresh":
+                    headers["Cache-Control"] = "max-age=3600"
+                elif self.path == "/etag":
+                    headers.update({"Cache-Control": "no-cache", "ETag": '"v1"'})
+                    if self.headers.get("If-None-Match") == '"v1"':
+                        return self.reply(304, headers, b"")
+                elif self.path == "/dated":
+                    headers["Last-Modified"] = LAST_MODIFIED
+                    if self.headers.get("If-Modified-Since") == LAST_MODIFIED:
+                        return self.reply(304, headers, b"")
+                self.reply(200, headers, PAGE)
+
+            def reply(self, status, headers, body):
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def site():
+    s = Site()
+    yield s
+    s.close()
+
+
+def test_extract_text_drops_boilerplate():
+    assert extract_text(PAGE.decode()) == TEXT
+    assert len(extract_text("<p>" + "word " * 10_000 + "</p>", limit=100)) == 100
+
+
+def test_pooled_connection_is_reused(site):
+    fetcher = Fetcher(None, max_workers=1)
+    for path in ("/fresh", "/etag", "/dated", "/plain"):
+        assert fetcher.fetch(site.url + path) == TEXT
+    assert len(site.requests) == 4
+    assert site.connections == 1
+
+
+def test_fetch_all_deduplicates(site):
+    urls = [site.url + "/plain", site.url + "/fresh", site.url + "/plain", ""]
+    assert Fetcher(None).fetch_all(urls) == {site.url + "/plain": TEXT, site.url + "/fresh": TEXT}
+    assert len(site.requests) == 2
+
+
+def test_fresh_entry_is_served_from_cache(site, tmp_path):
+    Fetcher(tmp_path).fetch(site.url + "/fresh")
+    assert Fetcher(tmp_path).fetch(site.url + "/fresh") == TEXT
+    assert len(site.requests) == 1
+
+
+@pytest.mark.parametrize("path, header, value", [
+    ("/etag", "If-None-Match", '"v1"'),
+    ("/dated", "If-Modified-Since", LAST_MODIFIED),
+])
+def test_stale_entry_is_revalidated(site, tmp_path, path, header, value):
+    Fetcher(tmp_path).fetch(site.url + path)
+    assert Fetcher(tmp_path).fetch(site.url + path) == TEXT
+    (_, first), (_, second) = site.requests
+    assert header not in first
+    assert second[header] == value
+
+
+def test_uncacheable_page_is_not_stored(site, tmp_path):
+    Fetcher(tmp_path).fetch(site.url + "/plain")
+    Fetcher(tmp_path).fetch(site.url + "/plain")
+    assert all(header not in h for _, h in site.requests
+               for header in ("If-None-Match", "If-Modified-Since"))
+    assert not list(tmp_path.rglob("*.json"))
+
+
+def test_cached_copy_used_when_server_is_down(site, tmp_path):
+    url = site.url + "/etag"
+    Fetcher(tmp_path).fetch(url)
+    site.close()
+    assert Fetcher(tmp_path, timeout=2).fetch(url) == TEXT
+    assert Fetcher(None, timeout=2).fetch(url) is None
@@ -0,0 +1,374 @@
+"""Local stand-in for the Anthropic Messages API.
+
+Serves just enough of the API for the Gauntlet scripts to run end-to-end
+without network access or API spend:
+
+    POST /v1/messages                       → canned message (SSE if "stream"),
+                                              or 429 beyond --rpm requests/min
+    POST /v1/messages/count_tokens          → {"input_tokens": <character estimate>}
+    POST /v1/messages/batches               → new batch (in_progress)
+    GET  /v1/messages/batches/<id>          → batch status
+    GET  /v1/messages/batches/<id>/results  → JSONL results once ended
+
+Responses are deterministic: the text is derived from a hash of the request,
+so identical requests get identical answers.  Batches finish --batch-delay
+seconds after creation.  With --rpm, message responses carry
+anthropic-ratelimit-requests-* headers and excess requests get a 429 with
+retry-after, so client-side rate limiting can be exercised.
+
+For load tests (benchmarks/bench_pipeline.py) the timing of /v1/messages
+is configurable: time to first token drawn from a fixed, uniform, or
+lognormal distribution (--latency, --latency-dist), output generated at
+--tokens-per-sec, replies padded to --output-tokens, and a fraction of
+requests failed with 429 or 529 (--p429, --p529).  --drop-streams-after
+cuts streamed replies off mid-generation, as a lost connection would.
+
+Usage:
+    python tools/mock_anthropic.py --port 8765
+    ANTHROPIC_BASE_URL=http://127.0.0.1:8765 ANTHROPIC_API_KEY=mock \\
+        python main.py inputs/placeholder.pdf inputs/readpaper.pdf --batch
+"""
+
+import argparse
+import hashlib
+import json
+import math
+import random
+import threading
+import time
+import uuid
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Optional
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _iso(ts: datetime | None) -> str | None:
+    return ts.isoformat().replace("+00:00", "Z") if ts else None
+
+
+def _text_of(content: Any) -> str:
+    """Concatenate the text of a string or a list of content blocks."""
+    if isinstance(content, str):
+        return content
+    return "".join(b.get("text", "") for b in content or [] if isinstance(b, dict))
+
+
+def estimate_input_tokens(params: dict[str, Any]) -> int:
+    chars = len(_text_of(params.get("system", "")))
+    chars += sum(len(_text_of(m.get("content"))) for m in params.get("messages", []))
+    return max(1, chars // 4)
+
+
+def make_message(params: dict[str, Any], output_tokens: int = 0) -> dict[str, Any]:
+    """Deterministic canned reply for one Messages API request.
+
+    With output_tokens, the text is padded to roughly that many tokens
+    (capped at max_tokens).
+    """
+    digest = hashlib.sha256(json.dumps(params, sort_keys=True).encode()).hexdigest()
+    text = (
+        f"# Mock response {digest[:12]}\n\n"
+        f"model={params.get('model')} temperature={params.get('temperature')} "
+        f"max_tokens={params.get('max_tokens')}\n"
+    )
+    target = min(output_tokens, params.get("max_tokens") or output_tokens)
+    if len(text) // 4 < target:
+        filler = f"lorem {digest[:7]} ipsum "     # 24 chars ≈ 6 tokens
+        text += "\n" + filler * ((target - len(text) // 4) // 6 + 1)
+    return {
+        "id": f"msg_mock_{digest[:24]}",
+        "type": "message",
+        "role": "assistant",
+        "model": params.get("model", "mock"),
+        "content": [{"type": "text", "text": text}],
+        "stop_reason": "end_turn",
+        "stop_sequence": None,
+        "usage": {
+            "input_tokens": estimate_input_tokens(params),
+            "output_tokens": max(1, len(text) // 4),
+            "cache_creation_input_tokens": 0,
+            "cache_read_input_tokens": 0,
+        },
+    }
+
+
+LATENCY_DISTS: tuple[str, ...] = ("fixed", "uniform", "lognormal")
+
+
+@dataclass
+class Behaviour:
+    """Timing and fault model for /v1/messages (all zero = instant, no faults)."""
+
+    latency: float = 0.0            # mean time to first token, seconds
+    latency_dist: str = "fixed"     # fixed | uniform (0..2×mean) | lognormal (σ=0.5)
+    tokens_per_sec: float = 0.0     # output generation rate; 0 = instantaneous
+    output_tokens: int = 0          # pad replies to about this many tokens
+    p429: float = 0.0               # fraction of requests answered 429
+    p529: float = 0.0               # fraction of requests answered 529 (overloaded)
+    seed: Optional[int] = None
+    drop_after: int = 0             # cut streamed replies after this many text chunks; 0 = never
+
+
+class MockState:
+    """In-memory batches, rate-limit window, and counters, shared by all handler threads."""
+
+    def __init__(self, batch_delay: float, rpm: Optional[int] = None,
+                 behaviour: Optional[Behaviour] = None) -> None:
+        self.batch_delay = batch_delay
+        self.rpm = rpm
+        self.behaviour = behaviour or Behaviour()
+        self.recent: deque[float] = deque()   # admission times in the last minute
+        self.batches: dict[str, dict[str, Any]] = {}
+        self.counts = {"messages": 0, "429": 0, "529": 0}
+        self.lock = threading.Lock()
+        self._rng = random.Random(self.behaviour.seed)
+
+    def first_token_delay(self) -> float:
+        b = self.behaviour
+        with self.lock:
+            if b.latency <= 0 or b.latency_dist == "fixed":
+                return max(0.0, b.latency)
+            if b.latency_dist == "uniform":
+                return self._rng.uniform(0, 2 * b.latency)
+            # lognormal with the requested mean: mu = ln(mean) - sigma²/2
+            return self._rng.lognormvariate(math.log(b.latency) - 0.125, 0.5)
+
+    def generation_time(self, output_tokens: int) -> float:
+        rate = self.behaviour.tokens_per_sec
+        return output_tokens / rate if rate > 0 else 0.0
+
+    def fault(self) -> Optional[int]:
+        """An injected error status for this request, or None."""
+        with self.lock:
+            self.counts["messages"] += 1
+            roll = self._rng.random()
+            if roll < self.behaviour.p429:
+                self.counts["429"] += 1
+                return 429
+            if roll < self.behaviour.p429 + self.behaviour.p529:
+                self.counts["529"] += 1
+                return 529
+            return None
+
+    def admit(self) -> dict[str, str]:
+        """Rate-limit headers for a new request; contains retry-after if it is refused."""
+        if self.rpm is None:
+            return {}
+        with self.lock:
+            now = time.monotonic()
+            while self.recent and now - self.recent[0] >= 60:
+                self.recent.popleft()
+            headers = {"anthropic-ratelimit-requests-limit": str(self.rpm)}
+            if len(self.recent) >= self.rpm:
+                headers["retry-after"] = f"{60 - (now - self.recent[0]):.2f}"
+                headers["anthropic-ratelimit-requests-remaining"] = "0"
+                return headers
+            self.recent.append(now)
+            headers["anthropic-ratelimit-requests-remaining"] = str(self.rpm - len(self.recent))
+            return headers
+
+    def create_batch(self, requests: list[dict[str, Any]]) -> dict[str, Any]:
+        batch_id = f"msgbatch_mock_{uuid.uuid4().hex[:20]}"
+        with self.lock:
+            self.batches[batch_id] = {
+                "created_at": _now(),
+                "requests": requests,
+            }
+        return self.batch_view(batch_id)
+
+    def batch_view(self, batch_id: str, base_url: str = "") -> dict[str, Any]:
+        with self.lock:
+            b = self.batches[batch_id]
+        created = b["created_at"]
+        ended = _now() >= created + timedelta(seconds=self.batch_delay)
+        n = len(b["requests"])
+        return {
+            "id": batch_id,
+            "type": "message_batch",
+            "processing_status": "ended" if ended else "in_progress",
+            "request_counts": {
+                "processing": 0 if ended else n,
+                "succeeded": n if ended else 0,
+                "errored": 0, "canceled": 0, "expired": 0,
+            },
+            "created_at": _iso(created),
+            "expires_at": _iso(created + timedelta(hours=24)),
+            "ended_at": _iso(created + timedelta(seconds=self.batch_delay)) if ended else None,
+            "archived_at": None,
+            "cancel_initiated_at": None,
+            "results_url": f"{base_url}/v1/messages/batches/{batch_id}/results" if ended else None,
+        }
+
+    def batch_results(self, batch_id: str) -> str:
+        with self.lock:
+            requests = self.batches[batch_id]["requests"]
+        return "".join(
+            json.dumps({
+                "custom_id": r["custom_id"],
+                "result": {"type": "succeeded", "message": make_message(r["params"])},
+            }) + "\n"
+            for r in requests
+        )
+
+
+class Handler(BaseHTTPRequestHandler):
+    state: MockState
+
+    def log_message(self, fmt: str, *args: Any) -> None:  # keep the console quiet
+        pass
+
+    def _send(self, status: int, body: str, content_type: str = "application/json",
+              headers: Optional[dict[str, str]] = None) -> None:
+        data = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _json(self, status: int, obj: Any, headers: Optional[dict[str, str]] = None) -> None:
+        self._send(status, json.dumps(obj), headers=headers)
+
+    def _error(self, status: int, kind: str, message: str,
+               headers: Optional[dict[str, str]] = None) -> None:
+        self._json(status, {"type": "error", "error": {"type": kind, "message": message}}, headers)
+
+    def _body(self) -> dict[str, Any]:
+        length = int(self.headers.get("Content-Length") or 0)
+        return json.loads(self.rfile.read(length) or b"{}")
+
+    def _base_url(self) -> str:
+        return f"http://{self.headers.get('Host')}"
+
+    def _stream(self, msg: dict[str, Any], chunk_chars: int = 16,
+                headers: Optional[dict[str, str]] = None) -> None:
+        """Send msg as a Messages API server-sent-event stream, paced by the Behaviour."""
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+
+        def event(kind: str, data: dict[str, Any]) -> None:
+            self.wfile.write(f"event: {kind}\ndata: {json.dumps({'type': kind, **data})}\n\n"
+                             .encode("utf-8"))
+            self.wfile.flush()
+
+        text = msg["content"][0]["text"]
+        usage = msg["usage"]
+        per_chunk = self.state.generation_time(usage["output_tokens"]) * chunk_chars / len(text)
+        drop_after = self.state.behaviour.drop_after
+        event("message_start", {"message": {**msg, "content": [], "stop_reason": None,
+                                            "usage": {**usage, "output_tokens": 0}}})
+        event("content_block_start", {"index": 0, "content_block": {"type": "text", "text": ""}})
+        time.sleep(self.state.first_token_delay())
+        for i in range(0, len(text), chunk_chars):
+            if i and per_chunk:
+                time.sleep(per_chunk)
+            if drop_after and i >= drop_after * chunk_chars:
+                self.close_connection = True        # connection lost mid-generation
+                return
+            event("content_block_delta", {"index": 0, "delta": {"type": "text_delta",
+                                                                "text": text[i:i + chunk_chars]}})
+        event("content_block_stop", {"index": 0})
+        event("message_delta", {"delta": {"stop_reason": "end_turn", "stop_sequence": None},
+                                "usage": {"output_tokens": usage["output_tokens"]}})
+        event("message_stop", {})
+        self.close_connection = True
+
+    def do_POST(self) -> None:
+        path = self.path.split("?", 1)[0]
+        if path == "/v1/messages":
+            params = self._body()
+            limits = self.state.admit()
+            fault = self.state.fault()
+            if "retry-after" in limits:
+                self._error(429, "rate_limit_error", "mock requests-per-minute limit", limits)
+            elif fault == 429:
+                self._error(429, "rate_limit_error", "injected rate limit", {"retry-after": "1"})
+            elif fault == 529:
+                self._error(529, "overloaded_error", "injected overload")
+            elif params.pop("stream", False):
+                self._stream(make_message(params, self.state.behaviour.output_tokens),
+                             headers=limits)
+            else:
+                msg = make_message(params, self.state.behaviour.output_tokens)
+                time.sleep(self.state.first_token_delay()
+                           + self.state.generation_time(msg["usage"]["output_tokens"]))
+                self._json(200, msg, limits)
+        elif path == "/v1/messages/count_tokens":
+            self._json(200, {"input_tokens": estimate_input_tokens(self._body())})
+        elif path == "/v1/messages/batches":
+            self._json(200, self.state.create_batch(self._body()["requests"]))
+        else:
+            self._error(404, "not_found_error", f"no route for POST {path}")
+
+    def do_GET(self) -> None:
+        parts = self.path.split("?", 1)[0].strip("/").split("/")
+        if parts[:3] != ["v1", "messages", "batches"] or len(parts) not in (4, 5):
+            return self._error(404, "not_found_error", f"no route for GET {self.path}")
+        batch_id = parts[3]
+        if batch_id not in self.state.batches:
+            return self._error(404, "not_found_error", f"unknown batch {batch_id}")
+        if len(parts) == 4:
+            return self._json(200, self.state.batch_view(batch_id, self._base_url()))
+        if self.state.batch_view(batch_id)["processing_status"] != "ended":
+            return self._error(400, "invalid_request_error", "batch still processing")
+        self._send(200, self.state.batch_results(batch_id), "application/binary")
+
+
+def serve(host: str, port: int, state: MockState) -> ThreadingHTTPServer:
+    """Build a server bound to (host, port); call serve_forever() to run it."""
+    handler = type("BoundHandler", (Handler,), {"state": state})
+    return ThreadingHTTPServer((host, port), handler)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Local stand-in for the Anthropic Messages API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--batch-delay", type=float, default=5.0,
+                        help="seconds before a submitted batch reports 'ended' (default: 5)")
+    parser.add_argument("--rpm", type=int, default=None,
+                        help="requests/min before answering 429 (default: unlimited)")
+    parser.add_argument("--latency", type=float, default=0.0,
+                        help="mean time to first token in seconds (default: 0)")
+    parser.add_argument("--latency-dist", choices=LATENCY_DISTS, default="fixed",
+                        help="distribution of time to first token (default: fixed)")
+    parser.add_argument("--tokens-per-sec", type=float, default=0.0,
+                        help="output generation rate; 0 = instantaneous (default: 0)")
+    parser.add_argument("--output-tokens", type=int, default=0,
+                        help="pad replies to about this many tokens (default: short reply)")
+    parser.add_argument("--p429", type=float, default=0.0,
+                        help="fraction of message requests answered 429 (default: 0)")
+    parser.add_argument("--p529", type=float, default=0.0,
+                        help="fraction of message requests answered 529 (default: 0)")
+    parser.add_argument("--seed", type=int, default=None, help="seed for latency and faults")
+    parser.add_argument("--drop-streams-after", type=int, default=0, metavar="CHUNKS",
+                        help="close streamed replies after this many text chunks (default: never)")
+    args = parser.parse_args()
+
+    behaviour = Behaviour(args.latency, args.latency_dist, args.tokens_per_sec,
+                          args.output_tokens, args.p429, args.p529, args.seed,
+                          args.drop_streams_after)
+    server = serve(args.host, args.port, MockState(args.batch_delay, args.rpm, behaviour))
+    print(f"[mock]    Anthropic stand-in on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,255 @@
+"""Fetch bio pages for generate_persona.py: pooled, cached, concurrent.
+
+fetch_all() downloads every URL at once over one pooled requests.Session,
+and extracts readable text from each page while it streams in
+(TextExtractor, a stdlib HTMLParser): script/style/nav/footer content is
+dropped, each block element becomes one line, and the download stops as
+soon as MAX_TEXT_CHARS of text have been collected.
+
+Results are kept in an on-disk HTTP cache,
+
+    <cache>/http/<aa>/<sha256(url)>.json
+
+holding the extracted text plus the page's ETag / Last-Modified validators
+and freshness lifetime (Cache-Control max-age).  A fresh entry is used
+without touching the network; a stale one is revalidated with
+If-None-Match / If-Modified-Since, and a 304 reuses the cached text.  If
+the server cannot be reached, a cached copy is used however old it is.
+
+Tests can point a Fetcher at a local http.server; nothing here reads .env
+or has import-time side effects.
+"""
+
+import codecs
+import email.utils
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from html.parser import HTMLParser
+from pathlib import Path
+from typing import Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Bump when the meaning of a cached entry (the extraction) changes.
+CACHE_VERSION: int = 1
+
+# Extracted text kept per page; the download stops once this much is collected.
+MAX_TEXT_CHARS: int = 20_000
+
+MAX_WORKERS: int = 8
+TIMEOUT: float = 10.0
+CHUNK_BYTES: int = 16 * 1024
+
+USER_AGENT: str = ("Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+                   "(KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36")
+
+# Elements whose text is never part of a bio.
+SKIP_TAGS: frozenset[str] = frozenset({"script", "style", "nav", "footer", "noscript",
+                                       "template", "svg"})
+
+# Elements that end a line of text.
+BLOCK_TAGS: frozenset[str] = frozenset({
+    "address", "article", "aside", "blockquote", "br", "dd", "div", "dl", "dt",
+    "figcaption", "figure", "form", "h1", "h2", "h3", "h4", "h5", "h6", "header",
+    "hr", "li", "main", "ol", "p", "pre", "section", "table", "td", "th", "title",
+    "tr", "ul",
+})
+
+_SPACE = re.compile(r"\s+")
+_MAX_AGE = re.compile(r"max-age=(\d+)")
+
+
+class TextExtractor(HTMLParser):
+    """Incremental HTML → text: one line per block element, boilerplate dropped."""
+
+    def __init__(self, limit: int = MAX_TEXT_CHARS) -> None:
+        super().__init__(convert_charrefs=True)
+        self.limit = limit
+        self.lines: list[str] = []
+        self.size = 0
+        self._skip = 0
+        self._words: list[str] = []
+
+    @property
+    def full(self) -> bool:
+        return self.size >= self.limit
+
+    def _flush(self) -> None:
+        line = _SPACE.sub(" ", "".join(self._words)).strip()
+        self._words = []
+        if line:
+            self.lines.append(line)
+            self.size += len(line) + 1
+
+    def handle_starttag(self, tag: str, attrs) -> None:
+        if tag in SKIP_TAGS:
+            self._skip += 1
+        elif tag in BLOCK_TAGS:
+            self._flush()
+
+    def handle_startendtag(self, tag: str, attrs) -> None:
+        if tag in BLOCK_TAGS:
+            self._flush()
+
+    def handle_endtag(self, tag: str) -> None:
+        if tag in SKIP_TAGS:
+            self._skip = max(0, self._skip - 1)
+        elif tag in BLOCK_TAGS:
+            self._flush()
+
+    def handle_data(self, data: str) -> None:
+        if not self._skip:
+            self._words.append(data)
+
+    def text(self) -> str:
+        self._flush()
+        return "\n".join(self.lines)[:self.limit]
+
+
+def extract_text(html: str, limit: int = MAX_TEXT_CHARS) -> str:
+    """Readable text of an HTML document (parsing stops once limit is reached)."""
+    parser = TextExtractor(limit)
+    for i in range(0, len(html), CHUNK_BYTES):
+        parser.feed(html[i:i + CHUNK_BYTES])
+        if parser.full:
+            break
+    else:
+        parser.close()
+    return parser.text()
+
+
+def _charset(response: requests.Response) -> str:
+    """Declared charset, else UTF-8 (not requests' ISO-8859-1 default)."""
+    if "charset" in response.headers.get("Content-Type", "").lower() and response.encoding:
+        try:
+            return codecs.lookup(response.encoding).name
+        except LookupError:
+            pass
+    return "utf-8"
+
+
+class Fetcher:
+    """Pooled, cached page fetcher (thread-safe)."""
+
+    def __init__(self, cache_dir: Optional[Path] = None, max_workers: int = MAX_WORKERS,
+                 timeout: float = TIMEOUT) -> None:
+        self.cache_dir = cache_dir
+        self.max_workers = max(1, max_workers)
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=self.max_workers, pool_maxsize=self.max_workers)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers["User-Agent"] = USER_AGENT
+
+    # --- cache -------------------------------------------------------------
+
+    def _path(self, url: str) -> Optional[Path]:
+        if self.cache_dir is None:
+            return None
+        key = hashlib.sha256(f"{CACHE_VERSION}:{url}".encode("utf-8")).hexdigest()
+        return self.cache_dir / key[:2] / f"{key}.json"
+
+    def _load(self, url: str) -> Optional[dict]:
+        path = self._path(url)
+        if path is None:
+            return None
+        try:
+            return json.loads(path.read_text(encoding="utf-8"))
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def _store(self, url: str, entry: dict) -> None:
+        path = self._path(url)
+        if path is None:
+            return
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp.write_text(json.dumps(entry, ensure_ascii=False), encoding="utf-8")
+        tmp.replace(path)
+
+    @staticmethod
+    def _expires(response: requests.Response) -> float:
+        """Until when the response may be reused without revalidation (0: never)."""
+        control = response.headers.get("Cache-Control", "").lower()
+        if "no-cache" in control or "no-store" in control:
+            return 0.0
+        m = _MAX_AGE.search(control)
+        if m:
+            return time.time() + int(m.group(1))
+        expires = response.headers.get("Expires")
+        if expires:
+            try:
+                return email.utils.parsedate_to_datetime(expires).timestamp()
+            except (TypeError, ValueError):
+                return 0.0
+        return 0.0
+
+    # --- fetching ----------------------------------------------------------
+
+    def _download(self, response: requests.Response) -> str:
+        """Extract text from a streaming response, stopping once enough is read."""
+        decoder = codecs.getincrementaldecoder(_charset(response))(errors="replace")
+        parser = TextExtractor()
+        for chunk in response.iter_content(CHUNK_BYTES):
+            parser.feed(decoder.decode(chunk))
+            if parser.full:
+                break
+        else:
+            parser.feed(decoder.decode(b"", final=True))
+            parser.close()
+        return parser.text()
+
+    def fetch(self, url: str) -> Optional[str]:
+        """Readable text of url, from the cache when it is still valid; None on failure."""
+        cached = self._load(url)
+        if cached is not None and cached.get("expires", 0) > time.time():
+            print(f"🗂️  Cached: {url}")
+            return cached["text"]
+
+        headers = {}
+        if cached is not None:
+            if cached.get("etag"):
+                headers["If-None-Match"] = cached["etag"]
+            if cached.get("last_modified"):
+                headers["If-Modified-Since"] = cached["last_modified"]
+
+        print(f"🕵️  Scraping context from: {url}...")
+        try:
+            with self.session.get(url, headers=headers, timeout=self.timeout,
+                                  stream=True) as response:
+                if response.status_code == 304 and cached is not None:
+                    cached["expires"] = self._expires(response)
+                    self._store(url, cached)
+                    print(f"🗂️  Not modified: {url}")
+                    return cached["text"]
+                response.raise_for_status()
+                text = self._download(response)
+                entry = {
+                    "url": url,
+                    "etag": response.headers.get("ETag"),
+                    "last_modified": response.headers.get("Last-Modified"),
+                    "expires": self._expires(response),
+                    "text": text,
+                }
+        except requests.RequestException as e:
+            if cached is not None:
+                print(f"⚠️  Could not scrape URL ({e}); using the cached copy")
+                return cached["text"]
+            print(f"⚠️  Could not scrape URL: {e}")
+            return None
+        if entry["etag"] or entry["last_modified"] or entry["expires"]:
+            self._store(url, entry)
+        return text
+
+    def fetch_all(self, urls: list[str]) -> dict[str, Optional[str]]:
+        """fetch() every distinct URL concurrently."""
+        unique = list(dict.fromkeys(u for u in urls if u))
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            return dict(zip(unique, pool.map(self.fetch, unique)))